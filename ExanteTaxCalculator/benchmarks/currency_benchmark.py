@@ -0,0 +1,77 @@
+"""
+is_money throughput - the currency check made for every report row when classifying rows and choosing builders:
+list literal rebuilt and scanned on every call, as Currency.is_currency used to do, vs KNOWN_CURRENCIES frozenset.
+Also Currency construction: validating every time vs the shared instances.
+Run: python -m benchmarks.currency_benchmark --checks 1000000
+"""
+
+import csv
+import sys
+import time
+import random
+import argparse
+from typing import Any, Callable, List
+
+from src.domain.currency import Currency, KNOWN_CURRENCIES
+from src.infrastructure.transaction_item_data import is_money
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.report_row_parser import ReportRowParser
+from benchmarks.synthetic_report import synthetic_report_lines
+
+CURRENCY_CODES = tuple(sorted(KNOWN_CURRENCIES))
+
+
+def is_currency_list(cur: str) -> bool:
+    known_currencies = list(CURRENCY_CODES)  # what the old list literal compiled to: new list from constant tuple on every call
+    return cur.upper() in known_currencies
+
+
+def is_money_list(row: ReportRow) -> bool:
+    return is_currency_list(row.asset)
+
+
+class ValidatedCurrency:
+    """Currency as before: validated on every construction"""
+
+    def __init__(self, value: str) -> None:
+        if not value.isupper() or not is_currency_list(value):
+            raise ValueError(f'"{value}" is not valid currency')
+        self.value = value
+
+
+def report_rows(num_rows: int) -> List[ReportRow]:
+    reader = csv.reader(synthetic_report_lines(num_rows), delimiter="\t", quotechar='"', quoting=csv.QUOTE_ALL)
+    parser = ReportRowParser(next(reader))
+    return [parser.parse(fields) for fields in reader]
+
+
+def measure(name: str, func: Callable[[Any], Any], args: List[Any]) -> float:
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:6.3f}s  {len(args) / elapsed:10.0f} calls/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Currency check and construction benchmark")
+    parser.add_argument("--checks", type=int, default=1_000_000)
+    args = parser.parse_args(sys.argv[1:])
+
+    rows = report_rows(args.checks)  # real mix of shares and money assets
+    print(f"{len(rows)} is_money checks:")
+    slow = measure("list literal", is_money_list, rows)
+    fast = measure("frozenset", is_money, rows)
+    print(f"speedup: {slow / fast:.2f}x")
+
+    random.seed(0)
+    codes = random.choices(["USD", "EUR", "SGD", "CAD", "PLN"], k=args.checks)
+    print(f"{len(codes)} currency constructions:")
+    slow = measure("validated every time", ValidatedCurrency, codes)
+    fast = measure("shared instances", Currency, codes)
+    print(f"speedup: {slow / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
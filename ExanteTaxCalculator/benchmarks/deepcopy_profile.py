@@ -0,0 +1,58 @@
+"""
+Share of Trader runtime spent in copy.deepcopy, profiled with cProfile on synthetic report.
+Run: python -m benchmarks.deepcopy_profile --rows 100000
+"""
+
+import io
+import copy
+import sys
+import pstats
+import cProfile
+import argparse
+import datetime
+from decimal import Decimal
+from contextlib import redirect_stdout
+from typing import List, Optional
+
+from src.application.trader import Trader
+from src.domain.currency import Currency
+from src.domain.quotation.polish_banking_calendar import WeekendsOnlyCalendar
+from benchmarks.synthetic_report import synthetic_report_lines, START
+
+
+class ConstantQuotesProvider:
+    """Same quote every day, so the profile is not about quotation"""
+
+    def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
+        return Decimal("4")
+
+
+def run_trader(lines: List[str]) -> None:
+    trader = Trader(ConstantQuotesProvider(), Decimal("19"), calendar=WeekendsOnlyCalendar())
+    with redirect_stdout(io.StringIO()):  # repo logs every row
+        trader.trade_items(lines, START.year)
+    trader.report
+    trader.owned_asssets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="deepcopy share of Trader runtime")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--top", type=int, default=15, help="print that many top functions by cumulative time")
+    args = parser.parse_args(sys.argv[1:])
+
+    lines = list(synthetic_report_lines(args.rows))
+    profiler = cProfile.Profile()
+    profiler.runcall(run_trader, lines)
+
+    stats = pstats.Stats(profiler)
+    total = stats.total_tt  # type: ignore
+    # cumulative time of recursive function counts only the outermost calls
+    deepcopy_time = sum(cumulative for (filename, _, function), (_, _, _, cumulative, _) in stats.stats.items() if filename == copy.__file__ and function == "deepcopy")  # type: ignore
+
+    stats.sort_stats("cumulative").print_stats(args.top)
+    print(f"total: {total:.2f}s, deepcopy: {deepcopy_time:.2f}s ({deepcopy_time / total:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Per-item dispatch overhead: isinstance chain, as Trader used to classify items, vs ItemDispatcher type lookup;
+and if/elif ladder over OperationType, as TradesRepoCSV2 used to choose builders, vs the BUILDERS dict.
+Handlers do nothing, so only the dispatch itself is measured.
+Run: python -m benchmarks.dispatch_benchmark --items 1000000
+"""
+
+import sys
+import time
+import random
+import argparse
+import datetime
+from decimal import Decimal
+from typing import Any, Callable, List
+
+from money import Money
+
+from src.application.item_dispatcher import ItemDispatcher
+from src.domain.share import Share
+from src.domain.transactions import *
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.builders import (
+    TradeBuilder,
+    FoundingWithdrawalBuilder,
+    TaxBuilder,
+    IssuanceFeeBuilder,
+    CorporateActionBuilder,
+    StockSplitBuilder,
+    DividendBuilder,
+    AutoConversionBuilder,
+    FeeBuilder,
+)
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+
+DATE = datetime.datetime(2020, 1, 2, 9, 0, 0)
+USD = Money("1", "USD")
+SGD = Money("1", "SGD")
+
+# one item of each type, with weights roughly as in real reports: mostly trades, then dividends and their taxes
+ITEMS_WEIGHTS = [
+    (FundingItem(USD, DATE, 1), 1),
+    (WithdrawalItem(USD, DATE, 2), 1),
+    (ExchangeItem(USD, SGD, DATE, 3), 1),
+    (BuyItem("PHYS.ARCA", Decimal(1), USD, USD, (), DATE, 4), 30),
+    (SellItem("PHYS.ARCA", Decimal(1), USD, USD, (), DATE, 5), 20),
+    (DividendItem(USD, None, None, (), DATE, 6), 20),
+    (TaxItem(USD, DATE, 7), 10),
+    (IssuanceFeeItem(USD, DATE, 8), 2),
+    (CorporateActionItem(Share(Decimal(1), "PHYS.ARCA"), Share(Decimal(1), "PHYS.NYSE"), DATE, 9), 1),
+    (StockSplitItem(Share(Decimal(1), "PHYS.ARCA"), Share(Decimal(2), "PHYS.ARCA"), DATE, 10), 1),
+    (AutoConversionItem(USD, SGD, DATE, 11), 5),
+    (FeeItem(USD, DATE, 12), 3),
+]
+
+
+def make_items(num_items: int) -> List[Any]:
+    random.seed(0)
+    items, weights = zip(*ITEMS_WEIGHTS)
+    return random.choices(items, weights=weights, k=num_items)
+
+
+def noop(item: Any) -> None:
+    pass
+
+
+def isinstance_chain(item: Any, handle: Callable[[Any], None] = noop) -> None:
+    if isinstance(item, FundingItem):
+        handle(item)
+    elif isinstance(item, ExchangeItem):
+        handle(item)
+    elif isinstance(item, BuyItem):
+        handle(item)
+    elif isinstance(item, SellItem):
+        handle(item)
+    elif isinstance(item, DividendItem):
+        handle(item)
+    elif isinstance(item, TaxItem):
+        handle(item)
+    elif isinstance(item, IssuanceFeeItem):
+        handle(item)
+    elif isinstance(item, CorporateActionItem):
+        handle(item)
+    elif isinstance(item, StockSplitItem):
+        handle(item)
+    elif isinstance(item, WithdrawalItem):
+        handle(item)
+    elif isinstance(item, AutoConversionItem):
+        handle(item)
+    elif isinstance(item, FeeItem):
+        handle(item)
+    else:
+        raise TypeError(f"Not implemented transaction type: {type(item)}")
+
+
+def builder_ladder(op: ReportRow.OperationType) -> type:
+    Op = ReportRow.OperationType
+    if op == Op.TRADE:
+        return TradeBuilder
+    elif op == Op.FUNDING_WITHDRAWAL:
+        return FoundingWithdrawalBuilder
+    elif op == Op.TAX:
+        return TaxBuilder
+    elif op == Op.US_TAX:
+        return TaxBuilder
+    elif op == Op.ISSUANCE_FEE:
+        return IssuanceFeeBuilder
+    elif op == Op.CORPORATE_ACTION:
+        return CorporateActionBuilder
+    elif op == Op.STOCK_SPLIT:
+        return StockSplitBuilder
+    elif op == Op.DIVIDEND:
+        return DividendBuilder
+    elif op == Op.AUTOCONVERSION:
+        return AutoConversionBuilder
+    elif op == Op.FEE:
+        return FeeBuilder
+    else:
+        raise ValueError(op)
+
+
+def builder_dict(op: ReportRow.OperationType) -> type:
+    return TradesRepoCSV2.BUILDERS[op]
+
+
+def measure(name: str, func: Callable[[Any], Any], args: List[Any]) -> float:
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:6.3f}s  {elapsed / len(args) * 1e9:6.0f} ns/item")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Item dispatch overhead benchmark")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args(sys.argv[1:])
+
+    items = make_items(args.items)
+    dispatcher = ItemDispatcher()
+    for item, _ in ITEMS_WEIGHTS:
+        dispatcher.subscribe(type(item), noop)
+
+    print(f"{args.items} items:")
+    chain = measure("isinstance chain", isinstance_chain, items)
+    table = measure("ItemDispatcher", dispatcher.dispatch, items)
+    print(f"speedup: {chain / table:.2f}x")
+
+    random.seed(0)
+    ops = random.choices(list(TradesRepoCSV2.BUILDERS), k=args.items)
+    print(f"{args.items} builder choices:")
+    ladder = measure("if/elif ladder", builder_ladder, ops)
+    table = measure("BUILDERS dict", builder_dict, ops)
+    print(f"speedup: {ladder / table:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+BuySellFIFOMatcher throughput on long trading history: buys and sells spread over many symbols.
+Run: python -m benchmarks.fifo_matcher_benchmark --trades 100000 --symbols 500
+"""
+
+import sys
+import time
+import argparse
+import datetime
+from decimal import Decimal
+from typing import List, Tuple, Union
+
+from money import Money
+
+from src.domain.transactions import BuyItem, SellItem
+from src.domain.trading.buy_sell_fifo_matcher import BuySellFIFOMatcher
+
+START = datetime.datetime(2019, 1, 2, 9, 0, 0)
+
+
+def make_trades(num_trades: int, num_symbols: int) -> List[Union[BuyItem, SellItem]]:
+    """
+    num_trades buys and almost as many sells. Each symbol is bought in lots of 10;
+    after the first round over all symbols, every buy is followed by sale of 10 of that symbol, consuming its oldest lot
+    """
+
+    symbols = [f"SYM{n:03}.NASDAQ" for n in range(num_symbols)]
+    trades: List[Union[BuyItem, SellItem]] = []
+    for n in range(num_trades):
+        symbol = symbols[n % num_symbols]
+        date = START + datetime.timedelta(minutes=len(trades))
+        trades.append(BuyItem(symbol, Decimal(10), Money("1000", "USD"), Money("1", "USD"), date=date, transaction_id=len(trades) + 1))
+        if n >= num_symbols:
+            date = START + datetime.timedelta(minutes=len(trades))
+            trades.append(SellItem(symbol, Decimal(10), Money("1100", "USD"), Money("1", "USD"), date=date, transaction_id=len(trades) + 1))
+    return trades
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="BuySellFIFOMatcher benchmark")
+    parser.add_argument("--trades", type=int, default=100_000, help="number of buys; sells are about the same")
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args(sys.argv[1:])
+
+    trades = make_trades(args.trades, args.symbols)
+    matcher = BuySellFIFOMatcher()
+
+    start = time.perf_counter()
+    for trade in trades:
+        if isinstance(trade, BuyItem):
+            matcher.buy(trade)
+        else:
+            matcher.sell(trade)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(trades)} buys and sells over {args.symbols} symbols in {elapsed:.2f}s: {len(trades) / elapsed:.0f} trades/s, {len(matcher.buy_sell_pairs)} pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-object memory footprint of ReportRows and TransactionItems, slotted vs the same dataclasses with per-instance __dict__.
+Run: python -m benchmarks.memory_benchmark --rows 500000
+"""
+
+import io
+import csv
+import sys
+import argparse
+import tracemalloc
+import dataclasses
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Type
+
+from src.infrastructure.report_row_parser import ReportRowParser
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from benchmarks.synthetic_report import synthetic_report_lines
+
+_unslotted_classes: Dict[type, type] = {}
+
+
+def unslotted(obj: Any) -> Any:
+    """Same dataclass object, but of class with per-instance __dict__ - the representation before slots"""
+
+    cls = type(obj)
+    if cls not in _unslotted_classes:
+        _unslotted_classes[cls] = dataclasses.make_dataclass(cls.__name__, [(f.name, f.type) for f in dataclasses.fields(cls)], frozen=cls.__dataclass_params__.frozen)  # type: ignore
+    twin_cls: Type = _unslotted_classes[cls]
+    return twin_cls(**{f.name: getattr(obj, f.name) for f in dataclasses.fields(cls)})
+
+
+def measure(name: str, build: Callable[[], List[Any]]) -> float:
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bytes_per_object = current / len(objects)
+    print(f"{name:<40} {len(objects)} objects, {current / 2**20:8.1f} MiB: {bytes_per_object:6.0f} bytes/object")
+    return bytes_per_object
+
+
+def parse_rows(lines: List[str]) -> List[Any]:
+    reader = csv.reader(lines, delimiter="\t", quotechar='"', quoting=csv.QUOTE_ALL)
+    parser = ReportRowParser(next(reader))
+    return [parser.parse(fields) for fields in reader]
+
+
+def load_items(lines: List[str]) -> List[Any]:
+    repo = TradesRepoCSV2()
+    with redirect_stdout(io.StringIO()):  # repo logs every row
+        repo.load(lines)
+    return repo._items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ReportRow and TransactionItem memory benchmark")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args(sys.argv[1:])
+
+    lines = list(synthetic_report_lines(args.rows))
+    before = measure("ReportRow with __dict__", lambda: [unslotted(row) for row in parse_rows(lines)])
+    after = measure("ReportRow slotted", lambda: parse_rows(lines))
+    print(f"ReportRow saved: {before - after:.0f} bytes/row ({(before - after) / before:.0%})")
+
+    before = measure("TransactionItems with __dict__", lambda: [unslotted(item) for item in load_items(lines)])
+    after = measure("TransactionItems slotted", lambda: load_items(lines))
+    print(f"TransactionItems saved: {before - after:.0f} bytes/item ({(before - after) / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
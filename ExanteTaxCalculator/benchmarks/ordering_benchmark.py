@@ -0,0 +1,63 @@
+"""
+Ordering the report rows by TransactionID: full sort (spilling to disk above MAX_ROWS_IN_MEMORY) vs pre-scan and window sort,
+on synthetic report file that comes reverse ordered like the real one, optionally with local disorder.
+Only a report file is window sorted; in-memory lines are, unless sorted or reverse sorted with no disorder at all.
+Time to first row shows when building TransactionItems can start.
+Run: python -m benchmarks.ordering_benchmark --rows 400000 --disorder 5
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from typing import Iterable, List
+
+from src.infrastructure.report_csv_file import ReportCSVFile
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from benchmarks.synthetic_report import synthetic_report_lines
+
+
+def locally_disordered(lines: List[str], disorder: int) -> List[str]:
+    """Shuffle the rows in blocks of disorder rows; the header stays first"""
+
+    random.seed(0)
+    rows = lines[1:]
+    for start in range(0, len(rows), disorder):
+        block = rows[start : start + disorder]
+        random.shuffle(block)
+        rows[start : start + disorder] = block
+    return lines[:1] + rows
+
+
+def measure(name: str, lines: Iterable[str]) -> float:
+    repo = TradesRepoCSV2()
+    start = time.perf_counter()
+    rows, _ = repo._parse(lines, "\t")  # only the parse + order stage, building items is the same for both
+    next(rows)
+    first_row = time.perf_counter() - start
+    num_rows = 1 + sum(1 for _ in rows)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {num_rows} rows in {elapsed:6.2f}s, first row after {first_row:6.2f}s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report rows ordering benchmark")
+    parser.add_argument("--rows", type=int, default=400_000)
+    parser.add_argument("--disorder", type=int, default=1, help="shuffle rows in blocks of that many, 1 - no disorder")
+    args = parser.parse_args(sys.argv[1:])
+
+    lines = locally_disordered(list(synthetic_report_lines(args.rows)), args.disorder)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "report.csv")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        full = measure("full sort", iter(ReportCSVFile(filename)))  # single pass input can't be pre-scanned
+        window = measure("pre-scan + window sort", ReportCSVFile(filename))
+    print(f"speedup: {full / window:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
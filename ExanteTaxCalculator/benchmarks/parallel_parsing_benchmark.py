@@ -0,0 +1,54 @@
+"""
+Report parsing and sorting by TransactionID: single process vs ReportCSVFile parsed in worker processes.
+Only the stage that parallel mode replaces is measured - CSV lines -> ReportRows sorted by TransactionID, rollbacks collected;
+building TransactionItems from the sorted rows is the same for both.
+Run: python -m benchmarks.parallel_parsing_benchmark --rows 1000000 --jobs 1 2 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from typing import List
+
+from src.infrastructure.report_csv_file import ReportCSVFile
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from benchmarks.synthetic_report import synthetic_report_lines
+
+
+def parse_and_sort(report_file: ReportCSVFile) -> int:
+    repo = TradesRepoCSV2(max_rows_in_memory=sys.maxsize)  # in memory, like the parallel mode
+    if report_file.jobs > 1:
+        rows, rollbacks = repo._parse_in_parallel(report_file, "\t")
+    else:
+        rows, rollbacks = repo._parse(report_file, "\t")
+    return sum(1 for _ in rollbacks.filter(rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel report parsing benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args(sys.argv[1:])
+
+    fd, filename = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for line in synthetic_report_lines(args.rows):
+                f.write(line + "\n")
+
+        print(f"{os.cpu_count()} CPUs")
+        times: List[float] = []
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            num_rows = parse_and_sort(ReportCSVFile(filename, jobs))
+            elapsed = time.perf_counter() - start
+            times.append(elapsed)
+            print(f"jobs {jobs:>2}: {num_rows} rows in {elapsed:6.2f}s: {num_rows / elapsed:10.0f} rows/s, speedup: {times[0] / elapsed:.2f}x")
+    finally:
+        os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
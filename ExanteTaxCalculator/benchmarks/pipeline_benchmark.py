@@ -0,0 +1,222 @@
+"""
+Time of each calculator pipeline stage on synthetic report, for several report sizes, two ways:
+- stages breakdown: each stage run alone, through its public entry point, on the materialized output of the stage before:
+  CSV parse, rollback filter, sort by TransactionID, builders, wallet, FIFO matcher and quoting;
+- end to end: the report is written to file and traded by Trader.trade_all_years, like the calculator does; the stages are the ones
+  Trader times itself, see: Trader.stats - report loading (parsing, ordering, rollback filter and builders, streamed together),
+  trading, quoting and building reports - plus report printing.
+  It runs on both ordering paths of report loading: the file read twice, pre-scanned and window sorted (the calculator's path),
+  and the same lines as single pass input, fully sorted by TransactionID.
+Quotes come offline, from in-memory NBP archive.
+The result goes to JSON file; given the result of an earlier commit, stages that got slower are reported and the run fails.
+Run: python -m benchmarks.pipeline_benchmark --rows 10000 100000 1000000 --output pipeline.json --compare pipeline_before.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.application.trader import Trader
+from src.application.trader_stats import TraderStats
+from src.application.item_dispatcher import ItemDispatcher
+from src.domain.currency import Currency
+from src.domain.wallet import Wallet
+from src.domain.transactions import DividendItem, TaxItem, TransactionItem
+from src.domain.trading.buy_sell_fifo_matcher import BuySellFIFOMatcher
+from src.domain.quotation.quotation_plan import QuotationPlan
+from src.domain.quotation.nbp.quotator_nbp_archive import QuotatorNBPArchive
+from src.domain.quotation.polish_banking_calendar import WeekendsOnlyCalendar
+from src.domain.reporting.trading_report_printer import TradingReportPrinter
+from src.domain.reporting.assets_printer import AssetPrettyPrinter
+from src.infrastructure.report_csv_file import ReportCSVFile
+from src.infrastructure.trades_repo_csv_2 import RollbacksFilter, TradesRepoCSV2, sort_rows_by_transactionid_ascendig
+from benchmarks.synthetic_report import synthetic_report_days, synthetic_report_lines
+
+BREAKDOWN_STAGES = ["csv_parse", "rollback_filter", "sort", "builders", "wallet", "fifo_matcher", "quoting"]
+STAGES = ["load report", "trade", "quote", "build reports", "print reports"]
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+TAX_PERCENTAGE = Decimal("19")
+
+# report loading path: report file as given to Trader
+ORDERING_PATHS: Dict[str, Callable[[str], Iterable[str]]] = {
+    "window sort": lambda filename: ReportCSVFile(filename),  # read twice: pre-scan, then window sort
+    "full sort": lambda filename: iter(ReportCSVFile(filename)),  # single pass: full sort, spilling to disk above TradesRepoCSV2.MAX_ROWS_IN_MEMORY
+}
+
+
+def offline_quotes(first_day: datetime.date, last_day: datetime.date) -> QuotatorNBPArchive:
+    """USD and EUR rates for every weekday between the days, varying a bit from day to day; same days, same rates"""
+
+    days = [first_day + datetime.timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+    weekdays = [day for day in days if day.weekday() < 5]
+    usd = [(day, Decimal("3.8") + Decimal(day.toordinal() % 50) / 1000) for day in weekdays]
+    eur = [(day, Decimal("4.3") + Decimal(day.toordinal() % 50) / 1000) for day in weekdays]
+    return QuotatorNBPArchive({Currency("USD"): usd, Currency("EUR"): eur})
+
+
+def dispatch_all(items: Iterable[TransactionItem], dispatcher: ItemDispatcher) -> None:
+    for item in items:
+        dispatcher.dispatch(item)
+
+
+def run_stages(lines: Sequence[str], quotes: QuotatorNBPArchive) -> Dict[str, Any]:
+    """Stages breakdown: each stage timed alone, on the materialized output of the stage before"""
+
+    stats = TraderStats()
+    repo = TradesRepoCSV2()
+    rollbacks = RollbacksFilter()
+
+    with stats.timer("csv_parse"):
+        rows = list(repo.parse_rows(lines))
+    num_rows = len(rows)
+    with stats.timer("rollback_filter"):
+        rows = list(rollbacks.collect(rows))
+    with stats.timer("sort"):
+        rows = list(sort_rows_by_transactionid_ascendig(rows))
+    with stats.timer("rollback_filter"):  # collecting rollbacks and filtering them out add up
+        rows = list(rollbacks.filter(rows))
+    with stats.timer("builders"):
+        repo.build_items(rows)
+    items = repo.items
+
+    wallet_dispatcher = ItemDispatcher()
+    Trader.subscribe_wallet(wallet_dispatcher, Wallet())
+    with stats.timer("wallet"):
+        dispatch_all(items, wallet_dispatcher)
+
+    matcher = BuySellFIFOMatcher()
+    matcher_dispatcher = ItemDispatcher()
+    Trader.subscribe_matcher(matcher_dispatcher, matcher)
+    matcher_types = set(matcher_dispatcher.item_types)
+    matcher_items = [item for item in items if type(item) in matcher_types]  # Trader's dispatcher routes the rest elsewhere
+    with stats.timer("fifo_matcher"):
+        dispatch_all(matcher_items, matcher_dispatcher)
+
+    with stats.timer("quoting"):
+        plan = QuotationPlan()
+        plan.add_buy_sell_pairs(matcher.buy_sell_pairs)
+        plan.add_dividends([item for item in items if isinstance(item, DividendItem)])
+        plan.add_taxes([item for item in items if isinstance(item, TaxItem)])
+        plan.resolve(quotes, WeekendsOnlyCalendar())
+
+    seconds = {stage: stats.seconds.get(stage, 0.0) for stage in BREAKDOWN_STAGES}
+    return {"rows": num_rows, "items": len(items), "seconds": seconds, "total_seconds": sum(seconds.values())}
+
+
+def run_pipeline(report_csv_lines: Iterable[str], quotes: QuotatorNBPArchive) -> Dict[str, Any]:
+    trader = Trader(quotes, TAX_PERCENTAGE, calendar=WeekendsOnlyCalendar())
+    trader.trade_all_years(report_csv_lines)
+
+    start = time.perf_counter()
+    printer = TradingReportPrinter()
+    texts = [printer.to_text(report) for _, report in sorted(trader.reports.items())]
+    texts.append(str(AssetPrettyPrinter(trader.owned_asssets)))
+    stage_seconds = {**trader.stats.seconds, "print reports": time.perf_counter() - start}
+
+    seconds = {stage: stage_seconds.get(stage, 0.0) for stage in STAGES}
+    counters = trader.stats.counters
+    return {"rows": counters["rows parsed"], "items": counters["items built"], "seconds": seconds, "total_seconds": sum(seconds.values())}
+
+
+def run_size(num_rows: int, repeat: int) -> Dict[str, Any]:
+    """
+    Best of repeat runs of the stages breakdown and of each end to end ordering path, on the report of num_rows;
+    generating the report and writing it to temporary file is not measured
+    """
+
+    first_day, last_day = synthetic_report_days(num_rows)
+    quotes = offline_quotes(first_day - datetime.timedelta(days=14), last_day)  # D-1 rule looks back a few days before the first trade
+    lines = list(synthetic_report_lines(num_rows))
+
+    results = {"stages breakdown": best_of([run_stages(lines, quotes) for _ in range(repeat)])}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "report.csv")
+        with open(filename, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+
+        for path, report_lines in ORDERING_PATHS.items():
+            results[path] = best_of([run_pipeline(report_lines(filename), quotes) for _ in range(repeat)])
+    return results
+
+
+def best_of(runs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fastest time of each stage over the runs; less noise than any single run"""
+
+    seconds = {stage: min(run["seconds"][stage] for run in runs) for stage in runs[0]["seconds"]}
+    return {**runs[0], "seconds": seconds, "total_seconds": sum(seconds.values())}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(path: str, result: Dict[str, Any]) -> None:
+    print(f"{result['rows']} rows, {result['items']} items, {path}:")
+    for stage, seconds in result["seconds"].items():
+        print(f"  {stage:<16} {seconds:8.3f}s  {result['rows'] / seconds if seconds else float('inf'):12,.0f} rows/s")
+    print(f"  {'total':<16} {result['total_seconds']:8.3f}s")
+
+
+def regressions(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float, min_seconds: float) -> List[str]:
+    """Stages slower than threshold times the baseline, of the sizes and runs measured in both; stages faster than min_seconds are noise"""
+
+    found: List[str] = []
+    for size, size_results in results["results"].items():
+        for path, result in size_results.items():
+            before = baseline["results"].get(size, {}).get(path)
+            if before is None:
+                continue
+            for stage, new in result["seconds"].items():
+                old = before["seconds"].get(stage, 0.0)
+                if new > min_seconds and new > old * threshold:
+                    found.append(f"{size} rows, {path}, {stage}: {old:.3f}s -> {new:.3f}s ({new / old if old else float('inf'):.2f}x)")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calculator pipeline stages benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="report sizes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="run each size that many times, keep the best time of each stage")
+    parser.add_argument("--output", metavar="FILE", default="pipeline_benchmark.json", help="JSON result (default: %(default)s)")
+    parser.add_argument("--compare", metavar="FILE", help="JSON result of earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.2, help="stage slower than that many times the earlier run is a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="stages faster than that are not checked, they are mostly noise")
+    args = parser.parse_args(sys.argv[1:])
+
+    results: Dict[str, Any] = {"commit": git_commit(), "python": platform.python_version(), "repeat": args.repeat, "results": {}}
+    for num_rows in args.rows:
+        size_results = run_size(num_rows, args.repeat)
+        results["results"][str(num_rows)] = size_results
+        for path, result in size_results.items():
+            print_result(path, result)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"result written to {args.output}")
+
+    if args.compare is None:
+        return
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    found = regressions(baseline, results, args.threshold, args.min_seconds)
+    for regression in found:
+        print(f"REGRESSION {regression}")
+    if found:
+        sys.exit(1)
+    print(f"no regressions against {args.compare} ({baseline.get('commit')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+ReportRow parsing throughput: csv.DictReader + ReportRow.from_dict vs csv.reader + ReportRowParser.
+Run: python -m benchmarks.report_row_parsing_benchmark --rows 1000000
+"""
+
+import csv
+import sys
+import time
+import argparse
+from typing import Callable, Iterable, List
+
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.report_row_parser import ReportRowParser
+from benchmarks.synthetic_report import synthetic_report_lines
+
+
+def parse_dict_reader(lines: Iterable[str]) -> int:
+    reader = csv.DictReader(f=lines, delimiter="\t", quotechar='"', quoting=csv.QUOTE_ALL)
+    num_rows = 0
+    for d in reader:
+        ReportRow.from_dict(d)
+        num_rows += 1
+    return num_rows
+
+
+def parse_report_row_parser(lines: Iterable[str]) -> int:
+    reader = csv.reader(lines, delimiter="\t", quotechar='"', quoting=csv.QUOTE_ALL)
+    parser = ReportRowParser(next(reader))
+    num_rows = 0
+    for fields in reader:
+        parser.parse(fields)
+        num_rows += 1
+    return num_rows
+
+
+def measure(name: str, parse: Callable[[Iterable[str]], int], lines: List[str]) -> float:
+    start = time.perf_counter()
+    num_rows = parse(lines)
+    elapsed = time.perf_counter() - start
+    rows_per_second = num_rows / elapsed
+    print(f"{name:<30} {num_rows} rows in {elapsed:6.2f}s: {rows_per_second:10.0f} rows/s")
+    return rows_per_second
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ReportRow parsing benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(sys.argv[1:])
+
+    lines = list(synthetic_report_lines(args.rows))  # in memory, so only parsing is measured
+    baseline = measure("DictReader + from_dict", parse_dict_reader, lines)
+    fast = measure("reader + ReportRowParser", parse_report_row_parser, lines)
+    print(f"speedup: {fast / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Rollback filtering on rollback-heavy reports: re.findall with uncompiled pattern on every comment and the rows rebuilt into a new list,
+as filter_rollbacked_rows used to do, vs RollbacksFilter collecting while the rows stream by and filtering lazily.
+Input sizes double, so linear cost shows as flat ns/row; peak is the memory allocated by the filtering itself, on top of the input rows.
+Run: python -m benchmarks.rollbacks_benchmark --rows 100000 --rollbacks-percent 20
+"""
+
+import re
+import sys
+import time
+import argparse
+import datetime
+import tracemalloc
+from collections import deque
+from decimal import Decimal
+from typing import Callable, List, Set
+
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.trades_repo_csv_2 import RollbacksFilter
+
+WHEN = datetime.datetime(2020, 10, 20, 10, 30, 50)
+
+
+def make_rows(num_rows: int, rollbacks_percent: int) -> List[ReportRow]:
+    """Funding rows; every rollbacks_percent of them is rolled back by the row that follows"""
+
+    rows: List[ReportRow] = []
+    rollback_every = 100 // rollbacks_percent if rollbacks_percent else num_rows + 1
+    for transaction_id in range(1, num_rows + 1):
+        if transaction_id % rollback_every == 0:
+            comment = f"Rollback for transaction #{transaction_id - 1} 2020-10-21 10:30:50.000"
+        else:
+            comment = "14 shares ExD 2021-11-18 PD 2022-01-13 dividend GSK.NYSE 7.24 EUR (0.5168342 per share)"
+        rows.append(ReportRow(transaction_id, "TBA9999.001", "None", ReportRow.OperationType.FUNDING_WITHDRAWAL, WHEN, Decimal(1), "EUR", Decimal(1), comment))
+    return rows
+
+
+def filter_rollbacked_rows(rows: List[ReportRow]) -> List[ReportRow]:
+    """The former approach: pattern looked up on every comment, then the second pass builds the filtered list"""
+
+    transactions_to_remove: Set[int] = set()
+    for row in rows:
+        findings = re.findall(r"#\d+", row.comment)
+        if len(findings) == 1:
+            transactions_to_remove.add(int(findings[0][1:]))
+            transactions_to_remove.add(row.transaction_id)
+    return [row for row in rows if row.transaction_id not in transactions_to_remove]
+
+
+def rollbacks_filter(rows: List[ReportRow]) -> int:
+    rollbacks = RollbacksFilter()
+    deque(rollbacks.collect(rows), maxlen=0)  # in the repo, sorting consumes all the collected rows before yielding any
+    return sum(1 for _ in rollbacks.filter(rows))
+
+
+def measure(name: str, func: Callable[[List[ReportRow]], object], rows: List[ReportRow]) -> None:
+    start = time.perf_counter()
+    func(rows)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<24} {len(rows):>8} rows {elapsed:6.3f}s {elapsed / len(rows) * 1e9:6.0f} ns/row, peak {peak / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rollback filtering benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rollbacks-percent", type=int, default=20)
+    args = parser.parse_args(sys.argv[1:])
+
+    for num_rows in (args.rows, args.rows * 2, args.rows * 4):
+        rows = make_rows(num_rows, args.rollbacks_percent)
+        measure("findall + list rebuild", filter_rollbacked_rows, rows)
+        measure("RollbacksFilter", rollbacks_filter, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Synthetic Exante transaction report for benchmarks.
+The report is a valid trading history: every block of rows funds the account (with one funding rolled back), autoconverts some dollars to euro,
+buys a share on ARCA, has it moved to NASDAQ by corporate action, sells it there and receives a taxed dividend,
+so it can be fed not only to parsing but to the whole calculator. The report is deterministic: same num_rows, same lines.
+Like the real report, rows come newest first - in descending transaction id order.
+"""
+
+import sys
+import argparse
+import datetime
+from typing import Iterator, List, Tuple
+
+HEADER = '"Transaction ID"\t"Account ID"\t"Symbol ID"\t"Operation type"\t"When"\t"Sum"\t"Asset"\t"EUR equivalent"\t"Comment"\t"UUID"\t"Parent UUID"'
+SYMBOLS = [f"SYM{n:02}" for n in range(50)]
+ACCOUNT = "TBA0174.001"
+START = datetime.datetime(2019, 1, 2, 9, 0, 0)
+
+# operation type, symbol id, sum, asset, comment; in ascending transaction id order.
+# {bought} is the symbol on ARCA, {moved} the same symbol on NASDAQ, {rolled_back} transaction id of the row before
+_BLOCK: List[Tuple[str, str, str, str, str]] = [
+    ("FUNDING/WITHDRAWAL", "None", "2000.0", "USD", "None"),
+    ("FUNDING/WITHDRAWAL", "None", "100.0", "USD", "None"),
+    ("FUNDING/WITHDRAWAL", "None", "-100.0", "USD", "Rollback for transaction #{rolled_back}"),
+    ("AUTOCONVERSION", "{bought}", "9.0", "EUR", "None"),
+    ("AUTOCONVERSION", "{bought}", "-10.0", "USD", "None"),
+    ("TRADE", "{bought}", "10", "{bought}", "Buy"),
+    ("TRADE", "{bought}", "-1000.0", "USD", "Buy"),
+    ("COMMISSION", "{bought}", "-2.0", "USD", "Buy"),
+    ("CORPORATE ACTION", "{moved}", "10", "{moved}", "{bought} to {moved}"),
+    ("CORPORATE ACTION", "{bought}", "-10", "{bought}", "{bought} to {moved}"),
+    ("TRADE", "{moved}", "-10", "{moved}", "Sell"),
+    ("TRADE", "{moved}", "1100.0", "USD", "Sell"),
+    ("COMMISSION", "{moved}", "-2.0", "USD", "Sell"),
+    ("DIVIDEND", "{moved}", "5.0", "USD", "Dividend"),
+    ("TAX", "{moved}", "-0.75", "USD", "Dividend tax"),
+]
+ROWS_PER_BLOCK = len(_BLOCK)
+
+
+def synthetic_report_lines(num_rows: int) -> Iterator[str]:
+    """Header and about num_rows rows, rounded up to whole blocks"""
+
+    num_blocks = _num_blocks(num_rows)
+    yield HEADER
+    for block in reversed(range(num_blocks)):
+        symbol = SYMBOLS[block % len(SYMBOLS)]
+        names = {"bought": f"{symbol}.ARCA", "moved": f"{symbol}.NASDAQ"}
+        when = (START + datetime.timedelta(hours=block)).strftime("%Y-%m-%d %H:%M:%S")
+        for n in reversed(range(ROWS_PER_BLOCK)):
+            transaction_id = block * ROWS_PER_BLOCK + n + 1
+            fields = [field.format(rolled_back=transaction_id - 1, **names) for field in _BLOCK[n]]
+            operation_type, symbol_id, sum, asset, comment = fields
+            fields = [str(transaction_id), ACCOUNT, symbol_id, operation_type, when, sum, asset, sum, comment, f"uuid-{transaction_id}", "None"]
+            yield "\t".join(f'"{field}"' for field in fields)
+
+
+def synthetic_report_days(num_rows: int) -> Tuple[datetime.date, datetime.date]:
+    """First and last day of the report of num_rows rows, eg. to have quotes for"""
+
+    return START.date(), (START + datetime.timedelta(hours=_num_blocks(num_rows) - 1)).date()
+
+
+def _num_blocks(num_rows: int) -> int:
+    return -(-num_rows // ROWS_PER_BLOCK)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write synthetic Exante report")
+    parser.add_argument("filename")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(sys.argv[1:])
+
+    with open(args.filename, "w", encoding="utf-8") as f:
+        for line in synthetic_report_lines(args.rows):
+            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
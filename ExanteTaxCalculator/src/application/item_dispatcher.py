@@ -0,0 +1,30 @@
+from typing import Any, Callable, Dict, List, Type, TypeVar
+
+T = TypeVar("T")
+ItemHandler = Callable[[Any], None]
+
+
+class ItemDispatcher:
+    """
+    Routes TransactionItems to the handlers subscribed for their type, in subscription order.
+    Lookup is by exact item type - one dict access per item, no matter how many types are known.
+    Dispatching item of type nobody subscribed for is an error, so new transaction type is not silently skipped.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[type, List[ItemHandler]] = {}
+
+    def subscribe(self, item_type: Type[T], handler: Callable[[T], None]) -> None:
+        self._handlers.setdefault(item_type, []).append(handler)
+
+    def dispatch(self, item: Any) -> None:
+        handlers = self._handlers.get(type(item))
+        if handlers is None:
+            raise TypeError(f"Not implemented transaction type: {type(item)}")
+
+        for handler in handlers:
+            handler(item)
+
+    @property
+    def item_types(self) -> List[type]:
+        return list(self._handlers)
@@ -1,10 +1,11 @@
-from typing import Sequence, Dict, List, Tuple
+from typing import Callable, Iterable, Dict, List, Mapping, Tuple, Type, TypeVar, Optional
+from collections import Counter
+from datetime import datetime
 from decimal import Decimal
 from money import Money
-from copy import deepcopy
 
 from src.domain.profit_item import ProfitItem
-from src.domain.quotation.buy_sell_pair_pln_quotator import QuotesProviderProtocol
+from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol, CountingQuotesProviderProtocol
 from src.domain.wallet import Wallet
 from src.domain.transactions import *
 from src.domain.trading.buy_sell_fifo_matcher import BuySellFIFOMatcher
@@ -14,92 +15,229 @@ from src.domain.quotation.buy_sell_pair_pln import BuySellPairPLN
 from src.domain.quotation.buy_sell_pair_pln_quotator import BuySellPairPLNQuotator
 from src.domain.quotation.dividend_item_pln_quotator import DividendItemPLNQuotator
 from src.domain.quotation.tax_item_pln_quotator import TaxItemPLNQuotator
+from src.domain.quotation.quotation_plan import QuotationPlan, QuotesTable
+from src.domain.quotation.polish_banking_calendar import BankingCalendarProtocol
 from src.domain.tax_declaration.tax_declaration_numbers_calculator import TaxDeclarationNumbersCalculator
 from src.domain.reporting.trading_report import TradingReport
 from src.domain.reporting.trading_report_builder import TradingReportBuilder
 from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from src.application.item_dispatcher import ItemDispatcher, ItemHandler
+from src.application.trader_stats import TraderStats
+from src.infrastructure.trader_snapshot import TraderSnapshot
+from src.infrastructure.report_prefix_digest import ReportPrefix
+from src.infrastructure.errors import SnapshotMismatchError
+
+T = TypeVar("T")
 
 
 class Trader:
-    def __init__(self, quotes_provider: QuotesProviderProtocol, tax_percentage: Decimal) -> None:
+    def __init__(
+        self, quotes_provider: QuotesProviderProtocol, tax_percentage: Decimal, calendar: Optional[BankingCalendarProtocol] = None, record_wallet_history: bool = False
+    ) -> None:
+        """record_wallet_history: remember wallet changes, for holdings_at"""
         self._quotes_provider = quotes_provider
+        self._calendar = calendar
         self._tax_calculator = TaxDeclarationNumbersCalculator(tax_percentage)
-        self._wallet = Wallet()
+        self._record_wallet_history = record_wallet_history
+        self._wallet = Wallet(record_history=record_wallet_history)
         self._report: TradingReport
+        self._reports: Dict[int, TradingReport] = {}
+        self._snapshot: Optional[TraderSnapshot] = None
+        self._subscribers: List[Tuple[type, ItemHandler]] = []
+        self._stats = TraderStats()
+
+    def subscribe(self, item_type: Type[T], handler: Callable[[T], None]) -> None:
+        """
+        Extra consumer of the traded items of given type, eg. statistics or export.
+        Handlers are called in subscription order, after the wallet, the matcher and the PIT38 numbers collectors
+        """
+        self._subscribers.append((item_type, handler))
+
+    def trade_items(self, report_csv_lines: Iterable[str], year: int, snapshot: Optional[TraderSnapshot] = None) -> None:
+        """
+        snapshot: state at the end of some previous year, see: Trader.snapshot.
+        With snapshot, only the report items after the snapshot are traded;
+        the report rows up to the snapshot must be the ones the snapshot resulted from, or SnapshotMismatchError is raised.
+        """
+
+        if snapshot is not None and snapshot.year >= year:
+            raise ValueError(f"Snapshot must be from before the tax year {year}, got from: {snapshot.year}")
+
+        self._stats = TraderStats()
+        repo = TradesRepoCSV2()
+        prefix_years = [year] if snapshot is None else [snapshot.year, year]
+        with self._stats.timer("load report"):
+            repo.load(report_csv_lines=report_csv_lines, prefix_years=prefix_years)
+        items = repo.items
+        self._count_loaded(repo, items)
+        prefixes = repo.prefixes
+
+        if snapshot is None:
+            matcher = BuySellFIFOMatcher()
+            first_item = 0
+        else:
+            self._check_snapshot(snapshot, prefixes[snapshot.year])
+            self._wallet = Wallet(snapshot.assets, record_history=self._record_wallet_history)  # history starts at the snapshot
+            matcher = BuySellFIFOMatcher.from_open_lots(snapshot.open_lots)
+            first_item = snapshot.report_prefix.num_items
+
+        self._snapshot = None
+        buy_sell_pairs, received_dividends, paid_dividend_taxes = self._trade(items, first_item, matcher, prefixes[year])
+        self._report = self._build_reports(buy_sell_pairs, received_dividends, paid_dividend_taxes, [year])[year]
+        self._reports = {year: self._report}
+
+    def trade_all_years(self, report_csv_lines: Iterable[str]) -> None:
+        """
+        Trade the whole history once and build report for every year the report spans, see: Trader.reports.
+        Same as trade_items for each year, but the report is parsed, traded and quoted just once
+        """
 
-    def trade_items(self, report_csv_lines: Sequence[str], year: int) -> None:
+        self._stats = TraderStats()
         repo = TradesRepoCSV2()
-        repo.load(report_csv_lines=report_csv_lines)
-        matcher = BuySellFIFOMatcher()
+        with self._stats.timer("load report"):
+            repo.load(report_csv_lines=report_csv_lines)
+        items = repo.items
+        self._count_loaded(repo, items)
+
+        self._snapshot = None
+        buy_sell_pairs, received_dividends, paid_dividend_taxes = self._trade(items, 0, BuySellFIFOMatcher())
+        years = range(min(item.date.year for item in items), max(item.date.year for item in items) + 1) if items else range(0)
+        self._reports = self._build_reports(buy_sell_pairs, received_dividends, paid_dividend_taxes, years)
+
+    def _trade(
+        self, items: List[TransactionItem], first_item: int, matcher: BuySellFIFOMatcher, year_end: Optional[ReportPrefix] = None
+    ) -> Tuple[List[BuySellPair], List[DividendItem], List[TaxItem]]:
+        """
+        Trade items[first_item:] and collect what generates numbers for PIT38, of all the years.
+        year_end: the tax year prefix of the items; the snapshot is taken there
+        """
+
         received_dividends: List[DividendItem] = []
         paid_dividend_taxes: List[TaxItem] = []
 
-        for i, item in enumerate(repo.items):
-            # print(i, item)
-            if isinstance(item, FundingItem):
-                self._wallet.fund(item)
-            elif isinstance(item, ExchangeItem):
-                self._wallet.exchange(item)
-            elif isinstance(item, BuyItem):
-                self._wallet.buy(item)
-                matcher.buy(item)
-            elif isinstance(item, SellItem):  # generates numbers for PIT38 - check year here
-                self._wallet.sell(item)
-                if item.date.year == year:
-                    matcher.sell(item)
-            elif isinstance(item, DividendItem):  # generates numbers for PIT38 - check year here
-                self._wallet.dividend(item)
-                if item.date.year == year:
-                    received_dividends.append(item)
-            elif isinstance(item, TaxItem):  # generates numbers for PIT38 - check year here
-                self._wallet.tax(item)
-                if item.date.year == year:
-                    paid_dividend_taxes.append(item)
-            elif isinstance(item, IssuanceFeeItem):
-                self._wallet.issuance_fee(item)
-            elif isinstance(item, CorporateActionItem):
-                self._wallet.corporate_action(item)
-                matcher.corporate_action(item)
-            elif isinstance(item, StockSplitItem):
-                self._wallet.stock_split(item)
-                matcher.stock_split(item)
-            elif isinstance(item, WithdrawalItem):
-                self._wallet.withdraw(item)
-            elif isinstance(item, AutoConversionItem):
-                self._wallet.autoconversion(item)
-                # in 2023 report it turned out autoconversion can be a standalone transaction.
-                # before it was:
-                # raise TypeError(f"Autoconversion is not expected to be a standalone transaction but so it happened: {type(item)}")
-            elif isinstance(item, FeeItem):
-                self._wallet.fee(item)
-            else:
-                raise TypeError(f"Not implemented transaction type: {type(item)}")
+        # wallet goes first: it validates the item before anything else takes it into account
+        dispatcher = ItemDispatcher()
+        self.subscribe_wallet(dispatcher, self._wallet)
+        self.subscribe_matcher(dispatcher, matcher)
+        dispatcher.subscribe(DividendItem, received_dividends.append)  # generates numbers for PIT38
+        dispatcher.subscribe(TaxItem, paid_dividend_taxes.append)  # generates numbers for PIT38
+        for item_type, handler in self._subscribers:
+            dispatcher.subscribe(item_type, handler)
+
+        with self._stats.timer("trade"):
+            for i in range(first_item, len(items)):
+                if year_end is not None and i == year_end.num_items:
+                    # first item after the tax year; the report goes past the year, so the year is complete
+                    self._snapshot = TraderSnapshot(report_prefix=year_end, assets=dict(self._wallet.assets), open_lots=matcher.open_lots)
+
+                dispatcher.dispatch(items[i])
+        self._stats.count("items traded", max(len(items) - first_item, 0))
+        self._stats.count("lots scanned", matcher.num_lots_scanned)
+
+        return matcher.buy_sell_pairs, received_dividends, paid_dividend_taxes
+
+    @staticmethod
+    def subscribe_wallet(dispatcher: ItemDispatcher, wallet: Wallet) -> None:
+        """Route the items to the wallet, the way Trader does"""
+        dispatcher.subscribe(FundingItem, wallet.fund)
+        dispatcher.subscribe(WithdrawalItem, wallet.withdraw)
+        dispatcher.subscribe(ExchangeItem, wallet.exchange)
+        dispatcher.subscribe(BuyItem, wallet.buy)
+        dispatcher.subscribe(SellItem, wallet.sell)
+        dispatcher.subscribe(DividendItem, wallet.dividend)
+        dispatcher.subscribe(TaxItem, wallet.tax)
+        dispatcher.subscribe(IssuanceFeeItem, wallet.issuance_fee)
+        dispatcher.subscribe(CorporateActionItem, wallet.corporate_action)
+        dispatcher.subscribe(StockSplitItem, wallet.stock_split)
+        # in 2023 report it turned out autoconversion can be a standalone transaction.
+        # before it was:
+        # raise TypeError(f"Autoconversion is not expected to be a standalone transaction but so it happened: {type(item)}")
+        dispatcher.subscribe(AutoConversionItem, wallet.autoconversion)
+        dispatcher.subscribe(FeeItem, wallet.fee)
+
+    @staticmethod
+    def subscribe_matcher(dispatcher: ItemDispatcher, matcher: BuySellFIFOMatcher) -> None:
+        """Route the items to the FIFO matcher, the way Trader does; only buys, sells, corporate actions and splits"""
+        dispatcher.subscribe(BuyItem, matcher.buy)
+        dispatcher.subscribe(SellItem, matcher.sell)  # sells of every year deplete the FIFO lots
+        dispatcher.subscribe(CorporateActionItem, matcher.corporate_action)
+        dispatcher.subscribe(StockSplitItem, matcher.stock_split)
 
+    def _build_reports(
+        self, buy_sell_pairs: List[BuySellPair], received_dividends: List[DividendItem], paid_dividend_taxes: List[TaxItem], years: Iterable[int]
+    ) -> Dict[int, TradingReport]:
+        """Report for each of the years; pair belongs to the year of its sell, dividend and tax to the year they were paid"""
+
+        pairs_by_year: Dict[int, List[BuySellPair]] = {year: [] for year in years}
+        dividends_by_year: Dict[int, List[DividendItem]] = {year: [] for year in pairs_by_year}
+        taxes_by_year: Dict[int, List[TaxItem]] = {year: [] for year in pairs_by_year}
+        for pair in buy_sell_pairs:
+            if pair.sell.date.year in pairs_by_year:
+                pairs_by_year[pair.sell.date.year].append(pair)
+        for dividend in received_dividends:
+            if dividend.date.year in dividends_by_year:
+                dividends_by_year[dividend.date.year].append(dividend)
+        for tax in paid_dividend_taxes:
+            if tax.date.year in taxes_by_year:
+                taxes_by_year[tax.date.year].append(tax)
+
+        # collect every quote needed, for all the years, and resolve them all in one batch
+        provider_counters = self._quotes_provider_counters()
+        with self._stats.timer("quote"):
+            plan = QuotationPlan()
+            for year in pairs_by_year:
+                plan.add_buy_sell_pairs(pairs_by_year[year])
+                plan.add_dividends(dividends_by_year[year])
+                plan.add_taxes(taxes_by_year[year])
+            quotes = plan.resolve(self._quotes_provider, self._calendar)
+        self._stats.count("quotes needed", len(plan))
+        self._stats.count_all({name: n - provider_counters.get(name, 0) for name, n in self._quotes_provider_counters().items()})
+
+        # from here on, quoting is just lookup in resolved quotes
+        with self._stats.timer("build reports"):
+            return {year: self._build_report(pairs_by_year[year], dividends_by_year[year], taxes_by_year[year], quotes) for year in pairs_by_year}
+
+    def _quotes_provider_counters(self) -> Mapping[str, int]:
+        """Counters of the quotes provider so far, if it counts its work"""
+
+        if isinstance(self._quotes_provider, CountingQuotesProviderProtocol):
+            return dict(self._quotes_provider.counters)
+        return {}
+
+    def _count_loaded(self, repo: TradesRepoCSV2, items: List[TransactionItem]) -> None:
+        row_counts = repo.row_counts
+        self._stats.count("rows parsed", row_counts.parsed)
+        self._stats.count("rows rolled back", row_counts.rolled_back)
+        self._stats.count("items built", row_counts.items)
+        for item_type, n in sorted(Counter(type(item).__name__ for item in items).items()):
+            self._stats.count(f"items built: {item_type}", n)
+
+    def _build_report(self, buy_sell_pairs: List[BuySellPair], received_dividends: List[DividendItem], paid_dividend_taxes: List[TaxItem], quotes: QuotesTable) -> TradingReport:
         # money flow generated from buy/sell pairs in PLN
-        money_flow_pln, buy_amounts, sell_amounts = self._get_buys_sells(matcher.buy_sell_pairs)
+        money_flow_pln, buy_amounts, sell_amounts = self._get_buys_sells(buy_sell_pairs, quotes)
 
         # received dividends in PLN
-        dividend_quotator = DividendItemPLNQuotator(self._quotes_provider)
+        dividend_quotator = DividendItemPLNQuotator(quotes)
         dividend_items_pln = [dividend_quotator.quote(item) for item in received_dividends]
         dividend_amounts = [item.received_dividend_pln for item in dividend_items_pln]
 
         # paid dividend taxes in PLN
-        dividend_tax_quotator = TaxItemPLNQuotator(self._quotes_provider)
+        dividend_tax_quotator = TaxItemPLNQuotator(quotes)
         dividend_tax_items_pln = [dividend_tax_quotator.quote(item) for item in paid_dividend_taxes]  # collect standalone taxes. Note: all reported taxes result from dividends, but it happens the tax is reported with delay and cant be matched with it's dividend
         dividend_tax_items_pln += [item.paid_tax_pln for item in dividend_items_pln if item.paid_tax_pln is not None]  # add taxes reported together with dividends
         dividend_tax_amounts = [item.paid_tax_pln for item in dividend_tax_items_pln]
 
         results = self._tax_calculator.calc_tax_declaration_numbers(buys=buy_amounts, sells=sell_amounts, dividends=dividend_amounts, dividend_taxes=dividend_tax_amounts)
 
-        self._report = TradingReportBuilder.build(
+        return TradingReportBuilder.build(
             profits=money_flow_pln,
             dividends=dividend_items_pln,
             dividend_taxes=dividend_tax_items_pln,
             results=results,
         )
 
-    def _get_buys_sells(self, buy_sell_pairs: List[BuySellPair]) -> Tuple[List[ProfitItem], List[Decimal], List[Decimal]]:
-        buy_sell_item_quotator = BuySellPairPLNQuotator(self._quotes_provider)
+    def _get_buys_sells(self, buy_sell_pairs: List[BuySellPair], quotes: QuotesTable) -> Tuple[List[ProfitItem], List[Decimal], List[Decimal]]:
+        buy_sell_item_quotator = BuySellPairPLNQuotator(quotes)
         buy_sell_pairs_pln = [buy_sell_item_quotator.quote(item) for item in buy_sell_pairs]
         money_flow_calculator = BuySellMoneyFlowCalculator()
         money_flow_pln = [money_flow_calculator.calc_money_flow(item) for item in buy_sell_pairs_pln]
@@ -107,10 +245,51 @@ class Trader:
         sell_values = [item.received.amount for item in money_flow_pln]
         return money_flow_pln, buy_values, sell_values
 
+    @staticmethod
+    def _check_snapshot(snapshot: TraderSnapshot, report_prefix: ReportPrefix) -> None:
+        if report_prefix != snapshot.report_prefix:
+            raise SnapshotMismatchError(
+                f"Snapshot from the end of {snapshot.year} doesn't match the report: "
+                f"snapshot has {snapshot.report_prefix.num_items} items up to transaction {snapshot.report_prefix.last_transaction_id}, "
+                f"report has {report_prefix.num_items} items up to transaction {report_prefix.last_transaction_id}"
+                + (", with different rows" if report_prefix.num_items == snapshot.report_prefix.num_items else "")
+            )
+
+    @property
+    def snapshot(self) -> Optional[TraderSnapshot]:
+        """State at the end of the tax year of the last trade_items; None if the report doesn't go past that year, so the year may not be complete yet"""
+        return self._snapshot
+
+    @property
+    def stats(self) -> TraderStats:
+        """Where the time of the last trade_items or trade_all_years went, and how much work was done; see: calculator --stats"""
+        return self._stats
+
     @property
     def owned_asssets(self) -> Dict[str, Decimal]:
-        return self._wallet.assets_copy
+        """Copy of the assets, not changed by further trading"""
+        return dict(self._wallet.assets)
+
+    def holdings_at(self, when: datetime) -> Dict[str, Decimal]:
+        """Assets held at given moment; needs record_wallet_history"""
+        return self._wallet.snapshot_at(when)
 
     @property
     def report(self) -> TradingReport:
-        return deepcopy(self._report)
+        """Report for the tax year of the last trade_items"""
+        return self._copy_report(self._report)
+
+    @property
+    def reports(self) -> Dict[int, TradingReport]:
+        """Reports by year, of the last trade_all_years; or just the tax year of the last trade_items"""
+        return {year: self._copy_report(report) for year, report in self._reports.items()}
+
+    @staticmethod
+    def _copy_report(report: TradingReport) -> TradingReport:
+        # the report items are immutable, only the containers need copying
+        return TradingReport(
+            dividends=list(report.dividends),
+            dividend_taxes=list(report.dividend_taxes),
+            trades_by_asset={asset: list(trades) for asset, trades in report.trades_by_asset.items()},
+            results=report.results,
+        )
@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Mapping
+
+
+class TraderStats:
+    """
+    Where the time of a Trader run went: seconds spent in each stage and counts of the work done, eg. rows parsed or NBP fetches.
+    Timers wrap whole stages and counters are added at stage ends, never per item, so the stats are always on.
+    Timing the same stage again adds up.
+    """
+
+    def __init__(self) -> None:
+        self._seconds: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._seconds[name] = self._seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1) -> None:
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def count_all(self, counters: Mapping[str, int]) -> None:
+        for name, n in counters.items():
+            self.count(name, n)
+
+    @property
+    def seconds(self) -> Dict[str, float]:
+        """Seconds by stage, in the order the stages were first entered"""
+        return dict(self._seconds)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def __str__(self) -> str:
+        format_item = lambda k, v: "{: <36}: {}".format(k, v)
+        lines = [format_item(name, f"{seconds:.3f}s") for name, seconds in self._seconds.items()]
+        lines += [format_item(name, n) for name, n in self._counters.items()]
+        return "\n".join(lines)
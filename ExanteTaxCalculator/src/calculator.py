@@ -1,14 +1,25 @@
+import os
 import sys
 import logging
+import argparse
 import datetime
+import cProfile
 import requests
 from http import HTTPStatus
-from typing import List, Tuple, Optional
+from typing import Callable, List, Sequence, Tuple, Optional
 from decimal import Decimal
-from functools import lru_cache
+from functools import partial
 
 from src.domain.currency import Currency
+from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
+from src.domain.quotation.polish_banking_calendar import PolishBankingCalendar
 from src.domain.quotation.nbp.quotator_nbp import QuotatorNBP
+from src.infrastructure.quotes_store_sqlite import QuotesStoreSQLite, default_cache_dir
+from src.infrastructure.retrying_fetcher import RetryingFetcher
+from src.infrastructure.nbp_archive_file import load_archive
+from src.infrastructure.report_csv_file import ReportCSVFile
+from src.infrastructure.trader_snapshot import find_snapshot_before, read_snapshot, save_snapshot, snapshot_filename
+from src.infrastructure.errors import CorruptedSnapshotError, SnapshotMismatchError
 from src.domain.reporting.trading_report_printer import TradingReportPrinter
 from src.domain.reporting.assets_printer import AssetPrettyPrinter
 from src.application.trader import Trader
@@ -18,6 +29,12 @@ logging.basicConfig(level=logging.INFO)
 # Stock market profit tax in Poland as of 2021
 TAX_PERCENTAGE = Decimal("19.0")
 
+# How many concurrent connections to NBP API when fetching quotes in batch
+NBP_WORKERS = 4
+
+# Loggers tracing every report row and item on DEBUG level, see: --trace-rows
+ROW_TRACE_LOGGERS = ["src.infrastructure.trades_repo_csv_2", "src.infrastructure.builders", "src.domain.trading"]
+
 
 class QuotesProviderStub:
     """ Stub the quotes provider to avoid hitting NBP API when manual testing """
@@ -31,25 +48,18 @@ class QuotesProviderStub:
         raise ValueError(f"Expected USD or SGD, got: {currency}")
 
 
-@lru_cache
 def url_fetch(url: str) -> Tuple[str, HTTPStatus]:
-    """ Return: (http response body, http response code) """
+    """
+    Return: (http response body, http response code)
+    Not cached: QuotatorNBP store already fetches every quote once, and RetryingFetcher must reach NBP on every retry.
+    """
     try:
-        r = requests.get(url)
+        r = requests.get(url, timeout=30)
         return r.text, HTTPStatus(r.status_code)
     except requests.exceptions.HTTPError as err:
         return str(err), HTTPStatus(err.response.status_code)
 
 
-def csv_read_utf8(filename: str) -> List[str]:
-    """ Read csv file lines """
-    with open(filename) as f:
-        lines = f.readlines()
-    lines = [x.strip() for x in lines]
-    lines = [x for x in lines if not x.startswith('#')] # skip commented-out lines
-    return lines
-
-
 def print_trader_outcomes(trader: Trader) -> None:
     """ Print all the dividends, taxes, buy-sells that produced owned assets and transactions totals """
 
@@ -63,7 +73,71 @@ def print_trader_outcomes(trader: Trader) -> None:
     print(AssetPrettyPrinter(trader.owned_asssets))
 
 
-def run_calculator(csv_name: str, year: int) -> None:
+def print_all_years_outcomes(trader: Trader) -> None:
+    """ Print the outcomes of each year, then the currently owned assets """
+
+    printer = TradingReportPrinter()
+
+    for year, report in sorted(trader.reports.items()):
+        print()
+        print(f"ROK {year}:")
+        print(printer.to_text(report))
+
+    print()
+    print("AKTYWA:")
+    print(AssetPrettyPrinter(trader.owned_asssets))
+
+
+def print_holdings(trader: Trader, days: Sequence[datetime.date]) -> None:
+    """ Print the assets held at the end of each of the days """
+
+    for day in days:
+        print()
+        print(f"AKTYWA NA {day}:")
+        print(AssetPrettyPrinter(trader.holdings_at(end_of_day(day))))
+
+
+def print_stats(trader: Trader) -> None:
+    """ Print where the time of the calculation went and how much work was done """
+
+    print()
+    print("STATYSTYKI:")
+    print(trader.stats)
+
+
+def end_of_day(day: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(day, datetime.time.max)
+
+
+def enable_row_trace() -> None:
+    """ Log every report row on its way to TransactionItem, and the row counts of each stage; slow for large reports """
+    for name in ROW_TRACE_LOGGERS:
+        logging.getLogger(name).setLevel(logging.DEBUG)
+
+
+def run_profiled(profile_filename: str, run: Callable[[], None]) -> None:
+    """ Run under cProfile and dump the profile to file, also when the run fails; read it with: python -m pstats FILE """
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run)
+    finally:
+        profiler.dump_stats(profile_filename)
+        logging.info(f"Profile written to {profile_filename}")
+
+
+def run_calculator(
+    csv_name: str,
+    year: Optional[int],
+    cache_dir: Optional[str] = None,
+    nbp_workers: int = NBP_WORKERS,
+    calendar_overrides: Optional[str] = None,
+    quotes_archive: Optional[str] = None,
+    snapshot_dir: Optional[str] = None,
+    holdings_at: Sequence[datetime.date] = (),
+    jobs: int = 1,
+    show_stats: bool = False,
+) -> None:
     """
     Calculator needs full transaction history from all the years until now,
     because it validates if transactions are valid (for buy - if we have enough money in wallet to successfuly buy)
@@ -71,23 +145,151 @@ def run_calculator(csv_name: str, year: int) -> None:
     1. we buy 100 x PHYS in 2020
     2. we sell 100x PHYS in 2021
     the calculator needs to know the exact date of buy to get PLN quotation from previous working day to calculate the transaction cost
+
+    NBP quotes are remembered in cache_dir, so next runs don't need to download them again. No cache_dir - no remembering.
+    calendar_overrides file corrects the built-in polish banking calendar, eg. for one-off public holidays.
+    quotes_archive is local NBP archive built with exante-nbp-archive; with archive there is no NBP API access at all.
+    snapshot_dir keeps the trader state at the end of each calculated year, if the report goes past that year;
+    the next year calculation starts from there instead of replaying the whole history. No snapshot_dir - full replay.
+    year None calculates all the years the report spans in single pass; snapshots are not used then.
+    holdings_at days get the assets held at the end of each of them printed; that needs full history, so no snapshot_dir.
+    jobs > 1 parses the report CSV in that many processes, for very large reports.
+    show_stats prints the time spent in each calculation stage and the work done, eg. rows parsed or NBP fetches.
     """
 
-    quotes_provider = QuotatorNBP(fetcher=url_fetch)
+    calendar = load_banking_calendar(calendar_overrides)
+
+    if quotes_archive is not None:
+        _run_calculator(csv_name, year, load_archive(quotes_archive), calendar, snapshot_dir, holdings_at, jobs, show_stats)
+        return
+
+    fetcher = RetryingFetcher(url_fetch)
+
+    if cache_dir is None:
+        _run_calculator(csv_name, year, QuotatorNBP(fetcher=fetcher, max_workers=nbp_workers), calendar, snapshot_dir, holdings_at, jobs, show_stats)
+        return
+
+    with QuotesStoreSQLite(os.path.join(cache_dir, "nbp_quotes.sqlite3")) as store:
+        _run_calculator(csv_name, year, QuotatorNBP(fetcher=fetcher, store=store, max_workers=nbp_workers), calendar, snapshot_dir, holdings_at, jobs, show_stats)
+
+
+def load_banking_calendar(overrides_filename: Optional[str]) -> PolishBankingCalendar:
+    if overrides_filename is None:
+        return PolishBankingCalendar()
+
+    with open(overrides_filename, encoding="utf-8") as f:
+        return PolishBankingCalendar.from_overrides(f)
+
+
+def _run_calculator(
+    csv_name: str,
+    year: Optional[int],
+    quotes_provider: QuotesProviderProtocol,
+    calendar: PolishBankingCalendar,
+    snapshot_dir: Optional[str] = None,
+    holdings_at: Sequence[datetime.date] = (),
+    jobs: int = 1,
+    show_stats: bool = False,
+) -> None:
     # quotes_provider = QuotesProviderStub()
-    csv_report_lines = csv_read_utf8(csv_name)
-    trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE)
-    trader.trade_items(csv_report_lines, year)
+    if holdings_at and snapshot_dir is not None:
+        raise ValueError("Holdings at given days need full report history, they can't be combined with snapshots")
+
+    record_wallet_history = bool(holdings_at)
+    if year is None:
+        trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE, calendar=calendar, record_wallet_history=record_wallet_history)
+        trader.trade_all_years(ReportCSVFile(csv_name, jobs))
+        print_all_years_outcomes(trader)
+        print_holdings(trader, holdings_at)
+        if show_stats:
+            print_stats(trader)
+        return
+
+    snapshot_trader = _trade_from_snapshot(csv_name, year, quotes_provider, calendar, snapshot_dir, jobs) if snapshot_dir is not None else None
+    if snapshot_trader is not None:
+        trader = snapshot_trader
+    else:
+        trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE, calendar=calendar, record_wallet_history=record_wallet_history)
+        trader.trade_items(ReportCSVFile(csv_name, jobs), year)
+
+    if snapshot_dir is not None and trader.snapshot is not None:
+        save_snapshot(trader.snapshot, snapshot_filename(snapshot_dir, year))
 
     print_trader_outcomes(trader)
+    print_holdings(trader, holdings_at)
+    if show_stats:
+        print_stats(trader)
+
+
+def _trade_from_snapshot(csv_name: str, year: int, quotes_provider: QuotesProviderProtocol, calendar: PolishBankingCalendar, snapshot_dir: str, jobs: int = 1) -> Optional[Trader]:
+    """ Return: trader continuing from the latest snapshot before the year, None if there is no usable snapshot """
+
+    snapshot_name = find_snapshot_before(snapshot_dir, year)
+    if snapshot_name is None:
+        return None
+
+    trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE, calendar=calendar)
+    try:
+        snapshot = read_snapshot(snapshot_name)
+        trader.trade_items(ReportCSVFile(csv_name, jobs), year, snapshot)
+    except (CorruptedSnapshotError, SnapshotMismatchError) as e:
+        logging.warning(f"Not using snapshot {snapshot_name}, replaying full report history instead: {e}")
+        return None
+
+    logging.info(f"Continued from snapshot {snapshot_name}")
+    return trader
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="exante-calculator", description="Exante tax calculator for polish tax declaration PIT-38")
+    parser.add_argument("csv_name", help="Exante transaction report CSV, with full transaction history")
+    parser.add_argument("year", type=int, nargs="?", help="tax year to calculate, eg. 2020")
+    parser.add_argument("--all-years", action="store_true", help="calculate every year of the report in single pass, instead of single year")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), help="where to remember downloaded NBP quotes (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="don't remember downloaded NBP quotes between runs")
+    parser.add_argument("--nbp-workers", type=int, default=NBP_WORKERS, help="concurrent connections to NBP API (default: %(default)s)")
+    parser.add_argument("--quotes-archive", metavar="FILE", help="take NBP quotes from local archive instead of NBP API, see: exante-nbp-archive")
+    parser.add_argument("--calendar-overrides", metavar="FILE", help="extra banking holidays/working days, lines as: 2018-11-12 holiday")
+    parser.add_argument("--snapshot-dir", metavar="DIR", help="keep trader state at the end of calculated years here, and continue from it in the next years")
+    parser.add_argument("--holdings-at", type=datetime.date.fromisoformat, nargs="+", default=[], metavar="DAY", help="print assets held at the end of given days, eg. 2021-12-31")
+    parser.add_argument("--trace-rows", action="store_true", help="log every report row as it is processed, for debugging the report parsing")
+    parser.add_argument("--jobs", type=int, default=1, help="parse the report CSV in that many processes, for very large reports (default: %(default)s)")
+    parser.add_argument("--stats", action="store_true", help="print time spent in each calculation stage and counts of rows, items, quotes, NBP fetches and HTTP calls")
+    parser.add_argument("--profile", metavar="FILE", help="profile the calculation with cProfile and dump the stats to file, read it with: python -m pstats FILE")
+    args = parser.parse_args(argv)
+    if args.all_years == (args.year is not None):
+        parser.error("give either tax year or --all-years")
+    if args.all_years and args.snapshot_dir is not None:
+        parser.error("--snapshot-dir is for single year calculation, not --all-years")
+    if args.holdings_at and args.snapshot_dir is not None:
+        parser.error("--holdings-at needs full report history, it can't be combined with --snapshot-dir")
+    if args.jobs < 1:
+        parser.error("--jobs should be >= 1")
+    return args
 
 
 def main() -> None:
     " Entry point for exante-calculator command installed with: pip install ."
-    if len(sys.argv) < 3:
-        print("Please provide transaction report CSV and year as parameters")
+    args = parse_args(sys.argv[1:])
+    if args.trace_rows:
+        enable_row_trace()
+    run = partial(
+        run_calculator,
+        args.csv_name,
+        args.year,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        nbp_workers=args.nbp_workers,
+        calendar_overrides=args.calendar_overrides,
+        quotes_archive=args.quotes_archive,
+        snapshot_dir=args.snapshot_dir,
+        holdings_at=args.holdings_at,
+        jobs=args.jobs,
+        show_stats=args.stats,
+    )
+    if args.profile is None:
+        run()
     else:
-        run_calculator(sys.argv[1], int(sys.argv[2]))
+        run_profiled(args.profile, run)
 
 
 if __name__ == "__main__":
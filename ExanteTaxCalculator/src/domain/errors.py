@@ -7,4 +7,8 @@ class InsufficientAssetError(Exception):
 
 
 class QuotationError(Exception):
+    pass
+
+
+class AmbiguousStockExchangeError(ValueError):
     pass
\ No newline at end of file
@@ -1,12 +1,11 @@
 from src.domain.trading.buy_sell_pair import BuySellPair
 from src.domain.quotation.buy_sell_pair_pln import BuySellPairPLN
-from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
-from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.day_before_quotator_protocol import DayBeforeQuotatorProtocol
 
 
 class BuySellPairPLNQuotator:
-    def __init__(self, quotes_provider: QuotesProviderProtocol) -> None:
-        self._quotator = WorkingDayBeforeQuotator(quotes_provider)
+    def __init__(self, quotator: DayBeforeQuotatorProtocol) -> None:
+        self._quotator = quotator
 
     def quote(self, item: BuySellPair) -> BuySellPairPLN:
         buy_quote_pln, buy_quotation_date = self._quotator.quote(item.buy.paid.currency, item.buy.date)
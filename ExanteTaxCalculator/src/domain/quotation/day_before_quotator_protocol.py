@@ -0,0 +1,11 @@
+import datetime
+from typing import Protocol, Tuple
+from decimal import Decimal
+
+
+class DayBeforeQuotatorProtocol(Protocol):
+    """Finds quotation according to D-1 rule - last working day"""
+
+    def quote(self, currency: str, for_date: datetime.datetime) -> Tuple[Decimal, datetime.date]:
+        """result: [currency/PLN ratio, quotation date]"""
+        pass
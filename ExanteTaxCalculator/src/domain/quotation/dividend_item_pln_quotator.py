@@ -1,14 +1,13 @@
 from src.domain.transactions.dividend_item import DividendItem
 from src.domain.quotation.dividend_item_pln import DividendItemPLN
-from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
-from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.day_before_quotator_protocol import DayBeforeQuotatorProtocol
 from src.domain.quotation.tax_item_pln_quotator import TaxItemPLNQuotator
 
 
 class DividendItemPLNQuotator:
-    def __init__(self, quotes_provider: QuotesProviderProtocol) -> None:
-        self._quotator = WorkingDayBeforeQuotator(quotes_provider)
-        self._tax_item_quotator = TaxItemPLNQuotator(quotes_provider)
+    def __init__(self, quotator: DayBeforeQuotatorProtocol) -> None:
+        self._quotator = quotator
+        self._tax_item_quotator = TaxItemPLNQuotator(quotator)
 
     def quote(self, item: DividendItem) -> DividendItemPLN:
         dividend_quote_pln, dividend_quotation_date = self._quotator.quote(item.received_dividend.currency, item.date)
@@ -1,22 +1,30 @@
 import json
+import bisect
 import logging
 import datetime
 from http import HTTPStatus
-from typing import Optional, Callable, Tuple, Mapping, Any
+from collections import defaultdict
+from typing import Optional, Callable, Tuple, Mapping, Any, Iterable, Iterator, List, Dict, Set, TypeVar, Protocol, runtime_checkable
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
 from src.domain.currency import Currency
 from src.domain.errors import QuotationError
+from src.domain.quotation.quotes_store_protocol import QuotesStoreProtocol
+from src.domain.quotation.quotes_store_memory import QuotesStoreMemory
 
 # http://api.nbp.pl/#kursyWalut
 # curl http://api.nbp.pl/api/exchangerates/rates/a/usd/last/30
 # curl http://api.nbp.pl/api/exchangerates/rates/a/usd/2021-01-15
+# curl http://api.nbp.pl/api/exchangerates/rates/a/usd/2021-01-01/2021-03-31
 
 
 # curl http://api.nbp.pl/api/exchangerates/rates/a/usd/2021-01-16
 # 404 NotFound - Not Found - Brak danych
 
 
+T = TypeVar("T")
+
 UrlFetcher = Callable[[str], Tuple[str, HTTPStatus]]
 """ 
 UrlFetcher is abstraction over http.get(url).
@@ -38,30 +46,205 @@ def url_fetch(url: str) -> Tuple[str, HTTPStatus]:
 """
 
 
+@runtime_checkable
+class CountingUrlFetcherProtocol(Protocol):
+    """UrlFetcher that counts the fetches it actually made, retries included, eg. RetryingFetcher"""
+
+    def __call__(self, url: str) -> Tuple[str, HTTPStatus]:
+        pass
+
+    @property
+    def num_calls(self) -> int:
+        pass
+
+
 class QuotatorNBP:
     """
     Get average currency/PLN quotes from NBP.
     API: http://api.nbp.pl/#kursyWalut
+    Store remembers the NBP answers, so every (currency, day) is fetched at most once.
+    Prefetch gets whole date ranges in single requests, instead of asking NBP day by day.
+    Batch requests are sent concurrently over max_workers connections; the fetcher must be thread-safe then.
+    Lookups, store hits and misses and NBP fetches are counted, see: counters.
     """
 
-    URL = "http://api.nbp.pl/api/exchangerates/rates/a/{currency}/{date}"  # table A for average prices, currency format as "USD", date as "2020-03-23"
+    API_URL = "http://api.nbp.pl/api/exchangerates/rates/a"  # table A for average prices
+    URL = "{api_url}/{currency}/{date}"  # currency format as "USD", date as "2020-03-23"
+    RANGE_URL = "{api_url}/{currency}/{start_date}/{end_date}"  # same as URL but for all days in range
+    MAX_RANGE_DAYS = 93  # NBP limit for days in single range request
+
+    def __init__(self, fetcher: UrlFetcher, store: Optional[QuotesStoreProtocol] = None, max_workers: int = 1, api_url: str = API_URL) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers should be >= 1, got: {max_workers}")
 
-    def __init__(self, fetcher: UrlFetcher) -> None:
         self._fetcher = fetcher
+        self._store: QuotesStoreProtocol = store if store is not None else QuotesStoreMemory()
+        self._max_workers = max_workers
+        self._api_url = api_url
         self._logger = logging.getLogger(__name__)
+        self._num_lookups = 0
+        self._num_cache_hits = 0
+        self._num_cache_misses = 0
+        self._num_fetches = 0  # counted in the calling thread, not in the fetching ones
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """
+        Implements CountingQuotesProviderProtocol.
+        Lookups are the (currency, day) quotes asked for, each is either a store hit or a miss; prefetch only makes later lookups hit.
+        Fetches are the fetcher calls, single day and date range ones. HTTP calls are the real network round trips, retries included;
+        they are counted only if the fetcher counts them, see: CountingUrlFetcherProtocol.
+        """
+
+        counters = {
+            "quote lookups": self._num_lookups,
+            "quote cache hits": self._num_cache_hits,
+            "quote cache misses": self._num_cache_misses,
+            "NBP fetches": self._num_fetches,
+        }
+        if isinstance(self._fetcher, CountingUrlFetcherProtocol):
+            counters["HTTP calls"] = self._fetcher.num_calls
+        return counters
 
     def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
         """Implements QuotesProviderProtocol"""
 
-        url = QuotatorNBP._make_url(currency.value, date)
-        return self._read_average_pln(url)
+        day = _as_date(date)
+        known, quote = self._store.lookup(currency, day)
+        self._count_lookups(1, 0 if known else 1)
+        if known:
+            return quote
+
+        self._num_fetches += 1
+        quote, code = self._read_average_pln(self._make_url(currency.value, day))
+        self._save_if_final(currency, day, quote, code)
+        return quote
+
+    def get_average_pln_for_days(self, days: Iterable[Tuple[Currency, datetime.date]]) -> Dict[Tuple[Currency, datetime.date], Optional[Decimal]]:
+        """Batch version of get_average_pln_for_day. Unknown days are prefetched in ranges, what still remains is fetched day by day concurrently"""
+
+        wanted = {(currency, _as_date(date)) for currency, date in days}
+        quotes: Dict[Tuple[Currency, datetime.date], Optional[Decimal]] = {}
+        unknown = self._take_stored(wanted, quotes)
+        self._count_lookups(len(wanted), len(unknown))
+
+        self.prefetch(unknown)
+        not_prefetched = self._take_stored(unknown, quotes)
+        urls = [self._make_url(currency.value, day) for currency, day in not_prefetched]
+        for (currency, day), (quote, code) in zip(not_prefetched, self._map(self._read_average_pln, urls)):
+            self._save_if_final(currency, day, quote, code)
+            quotes[(currency, day)] = quote
+
+        return quotes
+
+    def prefetch(self, days: Iterable[Tuple[Currency, datetime.date]]) -> None:
+        """Implements PrefetchingQuotesProviderProtocol. Fetch the days not yet known in as few date range requests as possible"""
+
+        days_by_currency: Dict[Currency, Set[datetime.date]] = defaultdict(set)
+        for currency, date in days:
+            day = _as_date(date)
+            known, _ = self._store.lookup(currency, day)
+            if not known:
+                days_by_currency[currency].add(day)
+
+        ranges = [(currency, start_date, end_date) for currency, unknown_days in days_by_currency.items() for start_date, end_date in QuotatorNBP._make_ranges(sorted(unknown_days))]
+        urls = [self._make_range_url(currency.value, start_date, end_date) for currency, start_date, end_date in ranges]
+
+        # fetch concurrently, but store only here in calling thread
+        for (currency, start_date, end_date), (data, code) in zip(ranges, self._map(self._read_json, urls)):
+            self._save_range(currency, start_date, end_date, data, code)
+
+    def _take_stored(self, keys: Iterable[Tuple[Currency, datetime.date]], quotes: Dict[Tuple[Currency, datetime.date], Optional[Decimal]]) -> List[Tuple[Currency, datetime.date]]:
+        """Put the stored quotes of the keys into quotes. Return: the keys not stored"""
+
+        not_stored: List[Tuple[Currency, datetime.date]] = []
+        for currency, day in keys:
+            known, quote = self._store.lookup(currency, day)
+            if known:
+                quotes[(currency, day)] = quote
+            else:
+                not_stored.append((currency, day))
+        return not_stored
+
+    def _count_lookups(self, num_lookups: int, num_misses: int) -> None:
+        self._num_lookups += num_lookups
+        self._num_cache_hits += num_lookups - num_misses
+        self._num_cache_misses += num_misses
+
+    def _map(self, fetch: Callable[[str], T], urls: List[str]) -> Iterator[T]:
+        """Fetch the urls over up to max_workers connections; results come in urls order"""
+
+        self._num_fetches += len(urls)
+        if self._max_workers == 1 or len(urls) < 2:
+            return map(fetch, urls)
+
+        with ThreadPoolExecutor(max_workers=min(self._max_workers, len(urls))) as executor:
+            return iter(list(executor.map(fetch, urls)))
 
     @staticmethod
-    def _make_url(currency: str, date: datetime.date) -> str:
+    def _make_ranges(days: List[datetime.date]) -> List[Tuple[datetime.date, datetime.date]]:
+        """Cover sorted days with as few ranges of at most MAX_RANGE_DAYS as possible. Greedy works here"""
+
+        ordinals = [day.toordinal() for day in days]
+        ranges: List[Tuple[datetime.date, datetime.date]] = []
+        i = 0
+        while i < len(ordinals):
+            last_allowed = ordinals[i] + QuotatorNBP.MAX_RANGE_DAYS - 1
+            j = bisect.bisect_right(ordinals, last_allowed) - 1
+            ranges.append((days[i], days[j]))
+            i = j + 1
+        return ranges
+
+    def _save_range(self, currency: Currency, start_date: datetime.date, end_date: datetime.date, data: Optional[Mapping[str, Any]], code: HTTPStatus) -> None:
+        if code not in (HTTPStatus.OK, HTTPStatus.NOT_FOUND):
+            return  # not a final answer; the days will be fetched one by one when needed
+
+        # NOT_FOUND means no quotation at all in the range
+        quotes = QuotatorNBP._extract_average_pln_by_day(data) if data is not None else {}
+
+        day = start_date
+        while day <= end_date:
+            if day in quotes:
+                self._store.save(currency, day, quotes[day])
+            elif QuotatorNBP._is_final_answer(HTTPStatus.NOT_FOUND, day):
+                self._store.save(currency, day, None)
+            day += datetime.timedelta(days=1)
+
+    def _save_if_final(self, currency: Currency, day: datetime.date, quote: Optional[Decimal], code: HTTPStatus) -> None:
+        if QuotatorNBP._is_final_answer(code, day):
+            self._store.save(currency, day, quote)
+
+    def _make_url(self, currency: str, date: datetime.date) -> str:
         nbp_date = date.strftime("%Y-%m-%d")
-        return QuotatorNBP.URL.format(currency=currency, date=nbp_date)
+        return QuotatorNBP.URL.format(api_url=self._api_url, currency=currency, date=nbp_date)
+
+    def _make_range_url(self, currency: str, start_date: datetime.date, end_date: datetime.date) -> str:
+        return QuotatorNBP.RANGE_URL.format(
+            api_url=self._api_url, currency=currency, start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d")
+        )
+
+    @staticmethod
+    def _is_final_answer(code: HTTPStatus, day: datetime.date) -> bool:
+        """
+        Quote or "no quotation" that will never change, so can be stored for good.
+        Today's NOT_FOUND is not final - NBP publishes table A around noon.
+        Other errors eg. INTERNAL_SERVER_ERROR are not final either.
+        """
+
+        return code == HTTPStatus.OK or (code == HTTPStatus.NOT_FOUND and day < datetime.date.today())
+
+    def _read_average_pln(self, url: str) -> Tuple[Optional[Decimal], HTTPStatus]:
+        """result: [currency/PLN ratio or None if not available, http response code]"""
+
+        data, code = self._read_json(url)
+        if data is None:
+            return (None, code)
+
+        return (QuotatorNBP._extract_average_pln(data), code)
+
+    def _read_json(self, url: str) -> Tuple[Optional[Mapping[str, Any]], HTTPStatus]:
+        """result: [json response or None if not available, http response code]"""
 
-    def _read_average_pln(self, url: str) -> Optional[Decimal]:
         try:
             body, code = self._fetcher(url)
         except Exception as e:
@@ -69,14 +252,14 @@ class QuotatorNBP:
 
         if code != HTTPStatus.OK:
             self._log_http_not_ok(code, body, url)
-            return None
+            return (None, code)
 
         try:
             data = json.loads(body)
         except Exception as e:
             raise QuotationError(f"Invalid JSON received from NBP for URL: {body}, {url}") from e
 
-        return QuotatorNBP._extract_average_pln(data)
+        return (data, code)
 
     def _log_http_not_ok(self, code: int, body: str, url: str) -> None:
         # NOT_FOUND is expected normal situation for weekdays when there is no quotation available
@@ -104,3 +287,17 @@ class QuotatorNBP:
             return Decimal(data["rates"][0]["mid"])
         except Exception as e:
             raise QuotationError(f"Cannot extract rates[0].mid value from dict: {data}") from e
+
+    @staticmethod
+    def _extract_average_pln_by_day(data: Mapping[str, Any]) -> Dict[datetime.date, Decimal]:
+        # NBP date range quotation format is same as single quotation format, just with more "rates" items
+        try:
+            return {datetime.date.fromisoformat(rate["effectiveDate"]): Decimal(rate["mid"]) for rate in data["rates"]}
+        except Exception as e:
+            raise QuotationError(f"Cannot extract rates[].effectiveDate and rates[].mid values from dict: {data}") from e
+
+
+def _as_date(date: datetime.date) -> datetime.date:
+    """date can also come as datetime, but only the date part matters for quotation"""
+
+    return datetime.date(date.year, date.month, date.day)
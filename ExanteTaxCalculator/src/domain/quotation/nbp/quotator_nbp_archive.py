@@ -0,0 +1,78 @@
+import bisect
+import datetime
+from array import array
+from decimal import Decimal
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from src.domain.currency import Currency
+from src.domain.errors import QuotationError
+
+DailyRates = Iterable[Tuple[datetime.date, Decimal]]
+
+
+class _CurrencyRates:
+    """Rates of single currency: sorted publication days as ordinals and rates at the same positions"""
+
+    def __init__(self, rates: DailyRates) -> None:
+        by_ordinal = {day.toordinal(): rate for day, rate in rates}  # last rate wins for repeated day
+        ordinals = sorted(by_ordinal)
+        self.ordinals = array("l", ordinals)
+        self.rates: Sequence[Decimal] = tuple(by_ordinal[ordinal] for ordinal in ordinals)
+
+    def last_index_on_or_before(self, ordinal: int) -> int:
+        """-1 if nothing published on or before ordinal"""
+
+        return bisect.bisect_right(self.ordinals, ordinal) - 1
+
+
+class QuotatorNBPArchive:
+    """
+    Average currency/PLN quotes from local copy of NBP table A archive, so calculation can run offline.
+    The rates are kept per currency as sorted day array plus rate array, day lookup is binary search.
+    Asking for a day outside of the archive span is an error rather than "no quotation", so stale archive is not silently used.
+    """
+
+    def __init__(self, rates: Mapping[Currency, DailyRates]) -> None:
+        self._rates: Dict[Currency, _CurrencyRates] = {}
+        for currency, daily_rates in rates.items():
+            currency_rates = _CurrencyRates(daily_rates)
+            if currency_rates.ordinals:
+                self._rates[currency] = currency_rates
+
+    def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
+        """Implements QuotesProviderProtocol. None means no quotation published that day, eg. public holiday"""
+
+        currency_rates = self._get_currency_rates(currency, date)
+        ordinal = date.toordinal()
+        i = currency_rates.last_index_on_or_before(ordinal)
+        if i < 0 or currency_rates.ordinals[i] != ordinal:
+            return None
+        return currency_rates.rates[i]
+
+    def last_published_on_or_before(self, currency: Currency, date: datetime.date) -> Tuple[Decimal, datetime.date]:
+        """result: [currency/PLN ratio, publication day] of the last quotation published on or before given day"""
+
+        currency_rates = self._get_currency_rates(currency, date)
+        i = currency_rates.last_index_on_or_before(date.toordinal())
+        if i < 0:
+            raise QuotationError(f"No {currency} quotation in NBP archive on or before {date}")
+        return (currency_rates.rates[i], datetime.date.fromordinal(currency_rates.ordinals[i]))
+
+    def span(self, currency: Currency) -> Tuple[datetime.date, datetime.date]:
+        """result: [first, last] publication day of given currency in the archive"""
+
+        if currency not in self._rates:
+            raise QuotationError(f"No {currency} quotes in NBP archive")
+        ordinals = self._rates[currency].ordinals
+        return (datetime.date.fromordinal(ordinals[0]), datetime.date.fromordinal(ordinals[-1]))
+
+    @property
+    def currencies(self) -> Sequence[Currency]:
+        return sorted(self._rates, key=str)
+
+    def _get_currency_rates(self, currency: Currency, date: datetime.date) -> _CurrencyRates:
+        first, last = self.span(currency)
+        day = datetime.date(date.year, date.month, date.day)  # date can also come as datetime
+        if not first <= day <= last:
+            raise QuotationError(f"{currency} quotation for {day} requested, but NBP archive covers only {first}..{last}; refresh the archive")
+        return self._rates[currency]
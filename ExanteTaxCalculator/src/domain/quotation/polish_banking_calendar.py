@@ -0,0 +1,130 @@
+"""
+NBP publishes table A quotes on polish banking days only: no weekends, no public holidays.
+Knowing the holidays up front, D-1 quotation day can be found without probing NBP for days that have no quotation.
+
+Public holidays by "Ustawa o dniach wolnych od pracy":
+- fixed: 1.01, 6.01 (since 2011), 1.05, 3.05, 15.08, 1.11, 11.11, 24.12 (since 2025), 25.12, 26.12
+- movable, derived from Easter Sunday: Easter Monday, Corpus Christi (Easter + 60 days)
+  (Easter Sunday and Pentecost are always sundays)
+- one-off: 12.11.2018 (100th anniversary of independence)
+The rest can be provided as overrides, eg. from a file.
+"""
+
+import datetime
+from functools import lru_cache
+from typing import Iterable, FrozenSet, List, Protocol
+
+ONE_DAY = datetime.timedelta(days=1)
+
+FIXED_HOLIDAYS = [
+    # (month, day, since year)
+    (1, 1, 0),
+    (1, 6, 2011),
+    (5, 1, 0),
+    (5, 3, 0),
+    (8, 15, 0),
+    (11, 1, 0),
+    (11, 11, 0),
+    (12, 24, 2025),
+    (12, 25, 0),
+    (12, 26, 0),
+]
+
+ONE_OFF_HOLIDAYS = [
+    datetime.date(2018, 11, 12),
+]
+
+
+class BankingCalendarProtocol(Protocol):
+    def is_banking_day(self, day: datetime.date) -> bool:
+        pass
+
+
+class WeekendsOnlyCalendar:
+    """Implements BankingCalendarProtocol. Knows no holidays, just weekends"""
+
+    def is_banking_day(self, day: datetime.date) -> bool:
+        return day.weekday() < 5  # monday-friday
+
+
+class PolishBankingCalendar:
+    """Implements BankingCalendarProtocol. Overrides take precedence over the built-in holidays"""
+
+    def __init__(self, extra_holidays: Iterable[datetime.date] = (), extra_working_days: Iterable[datetime.date] = ()) -> None:
+        self._extra_holidays = frozenset(extra_holidays)
+        self._extra_working_days = frozenset(extra_working_days)
+
+    def is_banking_day(self, day: datetime.date) -> bool:
+        day = datetime.date(day.year, day.month, day.day)  # day can also come as datetime
+        if day in self._extra_working_days:
+            return True
+        if day in self._extra_holidays:
+            return False
+        return day.weekday() < 5 and day not in polish_public_holidays(day.year)
+
+    @staticmethod
+    def from_overrides(lines: Iterable[str]) -> "PolishBankingCalendar":
+        """
+        lines format - date and kind, comments start with #, eg:
+            # polish calendar overrides
+            2018-11-12 holiday
+            2019-12-24 working
+        """
+
+        holidays: List[datetime.date] = []
+        working_days: List[datetime.date] = []
+        for n, line in enumerate(lines, start=1):
+            line = line.split("#")[0].strip()
+            if not line:
+                continue
+            try:
+                date_str, kind = line.split()
+                day = datetime.date.fromisoformat(date_str)
+            except ValueError as e:
+                raise ValueError(f"Calendar overrides line {n}: expected '<YYYY-MM-DD> holiday|working', got: '{line}'") from e
+            if kind == "holiday":
+                holidays.append(day)
+            elif kind == "working":
+                working_days.append(day)
+            else:
+                raise ValueError(f"Calendar overrides line {n}: expected 'holiday' or 'working', got: '{kind}'")
+
+        return PolishBankingCalendar(extra_holidays=holidays, extra_working_days=working_days)
+
+
+@lru_cache(maxsize=None)
+def polish_public_holidays(year: int) -> FrozenSet[datetime.date]:
+    easter = easter_sunday(year)
+    holidays = {datetime.date(year, month, day) for month, day, since in FIXED_HOLIDAYS if year >= since}
+    holidays.add(easter + ONE_DAY)  # Easter Monday
+    holidays.add(easter + datetime.timedelta(days=60))  # Corpus Christi
+    holidays.update(day for day in ONE_OFF_HOLIDAYS if day.year == year)
+    return frozenset(holidays)
+
+
+def easter_sunday(year: int) -> datetime.date:
+    """Anonymous Gregorian algorithm (Meeus/Jones/Butcher)"""
+
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def banking_days_before(for_date: datetime.date, calendar: BankingCalendarProtocol, count: int) -> List[datetime.date]:
+    """count banking days before for_date, newest first"""
+
+    day = datetime.date(for_date.year, for_date.month, for_date.day) - ONE_DAY
+    result: List[datetime.date] = []
+    while len(result) < count:
+        if calendar.is_banking_day(day):
+            result.append(day)
+        day -= ONE_DAY
+    return result
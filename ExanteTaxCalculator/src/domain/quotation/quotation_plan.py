@@ -0,0 +1,77 @@
+"""
+Quoting in two passes:
+1. plan - walk all the items to be quoted and collect every distinct (currency, date) quote they need
+2. resolve - find the D-1 quotes for the whole plan in one batch, so the quotes provider can fetch them in bulk
+
+Then the actual PLN conversion is pure in-memory lookup in the resolved QuotesTable.
+Many lookups repeat, eg. buy and buy commission are usually in the same currency on the same day.
+"""
+
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from src.domain.errors import QuotationError
+from src.domain.transactions import DividendItem, TaxItem
+from src.domain.trading.buy_sell_pair import BuySellPair
+from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
+from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.polish_banking_calendar import BankingCalendarProtocol
+
+QuoteKey = Tuple[str, datetime.date]  # currency, transaction date
+Quote = Tuple[Decimal, datetime.date]  # currency/PLN ratio, quotation date
+
+
+class QuotesTable:
+    """Implements DayBeforeQuotatorProtocol with D-1 quotes resolved up front"""
+
+    def __init__(self, quotes: Mapping[QuoteKey, Quote]) -> None:
+        self._quotes = quotes
+
+    def quote(self, currency: str, for_date: datetime.datetime) -> Quote:
+        key = (currency, _as_date(for_date))
+        try:
+            return self._quotes[key]
+        except KeyError as e:
+            raise QuotationError(f"Quote for {currency} on {key[1]} was not planned") from e
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
+class QuotationPlan:
+    def __init__(self) -> None:
+        self._needed: Set[QuoteKey] = set()
+
+    def add_buy_sell_pairs(self, pairs: Iterable[BuySellPair]) -> None:
+        for pair in pairs:
+            self.add(pair.buy.paid.currency, pair.buy.date)
+            self.add(pair.buy.commission.currency, pair.buy.date)
+            self.add(pair.sell.received.currency, pair.sell.date)
+            self.add(pair.sell.commission.currency, pair.sell.date)
+
+    def add_dividends(self, dividends: Iterable[DividendItem]) -> None:
+        for dividend in dividends:
+            self.add(dividend.received_dividend.currency, dividend.date)
+            if dividend.paid_tax is not None:
+                self.add_taxes([dividend.paid_tax])
+
+    def add_taxes(self, taxes: Iterable[TaxItem]) -> None:
+        for tax in taxes:
+            self.add(tax.paid_tax.currency, tax.date)
+
+    def add(self, currency: str, for_date: datetime.date) -> None:
+        self._needed.add((currency, _as_date(for_date)))
+
+    def resolve(self, quotes_provider: QuotesProviderProtocol, calendar: Optional[BankingCalendarProtocol] = None) -> QuotesTable:
+        quotator = WorkingDayBeforeQuotator(quotes_provider, calendar)
+        quotator.prefetch(self._needed)
+        quotes: Dict[QuoteKey, Quote] = {key: quotator.quote(*key) for key in self._needed}
+        return QuotesTable(quotes)
+
+    def __len__(self) -> int:
+        return len(self._needed)
+
+
+def _as_date(date: datetime.date) -> datetime.date:
+    return datetime.date(date.year, date.month, date.day)
@@ -1,5 +1,5 @@
 import datetime
-from typing import Optional, Protocol
+from typing import Iterable, Mapping, Optional, Protocol, Tuple, runtime_checkable
 from decimal import Decimal
 
 from src.domain.currency import Currency
@@ -8,3 +8,22 @@ from src.domain.currency import Currency
 class QuotesProviderProtocol(Protocol):
     def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
         pass
+
+
+@runtime_checkable
+class PrefetchingQuotesProviderProtocol(QuotesProviderProtocol, Protocol):
+    """Quotes provider that can get many quotes up front, much cheaper than one by one"""
+
+    def prefetch(self, days: Iterable[Tuple[Currency, datetime.date]]) -> None:
+        """After prefetch, get_average_pln_for_day for given days is answered without fetching"""
+        pass
+
+
+@runtime_checkable
+class CountingQuotesProviderProtocol(QuotesProviderProtocol, Protocol):
+    """Quotes provider that counts its work, eg. cache hits and HTTP requests; the counts go to Trader.stats"""
+
+    @property
+    def counters(self) -> Mapping[str, int]:
+        """Counts since the provider was created"""
+        pass
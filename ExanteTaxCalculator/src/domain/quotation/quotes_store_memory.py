@@ -0,0 +1,24 @@
+import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from src.domain.currency import Currency
+
+
+class QuotesStoreMemory:
+    """Implements QuotesStoreProtocol. Remembers quotes only for as long as the program runs"""
+
+    def __init__(self) -> None:
+        self._quotes: Dict[Tuple[str, datetime.date], Optional[Decimal]] = {}
+
+    def lookup(self, currency: Currency, date: datetime.date) -> Tuple[bool, Optional[Decimal]]:
+        key = (currency.value, date)
+        if key not in self._quotes:
+            return (False, None)
+        return (True, self._quotes[key])
+
+    def save(self, currency: Currency, date: datetime.date, quote: Optional[Decimal]) -> None:
+        self._quotes[(currency.value, date)] = quote
+
+    def __len__(self) -> int:
+        return len(self._quotes)
@@ -0,0 +1,17 @@
+import datetime
+from typing import Optional, Protocol, Tuple
+from decimal import Decimal
+
+from src.domain.currency import Currency
+
+
+class QuotesStoreProtocol(Protocol):
+    """Remembers quotes already fetched, so they don't need to be fetched again"""
+
+    def lookup(self, currency: Currency, date: datetime.date) -> Tuple[bool, Optional[Decimal]]:
+        """result: [is quote known, currency/PLN ratio or None if there was no quotation that day]"""
+        pass
+
+    def save(self, currency: Currency, date: datetime.date, quote: Optional[Decimal]) -> None:
+        """quote None means there was no quotation that day, eg. public holiday"""
+        pass
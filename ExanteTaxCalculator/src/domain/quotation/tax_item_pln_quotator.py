@@ -1,12 +1,11 @@
 from src.domain.transactions.tax_item import TaxItem
 from src.domain.quotation.tax_item_pln import TaxItemPLN
-from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
-from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.day_before_quotator_protocol import DayBeforeQuotatorProtocol
 
 
 class TaxItemPLNQuotator:
-    def __init__(self, quotes_provider: QuotesProviderProtocol) -> None:
-        self._quotator = WorkingDayBeforeQuotator(quotes_provider)
+    def __init__(self, quotator: DayBeforeQuotatorProtocol) -> None:
+        self._quotator = quotator
 
     def quote(self, item: TaxItem) -> TaxItemPLN:
         tax_quote_pln, tax_quotation_date = self._quotator.quote(item.paid_tax.currency, item.date)
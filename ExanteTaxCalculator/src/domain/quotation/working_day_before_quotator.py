@@ -1,45 +1,50 @@
 import datetime
-from typing import Tuple
+from typing import Tuple, Iterable, List, Optional
 from decimal import Decimal
 
 from src.domain.errors import NoQuotesAvailableError
 from src.domain.currency import Currency
-from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol
+from src.domain.quotation.quotes_provider_protocol import QuotesProviderProtocol, PrefetchingQuotesProviderProtocol
+from src.domain.quotation.polish_banking_calendar import BankingCalendarProtocol, PolishBankingCalendar, banking_days_before
 
 
-ONE_DAY = datetime.timedelta(days=1)
+MAX_DAYS_BACK = 5  # look for quote up to 5 banking days back
 
 
 class WorkingDayBeforeQuotator:
-    """Finds quotation according to D-1 rule - last working day"""
+    """
+    Finds quotation according to D-1 rule - last working day.
+    Calendar tells the working days, so normally the very first lookup finds the quote.
+    Days the calendar doesn't know are holidays are still handled by looking further back.
+    """
 
-    def __init__(self, quotes_provider: QuotesProviderProtocol) -> None:
+    def __init__(self, quotes_provider: QuotesProviderProtocol, calendar: Optional[BankingCalendarProtocol] = None) -> None:
         self._quotes_provider = quotes_provider
+        self._calendar: BankingCalendarProtocol = calendar if calendar is not None else PolishBankingCalendar()
 
-    def quote(self, currency: str, for_date: datetime.datetime) -> Tuple[Decimal, datetime.date]:
+    def quote(self, currency: str, for_date: datetime.date) -> Tuple[Decimal, datetime.date]:
         """result: [currency/PLN ratio, quotation date]"""
 
         curr = Currency(currency)
-        date = datetime.date(for_date.year, for_date.month, for_date.day)  # only date, no time information is needed for quotation
+        quotation_days = self.lookback_days(for_date)
 
-        day_before = date - ONE_DAY
-        quotation_day = day_before
-
-        for _ in range(5):  # look for quote up to 5 days back
-            quotation_day = skip_weekend_back(quotation_day)
+        for quotation_day in quotation_days:
             quote = self._quotes_provider.get_average_pln_for_day(curr, quotation_day)
             if quote is not None:
                 return (quote, quotation_day)
-            quotation_day -= ONE_DAY
 
-        raise NoQuotesAvailableError(f"No PLN quotes available for {curr} in dates {quotation_day} - {day_before}")
+        raise NoQuotesAvailableError(f"No PLN quotes available for {curr} in dates {quotation_days[-1]} - {quotation_days[0]}")
+
+    def prefetch(self, quotes: Iterable[Tuple[str, datetime.date]]) -> None:
+        """Let the quotes provider get up front all the days that quoting given (currency, for_date) pairs may ask for"""
 
+        if not isinstance(self._quotes_provider, PrefetchingQuotesProviderProtocol):
+            return
 
-def skip_weekend_back(date: datetime.date) -> datetime.date:
-    while is_weekend(date):
-        date -= ONE_DAY
-    return date
+        days = [(Currency(currency), day) for currency, for_date in quotes for day in self.lookback_days(for_date)]
+        self._quotes_provider.prefetch(days)
 
+    def lookback_days(self, for_date: datetime.date) -> List[datetime.date]:
+        """Days that quote may ask quotes provider for, newest first"""
 
-def is_weekend(date: datetime.date) -> bool:
-    return date.weekday() > 4  # saturday, sunday
+        return banking_days_before(for_date, self._calendar, MAX_DAYS_BACK)
@@ -1,5 +1,7 @@
-from src.domain.stock_exchange import StockExchange, stock_exchange_by_short_name
-from typing import List, Dict
+from src.domain.stock_exchange import stock_exchange_by_symbol
+from src.domain.errors import AmbiguousStockExchangeError
+from typing import List, Dict, Tuple
+from decimal import Decimal
 
 from src.domain.profit_item import ProfitPLN
 from src.domain.quotation.dividend_item_pln import DividendItemPLN
@@ -9,6 +11,8 @@ from src.domain.tax_declaration.tax_declaration_numbers import TaxDeclarationNum
 
 
 class TradingReportPrinter:
+    UNKNOWN_COUNTRY = "Nieznany kraj"  # eg. EURONEXT venue, the report rows don't carry the ISIN that tells its country
+
     def to_text(self, report: TradingReport) -> str:
         report_lines = self.to_strings(report)
         return "\n".join(report_lines)
@@ -18,13 +22,14 @@ class TradingReportPrinter:
 
         lines += self._format_dividends(report.dividends)
         lines += self._format_dividend_taxes(report.dividend_taxes)
-        lines += self._format_profits_by_assets(report.trades_by_asset)
-        lines += self._format_profits_by_country(report.trades_by_asset) # more coarse grouping than "by assets", needed for PIT/ZG
+        countries = self._get_countries(report.trades_by_asset)
+        lines += self._format_profits_by_assets(report.trades_by_asset, countries)
+        lines += self._format_profits_by_country(report.trades_by_asset, countries) # more coarse grouping than "by assets", needed for PIT/ZG
         lines += self._format_results(report.results)
 
         return lines
 
-    def _format_profits_by_assets(self, profits_by_assets: Dict[str, List[ProfitPLN]]) -> List[str]:
+    def _format_profits_by_assets(self, profits_by_assets: Dict[str, List[ProfitPLN]], countries: Dict[str, str]) -> List[str]:
         """profits are grouped by asset name, eg. profits from selling PHYS.ARCA are grouped under "PHYS.ARCA" """
 
         format_str = "Przychód: {:0.2f} PLN. Koszt: {:0.2f} PLN. Z/S: {:0.2f} PLN\n"
@@ -36,22 +41,20 @@ class TradingReportPrinter:
         group_names = sorted(profits_by_assets.keys())  # eg. BIL.ARCA, OGZD.LSEIOB, TLT.NASDAQ
         for group_name in group_names:
             # group title
-            stock_exchange_country = self._get_stock_exchange(group_name).country
-            result.append(f"{group_name} [{stock_exchange_country}]")
+            result.append(f"{group_name} [{countries[group_name]}]")
 
             # group items
             group = profits_by_assets[group_name]
             result.extend([self._format_profit(item) for item in group])
 
             # group summary
-            sum_cost = sum([item.paid.amount for item in group])
-            sum_income = sum([item.received.amount for item in group])
+            sum_income, sum_cost = self._sum_profits(group)
             totals = format_str.format(sum_income, sum_cost, sum_income - sum_cost)
             result.append(totals)
 
         return result
 
-    def _format_profits_by_country(self, profits_by_assets: Dict[str, List[ProfitPLN]]) -> List[str]:
+    def _format_profits_by_country(self, profits_by_assets: Dict[str, List[ProfitPLN]], countries: Dict[str, str]) -> List[str]:
         """
         profits are grouped by country name, eg. profits from selling PHYS.ARCA and V.NYSE are grouped under "Stany Zjednoczone".
         This function is gpt-4o generated by transforming _format_profits_by_assets with: "rewrite this function so it groups the profits by stock_exchange_country instead of by asset name"
@@ -66,10 +69,7 @@ class TradingReportPrinter:
         # Group profits by country
         profits_by_country: Dict[str, List[ProfitPLN]] = {}
         for group_name, group in profits_by_assets.items():
-            stock_exchange_country = self._get_stock_exchange(group_name).country
-            if stock_exchange_country not in profits_by_country:
-                profits_by_country[stock_exchange_country] = []
-            profits_by_country[stock_exchange_country].extend(group)
+            profits_by_country.setdefault(countries[group_name], []).extend(group)
 
         # Format the grouped profits
         for country, group in sorted(profits_by_country.items()):
@@ -80,17 +80,33 @@ class TradingReportPrinter:
             result.extend([self._format_profit(item) for item in group])
 
             # group summary
-            sum_cost = sum([item.paid.amount for item in group])
-            sum_income = sum([item.received.amount for item in group])
+            sum_income, sum_cost = self._sum_profits(group)
             totals = format_str.format(sum_income, sum_cost, sum_income - sum_cost)
             result.append(totals)
 
         return result
 
     @staticmethod
-    def _get_stock_exchange(assset_name: str) -> StockExchange:
-        stock_exchange_short_name = assset_name.split(".")[1]  # eg. TLT.NASDAQ -> NASDAQ
-        return stock_exchange_by_short_name(stock_exchange_short_name)
+    def _get_countries(profits_by_assets: Dict[str, List[ProfitPLN]]) -> Dict[str, str]:
+        """asset name -> stock exchange country, eg. TLT.NASDAQ -> Stany Zjednoczone; resolved once for both groupings"""
+        return {asset_name: TradingReportPrinter._get_country(asset_name) for asset_name in profits_by_assets}
+
+    @staticmethod
+    def _get_country(asset_name: str) -> str:
+        try:
+            return stock_exchange_by_symbol(asset_name).country
+        except AmbiguousStockExchangeError:
+            return TradingReportPrinter.UNKNOWN_COUNTRY
+
+    @staticmethod
+    def _sum_profits(profits: List[ProfitPLN]) -> Tuple[Decimal, Decimal]:
+        """Return: (sum of income, sum of cost), in single pass"""
+        sum_income = Decimal(0)
+        sum_cost = Decimal(0)
+        for item in profits:
+            sum_income += item.received.amount
+            sum_cost += item.paid.amount
+        return sum_income, sum_cost
 
     def _format_dividends(self, dividends: List[DividendItemPLN]) -> List[str]:
         format_str = "Suma: {:0.2f} PLN\n"
@@ -1,4 +1,8 @@
 from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+from src.domain.errors import AmbiguousStockExchangeError
 
 
 @dataclass(frozen=True)
@@ -42,18 +46,53 @@ known_stock_exchanges = [
     StockExchange("Austria", "Vienna Stock Exchange", "VSE"),
     StockExchange("Polska", "Warsaw Stock Exchange", "WSE"),
     StockExchange("Niemcy", "Xetra Stock Exchange", "XETRA"),
-    # EURONEXT is problematic; how to decide country when short is the same for a number of countries?
-    # StockExchange("Włochy", "Borsa Italiana", "EURONEXT"),
-    # StockExchange("Holandia", "Euronext Amsterdam", "EURONEXT"),
-    # StockExchange("Belgia", "Euronext Brussels", "EURONEXT"),
-    # StockExchange("Irlandia", "Euronext Ireland", "EURONEXT"),
-    # StockExchange("Portugalia", "Euronext Lisbon", "EURONEXT"),
-    # StockExchange("Francja", "Euronext Paris", "EURONEXT"),
+    # EURONEXT short name is shared by venues in a number of countries, see: ambiguous_stock_exchanges
 ]
 
+# EURONEXT venue is told by the ISIN country prefix of the traded share, eg. FR0000120271 -> Euronext Paris
+euronext_by_isin_prefix = {
+    "IT": StockExchange("Włochy", "Borsa Italiana", "EURONEXT"),
+    "NL": StockExchange("Holandia", "Euronext Amsterdam", "EURONEXT"),
+    "BE": StockExchange("Belgia", "Euronext Brussels", "EURONEXT"),
+    "IE": StockExchange("Irlandia", "Euronext Ireland", "EURONEXT"),
+    "PT": StockExchange("Portugalia", "Euronext Lisbon", "EURONEXT"),
+    "FR": StockExchange("Francja", "Euronext Paris", "EURONEXT"),
+}
+
+# short name -> {ISIN prefix -> stock exchange}, for short names that alone don't tell the country
+ambiguous_stock_exchanges: Dict[str, Dict[str, StockExchange]] = {
+    "EURONEXT": euronext_by_isin_prefix,
+}
+
+_stock_exchanges_by_short_name = {stock_exchange.short: stock_exchange for stock_exchange in known_stock_exchanges}
+
+
+def stock_exchange_by_short_name(short_name: str, isin: Optional[str] = None) -> StockExchange:
+    """isin is only needed for ambiguous short names, eg. EURONEXT"""
+
+    stock_exchange = _stock_exchanges_by_short_name.get(short_name)
+    if stock_exchange is not None:
+        return stock_exchange
+
+    by_isin_prefix = ambiguous_stock_exchanges.get(short_name)
+    if by_isin_prefix is None:
+        raise ValueError(f"Unknown stock exchange: '{short_name}'")
+    if isin is None:
+        raise AmbiguousStockExchangeError(f"Stock exchange '{short_name}' is ambiguous, ISIN is needed to tell the country")
+    stock_exchange = by_isin_prefix.get(isin[:2])
+    if stock_exchange is None:
+        raise ValueError(f"Unknown stock exchange: '{short_name}' for ISIN '{isin}'")
+    return stock_exchange
+
+
+def stock_exchange_by_symbol(symbol: str, isin: Optional[str] = None) -> StockExchange:
+    """eg. TLT.NASDAQ -> Nasdaq Stock Market"""
+
+    return stock_exchange_by_short_name(_stock_exchange_short_name(symbol), isin)
+
+
+@lru_cache(maxsize=None)
+def _stock_exchange_short_name(symbol: str) -> str:
+    """eg. TLT.NASDAQ -> NASDAQ; the symbol is parsed once, then it is cached"""
 
-def stock_exchange_by_short_name(short_name: str) -> StockExchange:
-    for stock_exchange in known_stock_exchanges:
-        if stock_exchange.short == short_name:
-            return stock_exchange
-    raise ValueError(f"Unknown stock exchange: '{short_name}'")
+    return symbol.rpartition(".")[2]
@@ -81,26 +81,32 @@ Scenario6:
         1500 * 10/15 - 1000 * 10/10 = 0
 """
 
-import copy
 from src.domain.transactions.stock_split_item import StockSplitItem
 from src.domain.transactions.corporate_action_item import CorporateActionItem
-from typing import List
+import heapq
+import logging
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
 from decimal import Decimal
 from src.domain.transactions.buy_item import BuyItem
 from src.domain.transactions.sell_item import SellItem
 from src.domain.trading.buy_sell_pair import BuySellPair
 from src.domain.errors import InsufficientAssetError
 
+_logger = logging.getLogger(__name__)
+
+LotEvent = Tuple[str, Decimal]  # asset name after the event, split ratio; rename is an event with ratio 1
+OpenLot = Tuple[BuyItem, Decimal]  # buy item up to date with renames and splits, asset amount left
+
 
 class OwnedItem:
-    def __init__(self, buy_item: BuyItem):
-        # read-only
-        self._item = copy.deepcopy(buy_item)
+    def __init__(self, buy_item: BuyItem, asset_left: Optional[Decimal] = None):
+        # read-only; BuyItem is frozen so it is shared, not copied. Renames and splits replace it with new BuyItem
+        self._item = buy_item
         # read-write
-        self.asset_left = buy_item.amount
-
-    def can_sell(self, item: SellItem) -> bool:
-        return self.asset_name == item.asset_name and self.asset_left > 0
+        self.asset_left = buy_item.amount if asset_left is None else asset_left
+        self.num_events_applied = 0  # position in the lot book events log
 
     def sell(self, amount: Decimal) -> Decimal:
         assert amount > Decimal(0)
@@ -108,36 +114,26 @@ class OwnedItem:
         self.asset_left -= amount_sold
         return amount_sold
 
-    def rename(self, new_name: str) -> None:
-        """to support CORPORATE ACTION"""
-        old = self._item
-        self._item = BuyItem(
-            asset_name=new_name,
-            amount=old.amount,
-            paid=old.paid,
-            commission=old.commission,
-            autoconversions=old.autoconversions,
-            date=old.date,
-            transaction_id=old.transaction_id,
-        )
+    def apply(self, events: List[LotEvent]) -> None:
+        """
+        to support CORPORATE ACTION (rename) and STOCK SPLIT - actual split eg. 100 -> 200 or merge eg. 200 -> 100.
+        Any number of events rebuilds the BuyItem just once
+        """
+        if not events:
+            return
 
-    def split(self, ratio: Decimal) -> None:
-        """to support STOCK SPLIT, can be actual split eg. 100 -> 200 or merge eg. 200 -> 100"""
-        new_asset_left = self.asset_left * ratio
-        if new_asset_left != int(new_asset_left):  # fractional amount not allowed
-            raise Exception(f"After stock split the amount left is fractional: {new_asset_left}")
-
-        old = self._item
-        self._item = BuyItem(
-            asset_name=old.asset_name,
-            amount=old.amount * ratio,
-            paid=old.paid,
-            commission=old.commission,
-            autoconversions=old.autoconversions,
-            date=old.date,
-            transaction_id=old.transaction_id,
-        )
-        self.asset_left = Decimal(int(new_asset_left))
+        amount = self._item.amount
+        for _, ratio in events:
+            if ratio == 1:
+                continue
+            new_asset_left = self.asset_left * ratio
+            if new_asset_left != int(new_asset_left):  # fractional amount not allowed
+                raise Exception(f"After stock split the amount left is fractional: {new_asset_left}")
+            self.asset_left = Decimal(int(new_asset_left))
+            amount *= ratio
+
+        asset_name = events[-1][0]
+        self._item = replace(self._item, asset_name=asset_name, amount=amount)
 
     @property
     def asset_name(self) -> str:
@@ -145,41 +141,131 @@ class OwnedItem:
 
     @property
     def item(self) -> BuyItem:
-        return copy.deepcopy(self._item)
+        return self._item
+
+
+class LotBook:
+    """
+    Open lots of single asset, in buy order, with their running balance.
+    Renames and splits are O(1): they are only logged, and applied to a lot when the lot gets matched.
+    """
+
+    def __init__(self, asset_name: str) -> None:
+        self.asset_name = asset_name
+        self.balance = Decimal(0)
+        self._lots: Deque[OwnedItem] = deque()
+        self._events: List[LotEvent] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._lots)
+
+    def add(self, owned_item: OwnedItem) -> None:
+        owned_item.num_events_applied = len(self._events)
+        self._lots.append(owned_item)
+        self.balance += owned_item.asset_left
+
+    def front(self) -> OwnedItem:
+        """Oldest open lot, up to date with renames and splits"""
+        owned_item = self._lots[0]
+        self._catch_up(owned_item)
+        return owned_item
+
+    def pop_front(self) -> None:
+        self._lots.popleft()
+        if not self._lots:
+            self._events.clear()  # no lot needs the history anymore
+
+    def rename(self, new_name: str) -> None:
+        self.asset_name = new_name
+        self._events.append((new_name, Decimal(1)))
+
+    def split(self, ratio: Decimal) -> None:
+        self._events.append((self.asset_name, ratio))
+        self.balance *= ratio
+
+    def lots(self) -> List[OwnedItem]:
+        """All the lots, in buy order, up to date with renames and splits"""
+        for owned_item in self._lots:
+            self._catch_up(owned_item)
+        return list(self._lots)
+
+    def take_all(self) -> List[OwnedItem]:
+        """Remove and return all the lots, up to date with renames and splits"""
+        lots = list(self._lots)
+        for owned_item in lots:
+            self._catch_up(owned_item)
+        self._lots.clear()
+        self._events.clear()
+        self.balance = Decimal(0)
+        return lots
+
+    def _catch_up(self, owned_item: OwnedItem) -> None:
+        owned_item.apply(self._events[owned_item.num_events_applied :])
+        owned_item.num_events_applied = len(self._events)
 
 
 class BuySellFIFOMatcher:
     """
     Match sell items with buy items in FIFO manner.
     This is necessary to correctly calculate income and income cost.
+    Open lots are kept per asset in LotBooks; exhausted lots are dropped, so sell costs the number of lots it consumes, not the whole trading history.
+    Renames and splits are applied lazily, so they cost O(1) no matter how many lots are open.
     """
 
     def __init__(self) -> None:
         self._buy_sell_matches: List[BuySellPair] = []
-        self._owned_items: List[OwnedItem] = []
+        self._books: Dict[str, LotBook] = {}
+        self.num_lots_scanned = 0  # lots the sells went through, see: Trader.stats
+
+    @classmethod
+    def from_open_lots(cls, open_lots: Iterable[OpenLot]) -> "BuySellFIFOMatcher":
+        """Matcher continuing from open_lots, eg. saved at the end of previous tax year; lots of each asset must come in buy order"""
+        matcher = cls()
+        for buy_item, asset_left in open_lots:
+            matcher._add_lot(OwnedItem(buy_item, asset_left))
+        return matcher
 
     def buy(self, item: BuyItem) -> None:
-        self._owned_items.append(OwnedItem(item))
+        self._add_lot(OwnedItem(item))
 
     def sell(self, item: SellItem) -> None:
         self._validate_sell(item)
 
-        i = 0  # process buys from oldest to newest - FIFO manner
+        book = self._books.get(item.asset_name)
         amount_to_sell = item.amount
-        while amount_to_sell > 0:
-            owned_item = self._owned_items[i]
-            if owned_item.can_sell(item):
-                amount_sold = owned_item.sell(amount_to_sell)
-                amount_to_sell -= amount_sold
-                buy_sell_pair = BuySellPair(buy=owned_item.item, sell=item, amount_sold=amount_sold)
-                self._buy_sell_matches.append(buy_sell_pair)
-            i += 1
+        while book is not None and amount_to_sell > 0:  # process buys from oldest to newest - FIFO manner
+            owned_item = book.front()
+            self.num_lots_scanned += 1
+            amount_sold = owned_item.sell(amount_to_sell)
+            amount_to_sell -= amount_sold
+            buy_sell_pair = BuySellPair(buy=owned_item.item, sell=item, amount_sold=amount_sold)
+            self._buy_sell_matches.append(buy_sell_pair)
+            if owned_item.asset_left == 0:
+                book.pop_front()
+
+        if book is not None:
+            book.balance -= item.amount
+            if not book:
+                del self._books[item.asset_name]
 
     def corporate_action(self, item: CorporateActionItem) -> None:
-        for i in range(len(self._owned_items)):
-            if self._owned_items[i].asset_name == item.from_share.symbol:
-                print("renaming", item.from_share.symbol, " -> ", item.to_share.symbol)
-                self._owned_items[i].rename(item.to_share.symbol)
+        from_symbol, to_symbol = item.from_share.symbol, item.to_share.symbol
+        if from_symbol not in self._books or from_symbol == to_symbol:
+            return
+
+        _logger.debug("Renaming %s -> %s", from_symbol, to_symbol)
+        book = self._books.pop(from_symbol)
+        book.rename(to_symbol)
+
+        existing = self._books.get(to_symbol)
+        if existing is None:
+            self._books[to_symbol] = book
+            return
+
+        # rare case: lots already open under the new name. Merge the books, keeping FIFO order
+        merged = heapq.merge(existing.take_all(), book.take_all(), key=lambda owned_item: owned_item.item.transaction_id)
+        for owned_item in merged:
+            existing.add(owned_item)
 
         # below is just historical transaction data; don't update historical names
         # for i in range(len(self._buy_sell_matches)):
@@ -189,15 +275,29 @@ class BuySellFIFOMatcher:
         #         self._buy_sell_matches[i].sell.asset_name = item.to_share.symbol
 
     def stock_split(self, item: StockSplitItem) -> None:
+        symbol = item.from_share.symbol
+        if symbol not in self._books:
+            return
+
         ratio = item.to_share.amount / item.from_share.amount
-        for i in range(len(self._owned_items)):
-            if self._owned_items[i].asset_name == item.from_share.symbol:
-                print("splitting", item.from_share.symbol, " x ", ratio)
-                self._owned_items[i].split(ratio)
+        _logger.debug("Splitting %s x %s", symbol, ratio)
+        self._books[symbol].split(ratio)
+
+    @property
+    def open_lots(self) -> List[OpenLot]:
+        """Lots not sold yet, in buy order; to continue matching later with from_open_lots"""
+        lots = (owned_item for book in self._books.values() for owned_item in book.lots())
+        return sorted(((owned_item.item, owned_item.asset_left) for owned_item in lots), key=lambda lot: lot[0].transaction_id)
 
     @property
     def buy_sell_pairs(self) -> List[BuySellPair]:
-        return copy.deepcopy(self._buy_sell_matches)
+        return list(self._buy_sell_matches)  # the pairs are frozen, only the list needs copying
+
+    def _add_lot(self, owned_item: OwnedItem) -> None:
+        book = self._books.get(owned_item.asset_name)
+        if book is None:
+            book = self._books[owned_item.asset_name] = LotBook(owned_item.asset_name)
+        book.add(owned_item)
 
     def _validate_sell(self, item: SellItem) -> None:
         amount_available = self._get_asset_amount_in_wallet(item.asset_name)
@@ -207,8 +307,5 @@ class BuySellFIFOMatcher:
             )
 
     def _get_asset_amount_in_wallet(self, asset: str) -> Decimal:
-        total = Decimal("0")
-        for item in self._owned_items:
-            if item.asset_name == asset:
-                total += item.asset_left
-        return total
+        book = self._books.get(asset)
+        return book.balance if book is not None else Decimal(0)
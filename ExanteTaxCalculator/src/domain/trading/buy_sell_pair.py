@@ -5,7 +5,7 @@ from src.domain.transactions.buy_item import BuyItem
 from src.domain.transactions.sell_item import SellItem
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BuySellPair:
     buy: BuyItem  # original unmodified buy item
     sell: SellItem  # that was matched with this original unmodified sell item
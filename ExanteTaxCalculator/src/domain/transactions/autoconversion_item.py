@@ -3,7 +3,7 @@ from money import Money
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AutoConversionItem:
     conversion_from: Money
     conversion_to: Money
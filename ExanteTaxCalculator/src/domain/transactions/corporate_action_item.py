@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from src.domain.share import Share
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CorporateActionItem:
     from_share: Share
     to_share: Share
@@ -2,14 +2,14 @@ from datetime import datetime
 from src.domain.transactions.issuance_fee_item import IssuanceFeeItem
 from money import Money
 from decimal import Decimal
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Optional, Sequence
 
 from src.domain.transactions.autoconversion_item import AutoConversionItem
 from src.domain.transactions.tax_item import TaxItem
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DividendItem:
     """
     Dividend usually is followed by Tax, but sometimes tax comes much later.
@@ -21,8 +21,13 @@ class DividendItem:
     received_dividend: Money
     paid_tax: Optional[TaxItem] = None
     paid_issuance_fee: Optional[IssuanceFeeItem] = None
-    autoconversions: List[AutoConversionItem] = field(default_factory=list)
+    autoconversions: Sequence[AutoConversionItem] = ()  # stored as tuple
     # common transaction item data
     date: datetime = datetime(1970, 1, 1)
     transaction_id: int = 0
     comment: str = ""
+
+    def __post_init__(self) -> None:
+        # tuple, not list, so the frozen item is immutable all the way down and can be shared instead of copied
+        if isinstance(self.autoconversions, list):
+            object.__setattr__(self, "autoconversions", tuple(self.autoconversions))
@@ -4,7 +4,7 @@ from decimal import Decimal
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExchangeItem:
     exchange_from: Money
     exchange_to: Money
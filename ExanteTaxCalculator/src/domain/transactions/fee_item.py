@@ -4,7 +4,7 @@ from decimal import Decimal
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FeeItem:
     paid_fee: Money
     # common transaction item data
@@ -4,7 +4,7 @@ from decimal import Decimal
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FundingItem:
     funding_amount: Money
     # common transaction item data
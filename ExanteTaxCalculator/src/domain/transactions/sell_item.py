@@ -1,13 +1,13 @@
 from datetime import datetime
-from typing import List
+from typing import Sequence
 from money import Money
 from decimal import Decimal
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 from src.domain.transactions.autoconversion_item import AutoConversionItem
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SellItem:
     """
     Sell transaction sometimes entails autoconversions for unknown reason.
@@ -19,7 +19,12 @@ class SellItem:
     amount: Decimal
     received: Money
     commission: Money
-    autoconversions: List[AutoConversionItem] = field(default_factory=list)
+    autoconversions: Sequence[AutoConversionItem] = ()  # stored as tuple
     # common transaction item data
     date: datetime = datetime(1970, 1, 1)
     transaction_id: int = 0
+
+    def __post_init__(self) -> None:
+        # tuple, not list, so the frozen item is immutable all the way down and can be shared instead of copied
+        if isinstance(self.autoconversions, list):
+            object.__setattr__(self, "autoconversions", tuple(self.autoconversions))
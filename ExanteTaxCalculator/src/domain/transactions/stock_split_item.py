@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from src.domain.share import Share
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StockSplitItem:
     """Eg. Split PHYS 1 to 5. Or the other way round 5 to 1"""
 
@@ -4,7 +4,7 @@ from decimal import Decimal
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TaxItem:
     paid_tax: Money
     # common transaction item data
@@ -1,20 +1,24 @@
-import copy
+from datetime import datetime
 from decimal import Decimal
 from money import Money
+from types import MappingProxyType
 from typing import Dict, Mapping, List
 from collections import defaultdict
 from src.domain.transactions import *
 from src.domain.errors import InsufficientAssetError
+from src.domain.wallet_history import WalletHistory
 
 
 class Wallet:
     """Wallet keeps track of assets, it is updated by buy/sell/fund/withdraw/exchange/tax/dividend/corporate_action/issuance_fee/stock_split operations"""
 
-    def __init__(self, initial_assets: Mapping[str, Decimal] = {}):
+    def __init__(self, initial_assets: Mapping[str, Decimal] = {}, record_history: bool = False):
+        """record_history: keep log of the changes, for balance_at and snapshot_at"""
         self._assets = defaultdict(Decimal, initial_assets)
+        self._history = WalletHistory(initial_assets) if record_history else None
 
     def fund(self, item: FundingItem) -> None:
-        self._assets[item.funding_amount.currency] += item.funding_amount.amount
+        self._change(item.date, item.funding_amount.currency, item.funding_amount.amount)
 
     def withdraw(self, item: WithdrawalItem) -> None:
         # check transaction possible
@@ -24,7 +28,7 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to withdraw {item.withdrawal_amount}, but only has {self._assets[item.withdrawal_amount.currency]}")
 
         # apply transaction
-        self._assets[item.withdrawal_amount.currency] -= item.withdrawal_amount.amount
+        self._change(item.date, item.withdrawal_amount.currency, -item.withdrawal_amount.amount)
 
     def exchange(self, item: ExchangeItem) -> None:
         # check transaction possible
@@ -34,42 +38,47 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to exchange {item.exchange_from}, but only has {self._assets[item.exchange_from.currency]}")
 
         # apply transaction
-        self._assets[item.exchange_from.currency] -= item.exchange_from.amount
-        self._assets[item.exchange_to.currency] += item.exchange_to.amount
+        self._change(item.date, item.exchange_from.currency, -item.exchange_from.amount)
+        self._change(item.date, item.exchange_to.currency, item.exchange_to.amount)
 
     # in 2023 it turned out that autoconversion can be a standalone transaction
     def autoconversion(self, item: AutoConversionItem) -> None:
-        Wallet._autoconversion(item, self._assets)
+        transaction = self._begin()
+        Wallet._autoconversion(item, transaction)
+        self._commit(transaction, item.date)
 
     @staticmethod
-    def _autoconversion(item: AutoConversionItem, assets: Dict[str, Decimal]) -> None:
+    def _autoconversion(item: AutoConversionItem, transaction: "_WalletTransaction") -> None:
         """autoconversion if effectively the same as exchange"""
         # check transaction possible
-        if item.conversion_from.currency not in assets:
-            raise InsufficientAssetError(f"Tried to autoconvert {item.conversion_from}, but no such asset in the wallet: {assets}, id: {item.transaction_id}")
-        if item.conversion_from.amount > assets[item.conversion_from.currency]:
+        if item.conversion_from.currency not in transaction:
+            raise InsufficientAssetError(f"Tried to autoconvert {item.conversion_from}, but no such asset in the wallet, id: {item.transaction_id}")
+        if item.conversion_from.amount > transaction[item.conversion_from.currency]:
             raise InsufficientAssetError(
-                f"Tried to autoconvert {item.conversion_from}, but only has {assets[item.conversion_from.currency]}, id: {item.transaction_id}"
+                f"Tried to autoconvert {item.conversion_from}, but only has {transaction[item.conversion_from.currency]}, id: {item.transaction_id}"
             )
 
         # apply transaction
-        assets[item.conversion_from.currency] -= item.conversion_from.amount
-        assets[item.conversion_to.currency] += item.conversion_to.amount
+        transaction.add(item.conversion_from.currency, -item.conversion_from.amount)
+        transaction.add(item.conversion_to.currency, item.conversion_to.amount)
 
     def dividend(self, item: DividendItem) -> None:
-        self._assets[item.received_dividend.currency] += item.received_dividend.amount
+        transaction = self._begin()
+        transaction.add(item.received_dividend.currency, item.received_dividend.amount)
 
         # first receive money, then autoconvert if needed. Eg. happens for Singapor dollars SGD -> USD
         for autoconversion in item.autoconversions:
-            Wallet._autoconversion(autoconversion, self._assets)
+            Wallet._autoconversion(autoconversion, transaction)
 
         # issuance fee is always less than received dividend so no need to check for sufficient money
         if item.paid_issuance_fee is not None:
-            self._assets[item.paid_issuance_fee.paid_fee.currency] -= item.paid_issuance_fee.paid_fee.amount
+            transaction.add(item.paid_issuance_fee.paid_fee.currency, -item.paid_issuance_fee.paid_fee.amount)
 
         # tax is always less than received dividend so no need to check for sufficient money
         if item.paid_tax is not None:
-            self._assets[item.paid_tax.paid_tax.currency] -= item.paid_tax.paid_tax.amount
+            transaction.add(item.paid_tax.paid_tax.currency, -item.paid_tax.paid_tax.amount)
+
+        self._commit(transaction, item.date)
 
     def tax(self, item: TaxItem) -> None:
         # check transaction possible
@@ -79,7 +88,7 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to pay tax {item.paid_tax}, but only has {self._assets[item.paid_tax.currency]}; item: {item}")
 
         # apply transaction
-        self._assets[item.paid_tax.currency] -= item.paid_tax.amount
+        self._change(item.date, item.paid_tax.currency, -item.paid_tax.amount)
 
     def issuance_fee(self, item: IssuanceFeeItem) -> None:
         # check transaction possible
@@ -89,7 +98,7 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to pay issuance fee {item.paid_fee}, but only has {self._assets[item.paid_fee.currency]}")
 
         # apply transaction
-        self._assets[item.paid_fee.currency] -= item.paid_fee.amount
+        self._change(item.date, item.paid_fee.currency, -item.paid_fee.amount)
 
     def corporate_action(self, item: CorporateActionItem) -> None:
         # check transaction possible
@@ -99,8 +108,8 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to corporate action from {item.from_share}, but only has {self._assets[item.from_share.symbol]}")
 
         # apply transaction
-        self._assets[item.from_share.symbol] -= item.from_share.amount
-        self._assets[item.to_share.symbol] += item.to_share.amount
+        self._change(item.date, item.from_share.symbol, -item.from_share.amount)
+        self._change(item.date, item.to_share.symbol, item.to_share.amount)
 
     def fee(self, item: FeeItem) -> None:
         # check transaction possible
@@ -110,7 +119,7 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to pay fee {item.paid_fee}, but only has {self._assets[item.paid_fee.currency]}")
 
         # apply transaction
-        self._assets[item.paid_fee.currency] -= item.paid_fee.amount
+        self._change(item.date, item.paid_fee.currency, -item.paid_fee.amount)
 
     def stock_split(self, item: StockSplitItem) -> None:
         # check transaction possible
@@ -120,58 +129,107 @@ class Wallet:
             raise InsufficientAssetError(f"Tried to stock split from {item.from_share}, but only has {self._assets[item.from_share.symbol]}")
 
         # apply transaction
-        self._assets[item.from_share.symbol] -= item.from_share.amount
-        self._assets[item.to_share.symbol] += item.to_share.amount
+        self._change(item.date, item.from_share.symbol, -item.from_share.amount)
+        self._change(item.date, item.to_share.symbol, item.to_share.amount)
 
     def buy(self, item: BuyItem) -> None:
-        # check transaction possible
-        assets = self.assets_copy
+        transaction = self._begin()
 
         # 1. first autoconvert money if needed
         for autoconversion in item.autoconversions:
-            Wallet._autoconversion(autoconversion, assets)
+            Wallet._autoconversion(autoconversion, transaction)
 
         # 2. then try paying for asset
-        assets[item.paid.currency] -= item.paid.amount
-        assets[item.commission.currency] -= item.commission.amount
-        if assets[item.paid.currency] < 0 or assets[item.commission.currency] < 0:
-            raise InsufficientAssetError(f"Tried to buy {item.__dict__} but insufficient money")
+        transaction.add(item.paid.currency, -item.paid.amount)
+        transaction.add(item.commission.currency, -item.commission.amount)
+        if transaction[item.paid.currency] < 0 or transaction[item.commission.currency] < 0:
+            raise InsufficientAssetError(f"Tried to buy {item} but insufficient money")
 
         # apply transaction
-        for autoconversion in item.autoconversions:
-            Wallet._autoconversion(autoconversion, self._assets)
-        self._assets[item.asset_name] += item.amount
-        self._assets[item.paid.currency] -= item.paid.amount
-        self._assets[item.commission.currency] -= item.commission.amount
+        transaction.add(item.asset_name, item.amount)
+        self._commit(transaction, item.date)
 
     def sell(self, item: SellItem) -> None:
-        # check transaction possible
+        transaction = self._begin()
 
         # 1. First deduct asset and add money
-        assets = self.assets_copy
-        assets[item.asset_name] -= item.amount
-        assets[item.received.currency] += item.received.amount
+        transaction.add(item.asset_name, -item.amount)
+        transaction.add(item.received.currency, item.received.amount)
 
         # 2. Next do autoconversions, because exante first converts all received money, and then converts back just to pay commission. stupid
         for autoconversion in item.autoconversions:
-            Wallet._autoconversion(autoconversion, assets)
+            Wallet._autoconversion(autoconversion, transaction)
 
         # 3. And then pay commission as we now have money for that
-        assets[item.commission.currency] -= item.commission.amount
-        if  assets[item.commission.currency] < 0:
-            raise InsufficientAssetError(f"Tried to sell {item.__dict__} but insufficient money: {assets[item.commission.currency]}")
-
-        if assets[item.asset_name] < 0 :
-            raise InsufficientAssetError(f"Tried to sell {item.__dict__} but insufficient asset: {assets[item.commission.asset_name]}")
+        transaction.add(item.commission.currency, -item.commission.amount)
+        if transaction[item.commission.currency] < 0:
+            raise InsufficientAssetError(f"Tried to sell {item} but insufficient money: {transaction[item.commission.currency]}")
 
+        if transaction[item.asset_name] < 0:
+            raise InsufficientAssetError(f"Tried to sell {item} but insufficient asset: {transaction[item.asset_name]}")
 
         # apply transaction
-        self._assets[item.asset_name] -= item.amount
-        self._assets[item.received.currency] += item.received.amount
-        for autoconversion in item.autoconversions:
-            Wallet._autoconversion(autoconversion, self._assets)
-        self._assets[item.commission.currency] -= item.commission.amount
+        self._commit(transaction, item.date)
+
+    def _change(self, when: datetime, asset: str, amount: Decimal) -> None:
+        self._assets[asset] += amount
+        if self._history is not None:
+            self._history.record(asset, when, amount)
+
+    def _commit(self, transaction: "_WalletTransaction", when: datetime) -> None:
+        for asset, delta in transaction.deltas.items():
+            self._change(when, asset, delta)
+
+    def balance_at(self, asset: str, when: datetime) -> Decimal:
+        """Asset balance after all the changes made at given moment and before"""
+        return self._get_history().balance_at(asset, when)
+
+    def snapshot_at(self, when: datetime) -> Dict[str, Decimal]:
+        """Assets held at given moment, without the ones with 0 balance"""
+        return self._get_history().snapshot_at(when)
+
+    def _get_history(self) -> WalletHistory:
+        if self._history is None:
+            raise ValueError("Wallet history is not recorded, create the wallet with record_history=True")
+        return self._history
+
+    def _begin(self) -> "_WalletTransaction":
+        """Multi-step operation is staged in a transaction and applied at once, so failed step leaves the wallet untouched"""
+        return _WalletTransaction(self._assets)
+
+    @property
+    def assets(self) -> Mapping[str, Decimal]:
+        """Read-only live view of the assets"""
+        return MappingProxyType(self._assets)
 
     @property
     def assets_copy(self) -> Dict[str, Decimal]:
-        return copy.deepcopy(self._assets)
+        return defaultdict(Decimal, self._assets)  # Decimals are immutable, shallow copy is enough
+
+
+class _WalletTransaction:
+    """
+    Per-asset changes of single wallet operation, on top of the wallet assets.
+    Reads are wallet balance + change; the wallet applies the changes once the operation is checked.
+    Cost depends on the number of assets the operation touches, not on the number of assets in the wallet.
+    """
+
+    __slots__ = ("_assets", "_deltas")
+
+    def __init__(self, assets: Dict[str, Decimal]) -> None:
+        self._assets = assets
+        self._deltas: Dict[str, Decimal] = {}
+
+    def __contains__(self, asset: str) -> bool:
+        return asset in self._deltas or asset in self._assets
+
+    def __getitem__(self, asset: str) -> Decimal:
+        # .get, not [], to not insert missing asset into the wallet defaultdict
+        return self._assets.get(asset, Decimal(0)) + self._deltas.get(asset, Decimal(0))
+
+    def add(self, asset: str, amount: Decimal) -> None:
+        self._deltas[asset] = self._deltas.get(asset, Decimal(0)) + amount
+
+    @property
+    def deltas(self) -> Mapping[str, Decimal]:
+        return self._deltas
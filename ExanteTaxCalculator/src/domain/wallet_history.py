@@ -0,0 +1,71 @@
+import bisect
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Mapping
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _to_seconds(when: datetime) -> int:
+    return (when - _EPOCH) // _SECOND
+
+
+class _AssetHistory:
+    """Change times of single asset as sorted seconds since epoch, and the balances after each change at the same positions"""
+
+    __slots__ = ("initial", "times", "balances")
+
+    def __init__(self, initial: Decimal) -> None:
+        self.initial = initial
+        self.times = array("q")
+        self.balances: List[Decimal] = []
+
+    def record(self, seconds: int, change: Decimal) -> None:
+        if not self.times or seconds >= self.times[-1]:
+            # the usual case: report items come roughly in time order
+            self.balances.append((self.balances[-1] if self.balances else self.initial) + change)
+            self.times.append(seconds)
+            return
+
+        # change dated before already recorded ones; the later balances include it too
+        i = bisect.bisect_right(self.times, seconds)
+        self.times.insert(i, seconds)
+        self.balances.insert(i, (self.balances[i - 1] if i > 0 else self.initial) + change)
+        for j in range(i + 1, len(self.balances)):
+            self.balances[j] += change
+
+    def balance_at(self, seconds: int) -> Decimal:
+        i = bisect.bisect_right(self.times, seconds) - 1
+        return self.balances[i] if i >= 0 else self.initial
+
+
+class WalletHistory:
+    """
+    Per-asset log of wallet changes, for point in time queries like "what did I hold at the end of 2021?".
+    Balance at given moment includes all the changes made at that moment and before, lookup is binary search.
+    Initial assets are the balances from before the first recorded change.
+    """
+
+    def __init__(self, initial_assets: Mapping[str, Decimal] = {}) -> None:
+        self._assets: Dict[str, _AssetHistory] = {asset: _AssetHistory(amount) for asset, amount in initial_assets.items()}
+
+    def record(self, asset: str, when: datetime, change: Decimal) -> None:
+        history = self._assets.get(asset)
+        if history is None:
+            history = self._assets[asset] = _AssetHistory(Decimal(0))
+        history.record(_to_seconds(when), change)
+
+    def balance_at(self, asset: str, when: datetime) -> Decimal:
+        history = self._assets.get(asset)
+        if history is None:
+            return Decimal(0)
+        return history.balance_at(_to_seconds(when))
+
+    def snapshot_at(self, when: datetime) -> Dict[str, Decimal]:
+        """All the assets held at given moment; assets with 0 balance are skipped"""
+
+        seconds = _to_seconds(when)
+        balances = ((asset, history.balance_at(seconds)) for asset, history in self._assets.items())
+        return {asset: balance for asset, balance in balances if balance != 0}
@@ -1,3 +1,4 @@
+import logging
 from typing import Union, Optional, List
 from money import Money
 
@@ -11,6 +12,8 @@ from src.infrastructure.transaction_item_data import TransactionItemData
 from src.infrastructure.errors import InvalidTradeError, InvalidReportRowError
 from src.infrastructure.builders.building import build_autoconversions, is_money, Builder
 
+_logger = logging.getLogger(__name__)
+
 
 class TradeBuilder(Builder):
     """
@@ -30,17 +33,17 @@ class TradeBuilder(Builder):
 
         # check if we are still processing the same transaction that we began with
         if row.parent_uuid not in self._uuids and not self.transaction_continues(row.symbol_id) :
-            print("### new transaction ended")
+            _logger.debug("Trade ended: new transaction")
             return False
 
         # check if the operation is applicable for this item type
         if row.operation_type not in {ReportRow.OperationType.TRADE, ReportRow.OperationType.COMMISSION, ReportRow.OperationType.AUTOCONVERSION}:
-            print("### invalid transaction type")
+            _logger.debug("Trade ended: operation type not part of trade")
             return False
 
         # specific to TradeItem: there can be only 1 decrease action
         if row.sum < 0 and row.operation_type == ReportRow.OperationType.TRADE and len(self._item.decrease) == 1:
-            print("### decrease found")
+            _logger.debug("Trade ended: second decrease")
             return False
 
         # specific to TradeItem: money exchange cant have AUTOCONVERSION actions
@@ -50,7 +53,7 @@ class TradeBuilder(Builder):
             and len(self._item.decrease) > 0
             and is_money(self._item.decrease[0])
         ):
-            print("### autoconversion")
+            _logger.debug("Trade ended: autoconversion after money exchange")
             return False
 
         return self._item.add_row(row)
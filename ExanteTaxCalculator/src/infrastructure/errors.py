@@ -7,4 +7,12 @@ class CorruptedReportError(Exception):
 
 
 class InvalidReportRowError(Exception):
-    """ Commission is not money """
\ No newline at end of file
+    """ Commission is not money """
+
+
+class CorruptedSnapshotError(Exception):
+    """ Trader snapshot file malformed """
+
+
+class SnapshotMismatchError(Exception):
+    """ Trader snapshot doesn't match the report it is used with, eg. the report was for other account or its history changed """
@@ -0,0 +1,64 @@
+"""
+Sorting of item streams that may not fit in memory.
+Up to max_items_in_memory items are sorted in memory; bigger input is sorted in chunks,
+the chunks are spilled to temporary files and then lazily merged back into single sorted stream.
+"""
+
+import heapq
+import pickle
+import tempfile
+from contextlib import ExitStack
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def sorted_external(items: Iterable[T], key: Callable[[T], Any], max_items_in_memory: int) -> Iterator[T]:
+    """
+    Stable sort, like sorted(items, key=key), but yields the items instead of building a list.
+    Note: the whole input is consumed before the first item is yielded.
+    """
+
+    if max_items_in_memory < 1:
+        raise ValueError(f"max_items_in_memory should be >= 1, got: {max_items_in_memory}")
+
+    items = iter(items)
+    chunk = list(islice(items, max_items_in_memory))
+    chunk.sort(key=key)
+
+    more = list(islice(items, 1))
+    if not more:
+        # all fits in memory
+        yield from chunk
+        return
+
+    with ExitStack() as stack:
+        spilled: List[BinaryIO] = []
+        while chunk:
+            f = stack.enter_context(tempfile.TemporaryFile())
+            _spill(chunk, f)
+            spilled.append(f)
+            chunk = more + list(islice(items, max_items_in_memory - len(more)))
+            chunk.sort(key=key)
+            more = []
+
+        # heapq.merge resolves ties by input order, so the chunks order keeps the sort stable
+        yield from heapq.merge(*(_unspill(f) for f in spilled), key=key)
+
+
+def _spill(chunk: List[T], f: BinaryIO) -> None:
+    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+    for item in chunk:
+        pickler.dump(item)
+        pickler.clear_memo()  # don't keep references to every item already written
+    f.seek(0)
+    chunk.clear()
+
+
+def _unspill(f: BinaryIO) -> Iterator[T]:
+    while True:
+        try:
+            yield pickle.load(f)  # each item was pickled with fresh memo, see: _spill; so it is unpickled with fresh memo too
+        except EOFError:
+            return
@@ -0,0 +1,113 @@
+"""
+Reading and writing local NBP table A archive.
+Sources are the official yearly archive CSV files:
+    https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_a_2020.csv
+and the archive JSON file produced by the exante-nbp-archive command:
+    {"USD": [["2020-01-02", "3.7977"], ["2020-01-03", "3.8213"], ...], "EUR": [...]}
+"""
+
+import re
+import json
+import datetime
+from decimal import Decimal, InvalidOperation
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, TextIO, Tuple
+
+from src.domain.currency import Currency
+from src.domain.quotation.nbp.quotator_nbp_archive import QuotatorNBPArchive
+from src.infrastructure.errors import CorruptedReportError
+
+ARCHIVE_CSV_URL = "https://static.nbp.pl/dane/kursy/Archiwum/archiwum_tab_a_{year}.csv"
+ARCHIVE_CSV_ENCODING = "cp1250"
+
+# header column eg. "1USD" or "100JPY" - rate is given for that many currency units
+_UNITS_CURRENCY = re.compile(r"^(\d+)([A-Z]{3})$")
+
+Rates = Dict[Currency, Dict[datetime.date, Decimal]]
+
+
+def parse_archive_csv(lines: Iterable[str]) -> Rates:
+    """
+    NBP yearly archive CSV, semicolon separated, decimal comma, eg.:
+        data;1THB;1USD;...;100JPY;...;nr tabeli;pełny numer tabeli;
+        20200102;0,1267;3,7977;...;3,4968;...;1;001/A/NBP/2020;
+    Rows other than header and day rows (eg. currency names footer) are skipped.
+    """
+
+    columns: Optional[List[Tuple[int, Currency, int]]] = None  # column index, currency, units
+    rates: Rates = defaultdict(dict)
+    for n, line in enumerate(lines, start=1):
+        fields = [field.strip() for field in line.strip().split(";")]
+        if fields[0] == "data":
+            columns = _parse_header(fields)
+            continue
+
+        if len(fields[0]) != 8 or not fields[0].isdigit():
+            continue  # not a day row
+
+        if columns is None:
+            raise CorruptedReportError(f"NBP archive CSV line {n}: day row before header row")
+
+        try:
+            day = datetime.datetime.strptime(fields[0], "%Y%m%d").date()
+            for i, currency, units in columns:
+                if i < len(fields) and fields[i]:
+                    rates[currency][day] = Decimal(fields[i].replace(",", ".")) / units
+        except (ValueError, InvalidOperation) as e:
+            raise CorruptedReportError(f"NBP archive CSV line {n}: invalid day row: {line.strip()}") from e
+
+    if columns is None:
+        raise CorruptedReportError("NBP archive CSV: missing header row starting with 'data'")
+    return dict(rates)
+
+
+def _parse_header(fields: List[str]) -> List[Tuple[int, Currency, int]]:
+    columns = []
+    for i, field in enumerate(fields):
+        match = _UNITS_CURRENCY.match(field)
+        if match and Currency.is_currency(match.group(2)):
+            columns.append((i, Currency(match.group(2)), int(match.group(1))))
+    return columns
+
+
+def read_archive_csv(filename: str) -> Rates:
+    with open(filename, encoding=ARCHIVE_CSV_ENCODING) as f:
+        return parse_archive_csv(f)
+
+
+def parse_archive_json(f: TextIO) -> Rates:
+    try:
+        data = json.load(f)
+        return {Currency(code): {datetime.date.fromisoformat(day): Decimal(rate) for day, rate in daily} for code, daily in data.items()}
+    except (ValueError, InvalidOperation, AttributeError, TypeError) as e:
+        raise CorruptedReportError(f"NBP archive JSON: expected {{currency: [[day, rate], ...]}}, got: {e}") from e
+
+
+def write_archive_json(rates: Mapping[Currency, Mapping[datetime.date, Decimal]], f: TextIO) -> None:
+    data = {str(currency): [[day.isoformat(), str(rate)] for day, rate in sorted(daily.items())] for currency, daily in sorted(rates.items(), key=lambda item: str(item[0]))}
+    json.dump(data, f, separators=(",", ":"))
+
+
+def merge_rates(*sources: Mapping[Currency, Mapping[datetime.date, Decimal]]) -> Rates:
+    """Later sources win for the same currency and day"""
+
+    merged: Rates = defaultdict(dict)
+    for source in sources:
+        for currency, daily in source.items():
+            merged[currency].update(daily)
+    return dict(merged)
+
+
+def read_archive(filename: str) -> Rates:
+    """Archive JSON or yearly archive CSV, by file extension"""
+
+    if filename.lower().endswith(".csv"):
+        return read_archive_csv(filename)
+
+    with open(filename, encoding="utf-8") as f:
+        return parse_archive_json(f)
+
+
+def load_archive(filename: str) -> QuotatorNBPArchive:
+    rates = read_archive(filename)
+    return QuotatorNBPArchive({currency: daily.items() for currency, daily in rates.items()})
@@ -0,0 +1,78 @@
+"""
+Persistent quotes store, so that the NBP quotes need to be downloaded only once and not on every calculator run.
+Quotes live in a single SQLite table keyed by (currency, day).
+NULL quote means NBP published no quotation that day, eg. public holiday - this is also worth remembering.
+"""
+
+import os
+import sqlite3
+import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from src.domain.currency import Currency
+
+
+class QuotesStoreSQLite:
+    """
+    Implements QuotesStoreProtocol.
+    All the quotes are read into memory on open, so lookups don't touch the disk.
+    """
+
+    COMMIT_EVERY = 256  # saves are committed in batches; commit per save would fsync on every single quote
+
+    def __init__(self, filename: str) -> None:
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(filename)
+        self._db.execute("CREATE TABLE IF NOT EXISTS quotes (currency TEXT NOT NULL, day TEXT NOT NULL, mid TEXT, PRIMARY KEY (currency, day))")
+        self._db.commit()
+        self._quotes: Dict[Tuple[str, str], Optional[Decimal]] = {
+            (currency, day): None if mid is None else Decimal(mid) for currency, day, mid in self._db.execute("SELECT currency, day, mid FROM quotes")
+        }
+        self._num_uncommitted = 0
+
+    def lookup(self, currency: Currency, date: datetime.date) -> Tuple[bool, Optional[Decimal]]:
+        key = (currency.value, _day(date))
+        if key not in self._quotes:
+            return (False, None)
+        return (True, self._quotes[key])
+
+    def save(self, currency: Currency, date: datetime.date, quote: Optional[Decimal]) -> None:
+        key = (currency.value, _day(date))
+        self._quotes[key] = quote
+        self._db.execute("INSERT OR REPLACE INTO quotes (currency, day, mid) VALUES (?, ?, ?)", (*key, None if quote is None else str(quote)))
+
+        self._num_uncommitted += 1
+        if self._num_uncommitted >= QuotesStoreSQLite.COMMIT_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        self._db.commit()
+        self._num_uncommitted = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "QuotesStoreSQLite":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
+def _day(date: datetime.date) -> str:
+    return date.strftime("%Y-%m-%d")
+
+
+def default_cache_dir() -> str:
+    """Eg. ~/.cache/exante-calculator"""
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "exante-calculator")
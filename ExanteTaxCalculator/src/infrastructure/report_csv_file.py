@@ -0,0 +1,153 @@
+"""
+Exante report CSV file, read line by line or - for very large reports - parsed into ReportRows in parallel.
+Parsing a row doesn't depend on other rows, only building TransactionItems needs the rows in order;
+so the file is split into line-aligned byte chunks, each chunk is parsed and sorted by TransactionID in worker process,
+and the sorted batches are merged back by TransactionID, see: TradesRepoCSV2.load.
+Batches travel between processes packed into columns of plain values, see: ReportRowBatch.
+"""
+
+import os
+import csv
+from decimal import Decimal
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.report_row_parser import ReportRowParser
+
+COMMENT_PREFIX = "#"  # commented-out lines are skipped
+
+_OPERATION_TYPES = {op.value: op for op in ReportRow.OperationType}
+
+
+class ReportCSVFile:
+    """
+    Iterable over report lines, like open(filename) but skipping commented-out lines.
+    jobs > 1 tells TradesRepoCSV2 to parse the file in that many worker processes.
+    """
+
+    def __init__(self, filename: str, jobs: int = 1) -> None:
+        if jobs < 1:
+            raise ValueError(f"jobs should be >= 1, got: {jobs}")
+        self.filename = filename
+        self.jobs = jobs
+
+    def __iter__(self) -> Iterator[str]:
+        with open(self.filename, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith(COMMENT_PREFIX):
+                    yield line
+
+    def lines_reversed(self, rows_start: int, block_size: int = 1 << 16) -> Iterator[str]:
+        """Lines after rows_start byte offset, from the last line to the first; read from the file end in blocks"""
+
+        with open(self.filename, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            head = b""  # first, maybe incomplete line of the block read before
+            at_file_end = True
+            while end > rows_start:
+                start = max(rows_start, end - block_size)
+                f.seek(start)
+                lines = (f.read(end - start) + head).split(b"\n")
+                end = start
+                if at_file_end and len(lines) > 1:
+                    at_file_end = False
+                    if lines[-1] == b"":
+                        lines.pop()  # newline ending the last line doesn't start another one
+                head = lines[0]
+                yield from _report_lines(reversed(lines[1:]))
+            yield from _report_lines([head])
+
+    def read_header(self, delimiter: str) -> Tuple[Optional[List[str]], int]:
+        """Return: (header fields or None for empty file, byte offset where the rows start)"""
+
+        with open(self.filename, "rb") as f:
+            for line in iter(f.readline, b""):
+                text = line.decode("utf-8").strip()
+                if not text.startswith(COMMENT_PREFIX):
+                    return next(csv.reader([text], delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL), []), f.tell()
+            return None, f.tell()
+
+    def parse_rows_in_parallel(self, header: Sequence[str], rows_start: int, delimiter: str) -> List["ReportRowBatch"]:
+        """Return: batches of ReportRows in file order, each sorted by TransactionID"""
+
+        chunks = split_into_line_chunks(self.filename, rows_start, self.jobs)
+        if len(chunks) <= 1:
+            return [parse_chunk(self.filename, start, end, header, delimiter) for start, end in chunks]
+
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [executor.submit(parse_chunk, self.filename, start, end, header, delimiter) for start, end in chunks]
+            return [future.result() for future in futures]
+
+
+def _report_lines(raw_lines: Iterable[bytes]) -> Iterator[str]:
+    for raw_line in raw_lines:
+        line = raw_line.decode("utf-8").strip()
+        if not line.startswith(COMMENT_PREFIX):
+            yield line
+
+
+def split_into_line_chunks(filename: str, start: int, num_chunks: int) -> List[Tuple[int, int]]:
+    """Return: up to num_chunks (start, end) byte ranges covering the file from start; each range ends right after a newline or at file end"""
+
+    size = os.path.getsize(filename)
+    boundaries = [start]
+    with open(filename, "rb") as f:
+        for i in range(1, num_chunks):
+            approx = start + (size - start) * i // num_chunks
+            if approx <= boundaries[-1]:
+                continue
+            f.seek(approx - 1)
+            f.readline()  # move to the start of the next line; approx - 1 so that chunk starting exactly at line start is kept
+            if boundaries[-1] < f.tell() < size:
+                boundaries.append(f.tell())
+    boundaries.append(size)
+    return [(begin, end) for begin, end in zip(boundaries, boundaries[1:]) if begin < end]
+
+
+class ReportRowBatch:
+    """
+    ReportRows packed for transfer between processes: column per field, Decimals and datetimes as str, OperationType as its value.
+    Pickling strings is several times cheaper than pickling ReportRow dataclasses, Decimals or datetimes; the rows are rebuilt on iteration.
+    """
+
+    def __init__(self, rows: Sequence[ReportRow]) -> None:
+        self.transaction_ids = [row.transaction_id for row in rows]
+        self._columns: Tuple[Tuple[Any, ...], ...] = tuple(
+            zip(
+                *(
+                    (row.account_id, row.symbol_id, row.operation_type.value, str(row.when), str(row.sum), row.asset, str(row.eur_equivalent), row.comment, row.uuid, row.parent_uuid)
+                    for row in rows
+                )
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    @property
+    def comments(self) -> Sequence[str]:
+        """Comment of each row, at the same positions as transaction_ids; no need to rebuild the rows to find rollbacks"""
+        return self._columns[7] if self._columns else ()
+
+    def __iter__(self) -> Iterator[ReportRow]:
+        operation_types = _OPERATION_TYPES
+        for transaction_id, account_id, symbol_id, operation_type, when, sum, asset, eur_equivalent, comment, uuid, parent_uuid in zip(self.transaction_ids, *self._columns):
+            yield ReportRow(transaction_id, account_id, symbol_id, operation_types[operation_type], datetime.fromisoformat(when), Decimal(sum), asset, Decimal(eur_equivalent), comment, uuid, parent_uuid)
+
+
+def parse_chunk(filename: str, start: int, end: int, header: Sequence[str], delimiter: str) -> ReportRowBatch:
+    """Parse the report lines between start and end byte offsets; the rows are sorted by TransactionID, stable"""
+
+    with open(filename, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    lines = (line.strip() for line in data.decode("utf-8").splitlines())
+    reader = csv.reader((line for line in lines if not line.startswith(COMMENT_PREFIX)), delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL)
+    parser = ReportRowParser(header)
+    rows = [parser.parse(fields) for fields in reader if fields]
+    rows.sort(key=lambda row: row.transaction_id)
+    return ReportRowBatch(rows)
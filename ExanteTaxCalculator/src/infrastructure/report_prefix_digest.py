@@ -0,0 +1,79 @@
+"""
+Fingerprint of the report history up to the end of a tax year.
+The prefix of the year is the longest run of TransactionItems, in transaction id order, dated in that year or before.
+Its digest is SHA-256 over the ReportRows the items were built from, so a snapshot taken at the end of the year
+can be checked against a newer report: same prefix rows - same digest.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from src.domain.transactions import TransactionItem
+from src.infrastructure.report_row import ReportRow
+
+_EMPTY_DIGEST = hashlib.sha256().hexdigest()
+
+
+@dataclass(frozen=True)
+class ReportPrefix:
+    year: int
+    num_items: int  # how many TransactionItems the prefix has
+    last_transaction_id: int  # of the last row in the prefix; 0 for empty prefix
+    digest: str  # SHA-256 hex of the prefix rows
+
+
+class ReportPrefixDigest:
+    """
+    Hashes the rows as they are consumed by item builders; checkpoints are taken at item boundaries.
+    Rows are hashed only while any of the requested years' prefix is still open, so without years it costs nothing.
+    """
+
+    def __init__(self, years: Iterable[int] = ()) -> None:
+        self._open_years: List[int] = sorted(set(years))
+        self._prefixes: Dict[int, ReportPrefix] = {year: ReportPrefix(year, 0, 0, _EMPTY_DIGEST) for year in self._open_years}
+        self._hash = hashlib.sha256()
+        self._num_items = 0
+        self._last_transaction_id = 0
+
+    def add_row(self, row: ReportRow) -> None:
+        if not self._open_years:
+            return
+
+        self._hash.update(_canonical_row(row))
+        self._last_transaction_id = row.transaction_id
+
+    def add_item(self, item: TransactionItem) -> None:
+        """Call once all the item's rows are added and before any row of the next item"""
+
+        self._num_items += 1
+        while self._open_years and item.date.year > self._open_years[0]:
+            self._open_years.pop(0)  # first item after the year closes the year's prefix
+
+        if not self._open_years:
+            return
+
+        prefix_digest = self._hash.hexdigest()
+        for year in self._open_years:
+            self._prefixes[year] = ReportPrefix(year, self._num_items, self._last_transaction_id, prefix_digest)
+
+    @property
+    def prefixes(self) -> Dict[int, ReportPrefix]:
+        return dict(self._prefixes)
+
+
+def _canonical_row(row: ReportRow) -> bytes:
+    fields = (
+        row.transaction_id,
+        row.account_id,
+        row.symbol_id,
+        row.operation_type.value,
+        row.when.isoformat(sep=" "),
+        row.sum,
+        row.asset,
+        row.eur_equivalent,
+        row.comment,
+        row.uuid,
+        row.parent_uuid,
+    )
+    return ("\t".join(str(field) for field in fields) + "\n").encode("utf-8")
@@ -7,7 +7,7 @@ from typing import Dict
 from src.infrastructure.errors import InvalidReportRowError
 
 
-@dataclass
+@dataclass(slots=True)
 class ReportRow:
     """ReportRow is raw CSV report row parsed into a dataclass."""
 
@@ -0,0 +1,89 @@
+import sys
+from decimal import Decimal, InvalidOperation
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.errors import CorruptedReportError, InvalidReportRowError
+
+
+class ReportRowParser:
+    """
+    Fast path for turning CSV report row fields into ReportRow, equivalent to ReportRow.from_dict over csv.DictReader.
+    Column positions are mapped once from the header instead of building a dict per row,
+    "When" is parsed with datetime.fromisoformat after checking the fixed format instead of strptime,
+    OperationType is looked up in a dict and repeated strings like account id and symbol id are interned.
+    """
+
+    WHEN_FORMAT_LEN = len("2020-06-29 16:10:43")
+
+    _OPERATION_TYPES: Dict[str, ReportRow.OperationType] = {op.value: op for op in ReportRow.OperationType}
+
+    def __init__(self, header: Sequence[str]) -> None:
+        columns = {name: i for i, name in reversed(list(enumerate(header)))}  # first column wins for repeated name, like in DictReader
+        try:
+            self._transaction_id = columns["Transaction ID"]
+            self._account_id = columns["Account ID"]
+            self._symbol_id = columns["Symbol ID"]
+            self._operation_type = columns["Operation type"]
+            self._when = columns["When"]
+            self._sum = columns["Sum"]
+            self._asset = columns["Asset"]
+            self._eur_equivalent = columns["EUR equivalent"]
+            self._comment = columns["Comment"]
+        except KeyError as e:
+            raise CorruptedReportError(f"Missing column in header: {e}") from e
+        self._uuid = columns.get("UUID")
+        self._parent_uuid = columns.get("Parent UUID")
+        self._num_required = 1 + max(self._transaction_id, self._account_id, self._symbol_id, self._operation_type, self._when, self._sum, self._asset, self._eur_equivalent, self._comment)
+
+    def parse(self, fields: Sequence[str]) -> ReportRow:
+        if len(fields) < self._num_required:
+            raise InvalidReportRowError(f"Expected at least {self._num_required} columns, got: {len(fields)}")
+
+        try:
+            return ReportRow(
+                transaction_id=int(fields[self._transaction_id]),
+                account_id=sys.intern(fields[self._account_id]),
+                symbol_id=sys.intern(fields[self._symbol_id]),
+                operation_type=self._parse_operation_type(fields[self._operation_type]),
+                when=self._parse_when(fields[self._when]),
+                sum=Decimal(fields[self._sum]),
+                asset=sys.intern(fields[self._asset]),
+                eur_equivalent=Decimal(fields[self._eur_equivalent]),
+                comment=fields[self._comment],
+                uuid=self._optional_field(fields, self._uuid) or "",
+                parent_uuid=self._optional_field(fields, self._parent_uuid) or "",
+            )
+        except (ValueError, InvalidOperation) as e:
+            raise InvalidReportRowError from e
+
+    def parse_transaction_id_and_comment(self, fields: Sequence[str]) -> Tuple[int, str]:
+        """Just the fields needed to pre-scan the report for ordering and rollbacks, without building ReportRow"""
+
+        if len(fields) < self._num_required:
+            raise InvalidReportRowError(f"Expected at least {self._num_required} columns, got: {len(fields)}")
+
+        try:
+            return int(fields[self._transaction_id]), fields[self._comment]
+        except ValueError as e:
+            raise InvalidReportRowError from e
+
+    def _parse_operation_type(self, value: str) -> ReportRow.OperationType:
+        try:
+            return ReportRowParser._OPERATION_TYPES[value]
+        except KeyError as e:
+            raise ValueError(f"{value!r} is not a valid {ReportRow.OperationType.__qualname__}") from e
+
+    def _parse_when(self, value: str) -> datetime:
+        # fromisoformat accepts many formats, the report has fixed one: YYYY-mm-dd HH:MM:SS
+        if len(value) != ReportRowParser.WHEN_FORMAT_LEN or value[10] != " ":
+            raise ValueError(f"Expected 'YYYY-mm-dd HH:MM:SS' datetime, got: {value!r}")
+        return datetime.fromisoformat(value)
+
+    def _optional_field(self, fields: Sequence[str], i: Optional[int]) -> Optional[str]:
+        """None if the column is missing from header or the row is shorter than header"""
+
+        if i is None or i >= len(fields):
+            return None
+        return fields[i]
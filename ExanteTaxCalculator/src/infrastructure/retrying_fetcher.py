@@ -0,0 +1,54 @@
+import time
+import logging
+import threading
+from http import HTTPStatus
+from typing import Callable, Tuple
+
+from src.domain.quotation.nbp.quotator_nbp import UrlFetcher
+
+
+class RetryingFetcher:
+    """
+    Implements UrlFetcher.
+    Retries the fetch on server errors (5xx), too many requests (429) and fetcher exceptions eg. connection reset,
+    waiting twice longer after every failed attempt.
+    Implements CountingUrlFetcherProtocol: every attempt is counted, so the retries show up in calculator --stats.
+    """
+
+    def __init__(self, fetcher: UrlFetcher, retries: int = 3, backoff_seconds: float = 0.5, sleep: Callable[[float], None] = time.sleep) -> None:
+        self._fetcher = fetcher
+        self._retries = retries
+        self._backoff_seconds = backoff_seconds
+        self._sleep = sleep
+        self._logger = logging.getLogger(__name__)
+        self._num_calls = 0
+        self._num_calls_lock = threading.Lock()  # QuotatorNBP fetches from many threads
+
+    @property
+    def num_calls(self) -> int:
+        """Calls of the wrapped fetcher so far, retries included"""
+        return self._num_calls
+
+    def __call__(self, url: str) -> Tuple[str, HTTPStatus]:
+        for attempt in range(self._retries + 1):
+            is_last_attempt = attempt == self._retries
+            with self._num_calls_lock:
+                self._num_calls += 1
+            try:
+                body, code = self._fetcher(url)
+            except Exception as e:
+                if is_last_attempt:
+                    raise
+                self._logger.warning(f"Fetching {url} failed: {e}, retrying")
+            else:
+                if is_last_attempt or not RetryingFetcher._is_worth_retrying(code):
+                    return body, code
+                self._logger.warning(f"HTTP status {code}: fetching {url}, retrying")
+
+            self._sleep(self._backoff_seconds * 2**attempt)
+
+        raise AssertionError("unreachable: last attempt either returns or raises")
+
+    @staticmethod
+    def _is_worth_retrying(code: HTTPStatus) -> bool:
+        return code >= 500 or code == HTTPStatus.TOO_MANY_REQUESTS
@@ -0,0 +1,135 @@
+"""
+Trader state at the end of a tax year, so computing the next year doesn't need to replay the whole report history.
+Snapshot is saved as JSON file:
+    {"version": 1, "year": 2020, "report_prefix": {...}, "assets": {"USD": "1500.0"}, "open_lots": [{"buy": {...}, "asset_left": "10"}]}
+Amounts are kept as strings, so Decimals round trip exactly.
+"""
+
+import os
+import re
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, TextIO
+from money import Money
+
+from src.domain.transactions import AutoConversionItem, BuyItem
+from src.domain.trading.buy_sell_fifo_matcher import OpenLot
+from src.infrastructure.errors import CorruptedSnapshotError
+from src.infrastructure.report_prefix_digest import ReportPrefix
+
+SNAPSHOT_VERSION = 1
+
+_SNAPSHOT_FILENAME = re.compile(r"^trader_snapshot_(\d{4})\.json$")
+
+
+@dataclass(frozen=True)
+class TraderSnapshot:
+    report_prefix: ReportPrefix  # the report history the snapshot results from
+    assets: Mapping[str, Decimal]  # wallet
+    open_lots: Sequence[OpenLot]  # buys not sold yet, in buy order
+
+    @property
+    def year(self) -> int:
+        return self.report_prefix.year
+
+
+def snapshot_filename(snapshot_dir: str, year: int) -> str:
+    return os.path.join(snapshot_dir, f"trader_snapshot_{year}.json")
+
+
+def find_snapshot_before(snapshot_dir: str, year: int) -> Optional[str]:
+    """Return: filename of the latest snapshot from before given year, None if there is no such snapshot"""
+
+    if not os.path.isdir(snapshot_dir):
+        return None
+
+    matches = (_SNAPSHOT_FILENAME.match(name) for name in os.listdir(snapshot_dir))
+    years = [int(match.group(1)) for match in matches if match and int(match.group(1)) < year]
+    if not years:
+        return None
+    return snapshot_filename(snapshot_dir, max(years))
+
+
+def write_snapshot_json(snapshot: TraderSnapshot, f: TextIO) -> None:
+    prefix = snapshot.report_prefix
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "year": prefix.year,
+        "report_prefix": {"num_items": prefix.num_items, "last_transaction_id": prefix.last_transaction_id, "digest": prefix.digest},
+        "assets": {asset: str(amount) for asset, amount in sorted(snapshot.assets.items())},
+        "open_lots": [{"buy": _buy_item_to_json(buy_item), "asset_left": str(asset_left)} for buy_item, asset_left in snapshot.open_lots],
+    }
+    json.dump(data, f, separators=(",", ":"))
+
+
+def parse_snapshot_json(f: TextIO) -> TraderSnapshot:
+    try:
+        data = json.load(f)
+        if data["version"] != SNAPSHOT_VERSION:
+            raise CorruptedSnapshotError(f"Trader snapshot: expected version {SNAPSHOT_VERSION}, got: {data['version']}")
+
+        prefix = data["report_prefix"]
+        return TraderSnapshot(
+            report_prefix=ReportPrefix(data["year"], prefix["num_items"], prefix["last_transaction_id"], prefix["digest"]),
+            assets={asset: Decimal(amount) for asset, amount in data["assets"].items()},
+            open_lots=[(_buy_item_from_json(lot["buy"]), Decimal(lot["asset_left"])) for lot in data["open_lots"]],
+        )
+    except (ValueError, InvalidOperation, KeyError, AttributeError, TypeError) as e:
+        raise CorruptedSnapshotError(f"Trader snapshot: malformed JSON: {e!r}") from e
+
+
+def read_snapshot(filename: str) -> TraderSnapshot:
+    with open(filename, encoding="utf-8") as f:
+        return parse_snapshot_json(f)
+
+
+def save_snapshot(snapshot: TraderSnapshot, filename: str) -> None:
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    # write to temp file first, so failure doesn't leave broken snapshot behind
+    tmp_name = filename + ".tmp"
+    with open(tmp_name, "w", encoding="utf-8") as f:
+        write_snapshot_json(snapshot, f)
+    os.replace(tmp_name, filename)
+
+
+def _money_to_json(money: Money) -> List[str]:
+    return [str(money.amount), money.currency]
+
+
+def _money_from_json(data: List[str]) -> Money:
+    amount, currency = data
+    return Money(Decimal(amount), currency)
+
+
+def _buy_item_to_json(item: BuyItem) -> Dict[str, Any]:
+    return {
+        "asset_name": item.asset_name,
+        "amount": str(item.amount),
+        "paid": _money_to_json(item.paid),
+        "commission": _money_to_json(item.commission),
+        "autoconversions": [
+            {"from": _money_to_json(a.conversion_from), "to": _money_to_json(a.conversion_to), "date": a.date.isoformat(), "transaction_id": a.transaction_id}
+            for a in item.autoconversions
+        ],
+        "date": item.date.isoformat(),
+        "transaction_id": item.transaction_id,
+    }
+
+
+def _buy_item_from_json(data: Dict[str, Any]) -> BuyItem:
+    autoconversions = [
+        AutoConversionItem(_money_from_json(a["from"]), _money_from_json(a["to"]), datetime.fromisoformat(a["date"]), a["transaction_id"])
+        for a in data["autoconversions"]
+    ]
+    return BuyItem(
+        asset_name=data["asset_name"],
+        amount=Decimal(data["amount"]),
+        paid=_money_from_json(data["paid"]),
+        commission=_money_from_json(data["commission"]),
+        autoconversions=tuple(autoconversions),
+        date=datetime.fromisoformat(data["date"]),
+        transaction_id=data["transaction_id"],
+    )
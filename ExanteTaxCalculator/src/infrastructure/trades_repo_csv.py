@@ -12,14 +12,16 @@ After parsing all rows, the items are sorted ascending 1. by date 2. by transact
 """
 
 import csv
+import logging
 from typing import List, Iterable, Sequence, Optional
-from copy import deepcopy
 from src.domain.transactions import *
 from src.infrastructure.report_row import ReportRow
 from src.infrastructure.trade_item_builder import TradeItemBuilder
 from src.infrastructure.errors import CorruptedReportError
 from src.infrastructure.errors import InvalidTradeError
 
+_logger = logging.getLogger(__name__)
+
 
 class TradesRepoCSV:
     """
@@ -74,7 +76,7 @@ class TradesRepoCSV:
         n_row = 2  # row 1 is the header
         for row_dict in reader:
             row = ReportRow.from_dict(row_dict)
-            print(f"processing row: {n_row}\n\t{row}")
+            _logger.debug("processing row: %d\n\t%s", n_row, row)
             if self._is_beginning_of_new_item(row):
                 try:
                     self._push_item()
@@ -91,7 +93,7 @@ class TradesRepoCSV:
     def items(self) -> List[TransactionItem]:
         """Items are sorted by date, ascending"""
 
-        return deepcopy(self._items)
+        return list(self._items)  # the items are frozen, only the list needs copying
 
     def _validate_header(self, header: Optional[Iterable[str]]) -> None:
         if header is None:
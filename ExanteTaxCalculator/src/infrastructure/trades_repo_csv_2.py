@@ -2,17 +2,36 @@
 In a report, the rows may come not exactly sorted by TransactionID in ascending order.
 Such ordering is required to correctly build TransactionItems from ReportRows.
 Repo will ensure such ordering.
+The report lines are streamed: CSV lines -> ReportRows -> sort by TransactionID -> rollbacks filter -> TransactionItems,
+so only the sorting needs to hold the rows, and it spills them to disk above max_rows_in_memory.
+Report that can be read twice (ReportCSVFile, list of lines) is first pre-scanned for TransactionIDs and rollbacks;
+if it comes sorted or reverse sorted, it is read in that direction instead, so TransactionItems are built while the report
+is still being parsed. ReportCSVFile with only local disorder is also read that way and sorted in a small window, see: window_sort;
+in-memory lines with any disorder are cheaper to fully sort than to parse twice.
+ReportCSVFile with jobs > 1 is parsed in worker processes instead, and its rows are merged by TransactionID in memory.
+On request, the rows are also fingerprinted up to the end of given years, see: ReportPrefixDigest.
+Every row can be traced with DEBUG logging, see: calculator --trace-rows; it is off by default, then no row gets formatted.
 """
 
+import re
 import csv
-from typing import List, Iterable, Sequence, Optional, Set
-from copy import deepcopy
+import heapq
+import logging
+import itertools
+from array import array
+from dataclasses import astuple, dataclass
+from typing import Callable, Dict, List, Iterable, Iterator, Optional, Sequence, Set, Tuple, Type
 from src.domain.transactions import *
 from src.infrastructure.report_row import ReportRow
+from src.infrastructure.report_row_parser import ReportRowParser
+from src.infrastructure.report_csv_file import ReportCSVFile
 from src.infrastructure.trade_item_builder import TradeItemBuilder
 from src.infrastructure.errors import CorruptedReportError
 from src.infrastructure.errors import InvalidTradeError
 from src.infrastructure.builders.building import Builder
+from src.infrastructure.external_sort import sorted_external
+from src.infrastructure.window_sort import Direction, detect_order, window_sorted
+from src.infrastructure.report_prefix_digest import ReportPrefix, ReportPrefixDigest
 from src.infrastructure.builders import (
     TradeBuilder,
     FoundingWithdrawalBuilder,
@@ -26,6 +45,18 @@ from src.infrastructure.builders import (
     FeeBuilder
 )
 
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RowCounts:
+    """How many report rows went through each load stage"""
+
+    parsed: int = 0  # rows read from the report
+    rolled_back: int = 0  # rolled back and rollback rows, filtered out
+    built: int = 0  # rows built into items
+    items: int = 0  # TransactionItems built
+
 
 class TradesRepoCSV2:
     """
@@ -50,71 +81,119 @@ class TradesRepoCSV2:
         "Parent UUID"
     ]
 
-    def __init__(self) -> None:
-        self._items: List[TransactionItem] = []
+    # builder for the first row of an item; it takes the next rows while they make the same item
+    BUILDERS: Dict[ReportRow.OperationType, Type[Builder]] = {
+        ReportRow.OperationType.TRADE: TradeBuilder,
+        ReportRow.OperationType.FUNDING_WITHDRAWAL: FoundingWithdrawalBuilder,
+        ReportRow.OperationType.TAX: TaxBuilder,
+        ReportRow.OperationType.US_TAX: TaxBuilder,
+        ReportRow.OperationType.ISSUANCE_FEE: IssuanceFeeBuilder,
+        ReportRow.OperationType.CORPORATE_ACTION: CorporateActionBuilder,
+        ReportRow.OperationType.STOCK_SPLIT: StockSplitBuilder,
+        ReportRow.OperationType.DIVIDEND: DividendBuilder,
+        ReportRow.OperationType.AUTOCONVERSION: AutoConversionBuilder,
+        ReportRow.OperationType.FEE: FeeBuilder,
+    }
 
-    def load(self, report_csv_lines: Sequence[str], delimiter: str = "\t") -> None:
-        # parse Exante report CSV lines into ReportRows
-        report_rows = self._csv_to_report_rows(report_csv_lines, delimiter)
+    MAX_ROWS_IN_MEMORY = 200_000  # above that, sorting by TransactionID goes through temporary files
+    DISORDER_WINDOW = 1_000  # nearly sorted report is sorted in window of that many rows, instead of full sort
 
-        # filter rollbacks
-        filtered_rows = filter_rollbacked_rows(report_rows)
+    def __init__(self, max_rows_in_memory: int = MAX_ROWS_IN_MEMORY, disorder_window: int = DISORDER_WINDOW) -> None:
+        self._items: List[TransactionItem] = []
+        self._prefixes: Dict[int, ReportPrefix] = {}
+        self._max_rows_in_memory = max_rows_in_memory
+        self._disorder_window = disorder_window
+        self._row_counts = RowCounts()
 
-        # ReportRows need to be processed in ascending transaction_id order
-        sorted_rows = sort_rows_by_transactionid_ascendig(filtered_rows)
+    def load(self, report_csv_lines: Iterable[str], delimiter: str = "\t", prefix_years: Iterable[int] = ()) -> None:
+        """
+        prefix_years: years to fingerprint the report history up to the end of, see: prefixes.
+        report_csv_lines as ReportCSVFile with jobs > 1 get parsed in parallel; the result is the same.
+        """
 
-        # stop processing if no rows to be processed
-        if len(sorted_rows) == 0:
-            return
+        if isinstance(report_csv_lines, ReportCSVFile) and report_csv_lines.jobs > 1:
+            sorted_rows, rollbacks = self._parse_in_parallel(report_csv_lines, delimiter)
+        else:
+            sorted_rows, rollbacks = self._parse(report_csv_lines, delimiter)
+
+        # ...and filtered out after sorting, when all of them are known
+        filtered_rows = rollbacks.filter(sorted_rows)
 
         # build TransactionItems from ReportRows
+        num_items = len(self._items)
+        num_rows = self.build_items(filtered_rows, prefix_years)
+
+        self._row_counts = RowCounts(
+            parsed=num_rows + rollbacks.num_filtered_out,
+            rolled_back=rollbacks.num_filtered_out,
+            built=num_rows,
+            items=len(self._items) - num_items,
+        )
+        _logger.debug("Rows parsed: %d, rolled back: %d, built: %d into items: %d", *astuple(self._row_counts))
+
+    def build_items(self, rows: Iterable[ReportRow], prefix_years: Iterable[int] = ()) -> int:
+        """
+        The last stage of load: build TransactionItems from rows sorted by TransactionID, with rollbacks filtered out, and add them to items.
+        Return: number of rows built
+        """
+
         builder: Builder = SentinelBuilder()
-        for rown, row in enumerate(sorted_rows):
-            print(f"Processing row {rown}, transaction: {row.transaction_id}")
+        prefix_digest = ReportPrefixDigest(prefix_years)
+        num_rows = 0
+        trace = _logger.isEnabledFor(logging.DEBUG)  # checked once, not for every row
+        for rown, row in enumerate(rows):
+            num_rows += 1
+            if trace:
+                _logger.debug("Processing row %d, transaction: %d", rown, row.transaction_id)
 
             if isinstance(builder, SentinelBuilder):
-                print(f"NEW BUILDER: {row.operation_type}")
+                if trace:
+                    _logger.debug("New builder: %s", row.operation_type)
                 builder = self._get_builder(row.operation_type)
 
             if not builder.add(row):
-                self._items.append(builder.build())
-                print(f"NEW BUILDER: {row.operation_type}")
+                self._add_item(builder.build(), prefix_digest)
+                if trace:
+                    _logger.debug("New builder: %s", row.operation_type)
                 builder = self._get_builder(row.operation_type)
                 builder.add(row)
-            print(row)
-            print()
-        # append the final TransactionItems
-        self._items.append(builder.build())
+            prefix_digest.add_row(row)
+            if trace:
+                _logger.debug("%s\n", row)
+
+        # append the final TransactionItems, if any rows were processed
+        if num_rows > 0:
+            self._add_item(builder.build(), prefix_digest)
+        self._prefixes = prefix_digest.prefixes
+        return num_rows
 
     @property
     def items(self) -> List[TransactionItem]:
         """Items are sorted by date, ascending"""
 
-        return deepcopy(self._items)
+        return list(self._items)  # the items are frozen, only the list needs copying
+
+    @property
+    def row_counts(self) -> RowCounts:
+        """Rows that went through each stage of the last load"""
+
+        return self._row_counts
+
+    @property
+    def prefixes(self) -> Dict[int, ReportPrefix]:
+        """Report history fingerprints for the prefix_years given to load"""
+
+        return dict(self._prefixes)
+
+    def _add_item(self, item: TransactionItem, prefix_digest: ReportPrefixDigest) -> None:
+        self._items.append(item)
+        prefix_digest.add_item(item)
 
     def _get_builder(self, op: ReportRow.OperationType) -> Builder:
-        if op == ReportRow.OperationType.TRADE:
-            return TradeBuilder()
-        elif op == ReportRow.OperationType.FUNDING_WITHDRAWAL:
-            return FoundingWithdrawalBuilder()
-        elif op == ReportRow.OperationType.TAX:
-            return TaxBuilder()
-        elif op == ReportRow.OperationType.US_TAX:
-            return TaxBuilder()
-        elif op == ReportRow.OperationType.ISSUANCE_FEE:
-            return IssuanceFeeBuilder()
-        elif op == ReportRow.OperationType.CORPORATE_ACTION:
-            return CorporateActionBuilder()
-        elif op == ReportRow.OperationType.STOCK_SPLIT:
-            return StockSplitBuilder()
-        elif op == ReportRow.OperationType.DIVIDEND:
-            return DividendBuilder()
-        elif op == ReportRow.OperationType.AUTOCONVERSION:
-            return AutoConversionBuilder()
-        elif op == ReportRow.OperationType.FEE:
-            return FeeBuilder()
-        else:
+        builder_type = TradesRepoCSV2.BUILDERS.get(op)
+        if builder_type is None:
             raise InvalidTradeError(f"Unknown trading operation: {op}")
+        return builder_type()
 
     def _validate_header(self, header: Optional[Iterable[str]]) -> None:
         if header is None:
@@ -125,38 +204,160 @@ class TradesRepoCSV2:
         if len(missing_columns) > 0:
             raise CorruptedReportError(f"Missing columns in header: {missing_columns}")
 
-    def _csv_to_report_rows(self, report_csv_lines: Sequence[str], delimiter: str) -> List[ReportRow]:
-        reader = csv.DictReader(f=report_csv_lines, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL)
+    def _parse(self, report_csv_lines: Iterable[str], delimiter: str) -> Tuple[Iterator[ReportRow], "RollbacksFilter"]:
+        """Return: (ReportRows sorted by TransactionID, rollbacks filter with all the rollbacks collected once the rows are iterated)"""
+
+        nearly_sorted = self._parse_nearly_sorted(report_csv_lines, delimiter)
+        if nearly_sorted is not None:
+            return nearly_sorted
+
+        # parse Exante report CSV lines into ReportRows
+        report_rows = self.parse_rows(report_csv_lines, delimiter)
+
+        # rollbacks are collected on the way to sorting...
+        rollbacks = RollbacksFilter()
+        report_rows = rollbacks.collect(report_rows)
+
+        # ReportRows need to be processed in ascending transaction_id order
+        return sort_rows_by_transactionid_ascendig(report_rows, self._max_rows_in_memory), rollbacks
+
+    def _parse_nearly_sorted(self, report_csv_lines: Iterable[str], delimiter: str) -> Optional[Tuple[Iterator[ReportRow], "RollbacksFilter"]]:
+        """
+        Return: like _parse but without full sort, None if the report can't be read twice or is not nearly sorted.
+        In-memory lines count as nearly sorted only when sorted or reverse sorted, with no disorder at all.
+        """
+
+        lines_reversed: Callable[[], Iterator[str]]
+        if isinstance(report_csv_lines, ReportCSVFile):
+            header, rows_start = report_csv_lines.read_header(delimiter)
+            lines_reversed = lambda: report_csv_lines.lines_reversed(rows_start)
+        elif isinstance(report_csv_lines, (list, tuple)):
+            header = next(self._csv_reader(report_csv_lines[:1], delimiter), None)
+            lines_reversed = lambda: (report_csv_lines[i] for i in range(len(report_csv_lines) - 1, 0, -1))
+        else:
+            return None  # single pass iterable
+        lines = lambda: itertools.islice(report_csv_lines, 1, None)  # skip the header
+        self._validate_header(header)
+        assert header is not None
+        parser = ReportRowParser(header)
+
+        # raw pre-scan: transaction ids in input order and the rollbacks, without building ReportRows
+        in_memory = not isinstance(report_csv_lines, ReportCSVFile)
+        went_up = went_down = False
+        rollbacks = RollbacksFilter()
+        transaction_ids = array("q")
+        for fields in self._csv_reader(lines(), delimiter):
+            if fields:  # blank lines are skipped like in csv.DictReader
+                transaction_id, comment = parser.parse_transaction_id_and_comment(fields)
+                if in_memory and transaction_ids:
+                    went_up = went_up or transaction_id > transaction_ids[-1]
+                    went_down = went_down or transaction_id < transaction_ids[-1]
+                    if went_up and went_down:
+                        return None  # neither sorted nor reverse sorted, no need to pre-scan the rest
+                transaction_ids.append(transaction_id)
+                rollbacks.collect_comment(transaction_id, comment)
+
+        # sort key is (transaction id, input position), so the order is the same as of stable full sort; packed into single int
+        num_rows = len(transaction_ids)
+        sort_keys = array("q", (transaction_id * num_rows + i for i, transaction_id in enumerate(transaction_ids)))
+        order = detect_order(sort_keys, 0 if in_memory else self._disorder_window)
+        _logger.debug("Report rows order: %s", order)
+        if order is None:
+            return None
+
+        direction, window = order
+        if direction == Direction.FORWARD:
+            positioned_rows = zip(itertools.count(), self._parse_lines(lines(), parser, delimiter))
+        else:
+            positioned_rows = zip(itertools.count(num_rows - 1, -1), self._parse_lines(lines_reversed(), parser, delimiter))
+        keyed_rows = ((row.transaction_id, i, row) for i, row in positioned_rows)
+        return (row for _, _, row in window_sorted(keyed_rows, window)), rollbacks
+
+    def _parse_in_parallel(self, report_file: ReportCSVFile, delimiter: str) -> Tuple[Iterator[ReportRow], "RollbacksFilter"]:
+        header, rows_start = report_file.read_header(delimiter)
+        self._validate_header(header)
+        assert header is not None
+
+        # batches come parsed and each sorted by transaction_id; merging them in file order keeps the sorting stable
+        batches = report_file.parse_rows_in_parallel(header, rows_start, delimiter)
+
+        rollbacks = RollbacksFilter()
+        for batch in batches:
+            for transaction_id, comment in zip(batch.transaction_ids, batch.comments):
+                rollbacks.collect_comment(transaction_id, comment)
+
+        return heapq.merge(*batches, key=lambda row: row.transaction_id), rollbacks
 
-        # check csv header is present and formed as expected
-        self._validate_header(reader.fieldnames)
+    @staticmethod
+    def _csv_reader(lines: Iterable[str], delimiter: str) -> Iterator[List[str]]:
+        return csv.reader(lines, delimiter=delimiter, quotechar='"', quoting=csv.QUOTE_ALL)
 
-        # parse the lines into ReportRow items
-        return [ReportRow.from_dict(d) for d in reader]
+    @staticmethod
+    def _parse_lines(lines: Iterable[str], parser: ReportRowParser, delimiter: str) -> Iterator[ReportRow]:
+        # parse the lines into ReportRow items, one at a time; blank lines are skipped like in csv.DictReader
+        return (parser.parse(fields) for fields in TradesRepoCSV2._csv_reader(lines, delimiter) if fields)
 
+    def parse_rows(self, report_csv_lines: Iterable[str], delimiter: str = "\t") -> Iterator[ReportRow]:
+        """The first stage of load: report rows in input order, neither sorted nor with rollbacks filtered out"""
 
-def filter_rollbacked_rows(rows: List[ReportRow]) -> List[ReportRow]:
-    """Need to filter both, rolled back rows and rows specifying the rollbacks"""
-    import re
+        reader = self._csv_reader(report_csv_lines, delimiter)
+
+        # check csv header is present and formed as expected; this reads just the header line
+        header = next(reader, None)
+        self._validate_header(header)
+        assert header is not None
+        parser = ReportRowParser(header)
+
+        # parse the lines into ReportRow items, one at a time; blank lines are skipped like in csv.DictReader
+        return (parser.parse(fields) for fields in reader if fields)
+
+
+class RollbacksFilter:
+    """
+    Need to filter both, rolled back rows and rows specifying the rollbacks.
+    Rollbacks are collected while the rows stream by, filtering is lazy pass over the sorted rows; no row list is built.
+    """
 
     TRANSACTION_ID_PATTERN = r"#\d+"  # e.g. "#123456"
+    TRANSACTION_ID_REGEX = re.compile(TRANSACTION_ID_PATTERN)
 
-    transactions_to_remove: Set[int] = set()
+    def __init__(self) -> None:
+        self._transactions_to_remove: Set[int] = set()
+        self.num_filtered_out = 0
 
-    for row in rows:
-        findings = re.findall(TRANSACTION_ID_PATTERN, row.comment)
+    def collect(self, rows: Iterable[ReportRow]) -> Iterator[ReportRow]:
+        """Pass the rows through, remembering the rollbacks found on the way"""
+
+        for row in rows:
+            if "#" in row.comment:  # cheap precheck; most of the comments don't refer to other transactions
+                self.collect_comment(row.transaction_id, row.comment)
+            yield row
+
+    def collect_comment(self, transaction_id: int, comment: str) -> None:
+        """Remember the rollback, if the comment of given transaction specifies one"""
+
+        if "#" not in comment:
+            return
+
+        findings = RollbacksFilter.TRANSACTION_ID_REGEX.findall(comment)
         if len(findings) == 1:
             found_hash_id = findings[0]
             transaction_id_to_rollback = int(found_hash_id[1:])  # skip the prefix '#' in #123456
-            transactions_to_remove.add(transaction_id_to_rollback)  # remove transaction to rollback
-            transactions_to_remove.add(row.transaction_id)  # remove the rollbacker itself
+            self._transactions_to_remove.add(transaction_id_to_rollback)  # remove transaction to rollback
+            self._transactions_to_remove.add(transaction_id)  # remove the rollbacker itself
         elif len(findings) > 1:
-            print(f"More than one transaction to rollback? - {row.comment}, {findings}")
+            _logger.warning("More than one transaction to rollback? - %s, %s", comment, findings)
+
+    def filter(self, rows: Iterable[ReportRow]) -> Iterator[ReportRow]:
+        """The rows must be collected first, eg. by sorting that consumes all the collected rows before yielding any"""
 
-    return [row for row in rows if row.transaction_id not in transactions_to_remove]
+        for row in rows:
+            if row.transaction_id in self._transactions_to_remove:
+                self.num_filtered_out += 1
+            else:
+                yield row
 
 
-def sort_rows_by_transactionid_ascendig(rows: List[ReportRow]) -> List[ReportRow]:
+def sort_rows_by_transactionid_ascendig(rows: Iterable[ReportRow], max_rows_in_memory: int = TradesRepoCSV2.MAX_ROWS_IN_MEMORY) -> Iterator[ReportRow]:
     sort_by_transaction_id = lambda row: row.transaction_id
-    rows.sort(key=sort_by_transaction_id)
-    return rows
+    return sorted_external(rows, key=sort_by_transaction_id, max_items_in_memory=max_rows_in_memory)
@@ -0,0 +1,75 @@
+"""
+Sorting of nearly sorted item streams without holding the whole stream.
+Exante reports come almost perfectly reverse ordered by TransactionID, with only local disorder;
+read from the end, such report is sorted by a heap of just a few items, and the sorted items flow as the input is read.
+Whether the input is nearly sorted - and which way - is told from its keys, see: detect_order.
+"""
+
+import heapq
+from enum import Enum
+from typing import Any, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, TypeVar
+
+
+class _Comparable(Protocol):
+    """Heap items and sort keys, eg. (TransactionID, input position, row) tuples"""
+
+    def __lt__(self, other: Any) -> bool:
+        pass
+
+
+T = TypeVar("T", bound=_Comparable)
+
+
+class Direction(Enum):
+    FORWARD = "forward"
+    BACKWARD = "backward"
+
+
+def window_sorted(items: Iterable[T], window: int) -> Iterator[T]:
+    """
+    Like sorted(items), provided that each item is less than window positions away from its sorted place.
+    Items are yielded as the input is read, only up to window items are held at once.
+    """
+
+    heap: List[T] = []
+    for item in items:
+        if len(heap) < window:
+            heapq.heappush(heap, item)
+        else:
+            yield heapq.heappushpop(heap, item)
+    while heap:
+        yield heapq.heappop(heap)
+
+
+def sorts_within_window(keys: Iterable[T], window: int) -> bool:
+    """Return: True if window_sorted with given window yields the keys sorted; window 0 means the keys are sorted already"""
+
+    heap: List[T] = []
+    last: Optional[T] = None
+    for key in keys:
+        if len(heap) < window:
+            heapq.heappush(heap, key)
+            continue
+        key = heapq.heappushpop(heap, key)
+        if last is not None and key < last:
+            return False
+        last = key
+
+    if heap and last is not None and min(heap) < last:
+        return False
+    return True
+
+
+def detect_order(keys: Sequence[T], max_window: int) -> Optional[Tuple[Direction, int]]:
+    """
+    keys: sort keys of the items in input order.
+    Return: (direction to read the input in, window to sort it with), smallest window first; None if the input is not nearly sorted.
+    """
+
+    backward = lambda: (keys[i] for i in range(len(keys) - 1, -1, -1))
+    for window in (0, max_window):
+        if sorts_within_window(keys, window):
+            return Direction.FORWARD, window
+        if sorts_within_window(backward(), window):
+            return Direction.BACKWARD, window
+    return None
@@ -0,0 +1,58 @@
+import os
+import sys
+import argparse
+import requests
+from typing import Callable, List, Sequence
+
+from src.infrastructure.nbp_archive_file import ARCHIVE_CSV_URL, ARCHIVE_CSV_ENCODING, Rates, merge_rates, parse_archive_csv, read_archive, write_archive_json
+
+YearDownloader = Callable[[int], str]
+
+
+def download_archive_csv(year: int) -> str:
+    """ Return: NBP yearly table A archive CSV content """
+    r = requests.get(ARCHIVE_CSV_URL.format(year=year), timeout=60)
+    r.raise_for_status()
+    return r.content.decode(ARCHIVE_CSV_ENCODING)
+
+
+def build_archive(archive_name: str, csv_names: Sequence[str], years: Sequence[int], download: YearDownloader = download_archive_csv) -> Rates:
+    """
+    Build the archive JSON from NBP yearly archive CSVs - local files and years to download.
+    Existing archive is refreshed: its quotes are kept, the new ones are added on top.
+    """
+
+    sources: List[Rates] = []
+    if os.path.exists(archive_name):
+        sources.append(read_archive(archive_name))
+    sources.extend(read_archive(csv_name) for csv_name in csv_names)
+    sources.extend(parse_archive_csv(download(year).splitlines()) for year in years)
+    rates = merge_rates(*sources)
+
+    # write to temp file first, so failure doesn't leave broken archive behind
+    tmp_name = archive_name + ".tmp"
+    with open(tmp_name, "w", encoding="utf-8") as f:
+        write_archive_json(rates, f)
+    os.replace(tmp_name, archive_name)
+    return rates
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="exante-nbp-archive", description="Build or refresh local NBP table A archive for offline exante-calculator runs")
+    parser.add_argument("archive_name", help="archive JSON file to build or refresh, eg. nbp_archive.json")
+    parser.add_argument("csv_names", nargs="*", help="NBP yearly archive CSV files, eg. archiwum_tab_a_2020.csv")
+    parser.add_argument("--download", type=int, nargs="+", default=[], metavar="YEAR", help="download yearly archive CSVs from NBP, eg. --download 2020 2021")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    " Entry point for exante-nbp-archive command installed with: pip install ."
+    args = parse_args(sys.argv[1:])
+    rates = build_archive(args.archive_name, args.csv_names, args.download)
+    for currency, daily in sorted(rates.items(), key=lambda item: str(item[0])):
+        if daily:
+            print(f"{currency}: {len(daily)} quotes, {min(daily)}..{max(daily)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import re
+import json
+import datetime
+import unittest
+import threading
+import requests
+from http import HTTPStatus
+from decimal import Decimal
+from typing import Tuple, Set
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from src.domain.currency import Currency, USD, EUR
+from src.domain.quotation.nbp.quotator_nbp import QuotatorNBP
+from src.infrastructure.retrying_fetcher import RetryingFetcher
+
+RANGE_PATH = re.compile(r"^/api/exchangerates/rates/a/(\w{3})/(\d{4}-\d{2}-\d{2})/(\d{4}-\d{2}-\d{2})$")
+
+
+def mid_for(currency: str, day: datetime.date) -> str:
+    """Fake, but easy to check quote: 1.0DDMM for USD, 2.0DDMM for EUR"""
+    return f"{1 if currency == 'USD' else 2}.0{day:%d%m}"
+
+
+class NBPStub(BaseHTTPRequestHandler):
+    """Stands in for api.nbp.pl: serves table A date ranges, weekdays only; answers every path with 503 on the first try"""
+
+    lock = threading.Lock()
+    seen_paths: Set[str] = set()
+    in_flight = 0
+    max_in_flight = 0
+    num_requests = 0
+
+    def do_GET(self) -> None:
+        cls = NBPStub
+        with cls.lock:
+            cls.num_requests += 1
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            first_try = self.path not in cls.seen_paths
+            cls.seen_paths.add(self.path)
+        try:
+            threading.Event().wait(0.02)  # some network latency
+            if first_try:
+                self._respond(HTTPStatus.SERVICE_UNAVAILABLE, "503 Service Unavailable")
+            else:
+                self._respond_range()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _respond_range(self) -> None:
+        match = RANGE_PATH.match(self.path)
+        if not match:
+            self._respond(HTTPStatus.NOT_FOUND, "404 NotFound")
+            return
+
+        currency, start, end = match.groups()
+        day, last_day = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+        rates = []
+        while day <= last_day:
+            if day.weekday() < 5:
+                rates.append({"no": "000/A/NBP/0000", "effectiveDate": day.isoformat(), "mid": float(mid_for(currency, day))})
+            day += datetime.timedelta(days=1)
+        self._respond(HTTPStatus.OK, json.dumps({"table": "A", "code": currency, "rates": rates}))
+
+    def _respond(self, code: HTTPStatus, body: str) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # keep test output clean
+
+
+def http_fetch(url: str) -> Tuple[str, HTTPStatus]:
+    r = requests.get(url, timeout=10)
+    return r.text, HTTPStatus(r.status_code)
+
+
+class QuotatorNBPHttpTest(unittest.TestCase):
+    def setUp(self) -> None:
+        NBPStub.seen_paths = set()
+        NBPStub.in_flight = NBPStub.max_in_flight = NBPStub.num_requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), NBPStub)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/exchangerates/rates/a"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch_of_days_fetched_concurrently_with_retries(self) -> None:
+        # given
+        fetcher = RetryingFetcher(http_fetch, retries=2, backoff_seconds=0.01)
+        quotator = QuotatorNBP(fetcher, max_workers=4, api_url=self.api_url)
+        days = [(currency, datetime.date(2020, 1, 1) + datetime.timedelta(days=n)) for n in range(0, 366, 7) for currency in (USD, EUR)]
+
+        # when
+        quotes = quotator.get_average_pln_for_days(days)
+
+        # then
+        for (currency, day), quote in quotes.items():
+            expected = Decimal(float(mid_for(currency.value, day))) if day.weekday() < 5 else None
+            self.assertEqual(quote, expected, f"{currency} {day}")
+        self.assertEqual(NBPStub.num_requests, 2 * 2 * 4)  # 2 currencies, 4 ranges of 93 days in a year, each first answered with 503
+        self.assertLessEqual(NBPStub.max_in_flight, 4)
+
+    def test_quotes_known_after_batch_are_not_fetched_again(self) -> None:
+        # given
+        fetcher = RetryingFetcher(http_fetch, retries=2, backoff_seconds=0.01)
+        quotator = QuotatorNBP(fetcher, max_workers=4, api_url=self.api_url)
+        days = [(USD, datetime.date(2020, 5, 11) + datetime.timedelta(days=n)) for n in range(7)]
+        _ = quotator.get_average_pln_for_days(days)
+        num_requests = NBPStub.num_requests
+
+        # when
+        friday = quotator.get_average_pln_for_day(USD, datetime.date(2020, 5, 15))
+
+        # then
+        self.assertEqual(friday, Decimal(float(mid_for("USD", datetime.date(2020, 5, 15)))))
+        self.assertEqual(NBPStub.num_requests, num_requests)
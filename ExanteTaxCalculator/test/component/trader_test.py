@@ -2,13 +2,16 @@ import unittest
 import datetime
 from money import Money
 from decimal import Decimal
-from typing import Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from src.domain.currency import Currency
 from src.domain.quotation.dividend_item_pln import DividendItemPLN
 from src.domain.quotation.tax_item_pln import TaxItemPLN
 from src.domain.profit_item import ProfitPLN
 from src.application.trader import Trader
+from src.domain.transactions import SellItem
+from src.infrastructure.errors import SnapshotMismatchError
+from test.utils.capture_exception import capture_exception
 
 TAX_PERCENTAGE = Decimal("19.0")
 
@@ -48,6 +51,44 @@ class QuotesProviderStub:
         raise ValueError(f"Expected USD or SGD, got: {currency}")
 
 
+class CountingQuotesProviderStub(QuotesProviderStub):
+    def __init__(self) -> None:
+        self.days_asked: List[Tuple[Currency, datetime.date]] = []
+
+    def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
+        self.days_asked.append((currency, date))
+        return super().get_average_pln_for_day(currency, date)
+
+
+class QuotesProviderWithCountersStub(CountingQuotesProviderStub):
+    @property
+    def counters(self) -> Dict[str, int]:
+        return {"quote lookups": len(self.days_asked)}
+
+
+TWO_YEARS_TWO_BUYS_REPORT = [
+    '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+    # year 2021: sell 50 PHYS for 600 USD - from the second buy
+    '"6001"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2021-10-23 20:40:55"	"-50"	"PHYS.ARCA"	"0"	"None"',
+    '"6002"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2021-10-23 20:40:55"	"601.0"	"USD"	"0"	"None"',
+    '"6003"	"TBA9999.001"	"PHYS.ARCA"	"COMMISSION"	"2021-10-23 20:40:55"	"-1.0"	"USD"	"0"	"None"',
+    # year 2020: sell 50 PHYS for 800 USD - from the first buy
+    '"4001"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-23 20:40:55"	"-50"	"PHYS.ARCA"	"0"	"None"',
+    '"4002"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-23 20:40:55"	"801.0"	"USD"	"0"	"None"',
+    '"4003"	"TBA9999.001"	"PHYS.ARCA"	"COMMISSION"	"2020-10-23 20:40:55"	"-1.0"	"USD"	"0"	"None"',
+    # buy 50 PHYS for 900 USD
+    '"3101"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 20:40:56"	"50"	"PHYS.ARCA"	"0"	"None"',
+    '"3102"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 20:40:56"	"-899.0"	"USD"	"0"	"None"',
+    '"3103"	"TBA9999.001"	"PHYS.ARCA"	"COMMISSION"	"2020-10-22 20:40:56"	"-1.0"	"USD"	"0"	"None"',
+    # buy 50 PHYS for 700 USD
+    '"3001"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 20:40:55"	"50"	"PHYS.ARCA"	"0"	"None"',
+    '"3002"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 20:40:55"	"-699.0"	"USD"	"0"	"None"',
+    '"3003"	"TBA9999.001"	"PHYS.ARCA"	"COMMISSION"	"2020-10-22 20:40:55"	"-1.0"	"USD"	"0"	"None"',
+    # add 2000 USD
+    '"1000"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 20:40:55"	"2000.0"	"USD"	"0"	"None"',
+]
+
+
 class TraderTest(unittest.TestCase):
     def test_empty_input_empty_output(self) -> None:
         # given
@@ -71,6 +112,24 @@ class TraderTest(unittest.TestCase):
         self.assertEqual(trader.report.dividends, [])
         self.assertEqual(trader.report.dividend_taxes, [])
 
+    def test_owned_assets_not_changed_by_further_trading(self) -> None:
+        # given
+        csv_report_lines = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            # add 100 USD
+            '"1000"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 20:40:55"	"100"	"USD"	"0"	"None"',
+        ]
+        quotes_provider_stub = QuotesProviderStub()
+        trader = Trader(quotes_provider=quotes_provider_stub, tax_percentage=TAX_PERCENTAGE)
+        trader.trade_items(csv_report_lines, 2020)
+
+        # when
+        owned_assets = trader.owned_asssets
+        trader.trade_items(csv_report_lines, 2020)
+
+        # then
+        self.assertEqual(owned_assets, {"USD": Decimal("100")})
+
     def test_fund_withdraw_success(self) -> None:
         # given
         csv_report_lines = [
@@ -754,6 +813,146 @@ class TraderTest(unittest.TestCase):
         self.assertEqual(trader.report.dividends, [])
         self.assertEqual(trader.report.dividend_taxes, [])
 
+    def test_sell_from_previous_year_depletes_lots(self) -> None:
+        # given
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+
+        # then
+        self.assertEqual(trader.owned_asssets["PHYS.ARCA"], Decimal("0"))
+        self.assertEqual(trader.owned_asssets["USD"], Decimal("1800"))
+        self.assertEqual(trader.report.results.shares_total_income, USD_TO_PLN(600))
+        self.assertEqual(trader.report.results.shares_total_cost, USD_TO_PLN(900))
+        self.assertEqual(len(trader.report.trades_by_asset["PHYS.ARCA"]), 1)
+
+    def test_continue_from_snapshot_same_as_full_replay(self) -> None:
+        # given
+        previous_year_trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+        previous_year_trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2020)
+        snapshot = previous_year_trader.snapshot
+        full_replay_trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        full_replay_trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+        assert snapshot is not None
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021, snapshot)
+
+        # then
+        self.assertEqual(snapshot.year, 2020)
+        self.assertEqual(snapshot.assets, {"USD": Decimal("1200"), "PHYS.ARCA": Decimal("50")})
+        self.assertEqual([(buy.transaction_id, left) for buy, left in snapshot.open_lots], [(3101, Decimal("50"))])
+        self.assertEqual(trader.owned_asssets, full_replay_trader.owned_asssets)
+        self.assertEqual(trader.report.results, full_replay_trader.report.results)
+        profit = trader.report.trades_by_asset["PHYS.ARCA"][0]
+        full_replay_profit = full_replay_trader.report.trades_by_asset["PHYS.ARCA"][0]
+        assert isinstance(profit, ProfitPLN) and isinstance(full_replay_profit, ProfitPLN)
+        self.assertEqual((profit.paid, profit.received), (full_replay_profit.paid, full_replay_profit.received))
+
+    def test_snapshot_not_matching_report_raises_error(self) -> None:
+        # given
+        previous_year_trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+        previous_year_trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2020)
+        snapshot = previous_year_trader.snapshot
+        changed_report = [line.replace("2000.0", "2100.0") for line in TWO_YEARS_TWO_BUYS_REPORT]
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        e = capture_exception(trader.trade_items, changed_report, 2021, snapshot)
+
+        # then
+        self.assertIsInstance(e, SnapshotMismatchError)
+
+    def test_no_snapshot_until_report_goes_past_the_year(self) -> None:
+        # given
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+
+        # then
+        self.assertIsNone(trader.snapshot)
+
+    def test_all_years_same_as_each_year(self) -> None:
+        # given
+        quotes_provider = CountingQuotesProviderStub()
+        trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE)
+        trader_2020 = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+        trader_2021 = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        trader.trade_all_years(TWO_YEARS_TWO_BUYS_REPORT)
+        trader_2020.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2020)
+        trader_2021.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+
+        # then
+        reports = trader.reports
+        self.assertEqual(sorted(reports), [2020, 2021])
+        self.assertEqual(reports[2020].results, trader_2020.report.results)
+        self.assertEqual(reports[2021].results, trader_2021.report.results)
+        self.assertEqual(trader.owned_asssets, trader_2021.owned_asssets)
+        self.assertEqual(len(quotes_provider.days_asked), len(set(quotes_provider.days_asked)))  # quotes shared by the years, each asked once
+
+    def test_all_years_of_empty_report(self) -> None:
+        # given
+        csv_report_lines = ['"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"']
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+
+        # when
+        trader.trade_all_years(csv_report_lines)
+
+        # then
+        self.assertEqual(trader.reports, {})
+
+    def test_subscribed_handler_gets_traded_items(self) -> None:
+        # given
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE)
+        sells: List[SellItem] = []
+        trader.subscribe(SellItem, sells.append)
+
+        # when
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+
+        # then
+        self.assertEqual([sell.transaction_id for sell in sells], [4001, 6001])
+
+    def test_holdings_at_end_of_each_year(self) -> None:
+        # given
+        trader = Trader(quotes_provider=QuotesProviderStub(), tax_percentage=TAX_PERCENTAGE, record_wallet_history=True)
+
+        # when
+        trader.trade_all_years(TWO_YEARS_TWO_BUYS_REPORT)
+
+        # then
+        self.assertEqual(trader.holdings_at(datetime.datetime(2020, 12, 31, 23, 59, 59)), {"USD": Decimal("1200"), "PHYS.ARCA": Decimal("50")})
+        self.assertEqual(trader.holdings_at(datetime.datetime(2021, 12, 31, 23, 59, 59)), {"USD": Decimal("1800")})
+
+    def test_stats_of_the_last_trading(self) -> None:
+        # given
+        quotes_provider = QuotesProviderWithCountersStub()
+        trader = Trader(quotes_provider=quotes_provider, tax_percentage=TAX_PERCENTAGE)
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2020)
+        days_asked_before = len(quotes_provider.days_asked)
+
+        # when
+        trader.trade_items(TWO_YEARS_TWO_BUYS_REPORT, 2021)
+
+        # then
+        self.assertEqual(list(trader.stats.seconds), ["load report", "trade", "quote", "build reports"])
+        counters = trader.stats.counters
+        self.assertEqual(counters["rows parsed"], 13)
+        self.assertEqual(counters["rows rolled back"], 0)
+        self.assertEqual(counters["items built"], 5)
+        self.assertEqual(counters["items built: BuyItem"], 2)
+        self.assertEqual(counters["items built: FundingItem"], 1)
+        self.assertEqual(counters["items built: SellItem"], 2)
+        self.assertEqual(counters["items traded"], 5)
+        self.assertEqual(counters["lots scanned"], 2)
+        self.assertEqual(counters["quotes needed"], 2)  # USD at the buy and the sell day of the 2021 sell
+        self.assertEqual(counters["quote lookups"], len(quotes_provider.days_asked) - days_asked_before)  # only the lookups of the last trading
+
     def test_smoke_success(self) -> None:
         # given
         csv_report_lines = [
@@ -0,0 +1,39 @@
+import unittest
+from datetime import datetime
+from money import Money
+from typing import Any, List
+
+from test.utils.capture_exception import capture_exception
+from src.application.item_dispatcher import ItemDispatcher
+from src.domain.transactions import FundingItem, WithdrawalItem
+
+FUNDING_ITEM = FundingItem(Money("100", "USD"), datetime(2020, 1, 1), 1)
+WITHDRAWAL_ITEM = WithdrawalItem(Money("100", "USD"), datetime(2020, 1, 2), 2)
+
+
+class ItemDispatcherTest(unittest.TestCase):
+    def test_handlers_called_in_subscription_order(self) -> None:
+        # given
+        calls: List[Any] = []
+        dispatcher = ItemDispatcher()
+        dispatcher.subscribe(FundingItem, lambda item: calls.append(("first", item)))
+        dispatcher.subscribe(WithdrawalItem, lambda item: calls.append(("other", item)))
+        dispatcher.subscribe(FundingItem, lambda item: calls.append(("second", item)))
+
+        # when
+        dispatcher.dispatch(FUNDING_ITEM)
+
+        # then
+        self.assertEqual(calls, [("first", FUNDING_ITEM), ("second", FUNDING_ITEM)])
+        self.assertEqual(dispatcher.item_types, [FundingItem, WithdrawalItem])
+
+    def test_dispatch_not_subscribed_type_raises_error(self) -> None:
+        # given
+        dispatcher = ItemDispatcher()
+        dispatcher.subscribe(FundingItem, lambda item: None)
+
+        # when
+        e = capture_exception(dispatcher.dispatch, WITHDRAWAL_ITEM)
+
+        # then
+        self.assertIsInstance(e, TypeError)
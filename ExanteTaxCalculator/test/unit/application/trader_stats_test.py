@@ -0,0 +1,62 @@
+import unittest
+
+from src.application.trader_stats import TraderStats
+
+
+class TraderStatsTest(unittest.TestCase):
+    def test_timing_same_stage_again_adds_up(self) -> None:
+        # given
+        stats = TraderStats()
+
+        # when
+        with stats.timer("load report"):
+            pass
+        first = stats.seconds["load report"]
+        with stats.timer("load report"):
+            pass
+
+        # then
+        self.assertEqual(list(stats.seconds), ["load report"])
+        self.assertGreaterEqual(stats.seconds["load report"], first)
+
+    def test_stage_is_timed_also_when_it_fails(self) -> None:
+        # given
+        stats = TraderStats()
+
+        # when
+        with self.assertRaises(ValueError):
+            with stats.timer("quote"):
+                raise ValueError("no quote")
+
+        # then
+        self.assertIn("quote", stats.seconds)
+
+    def test_counters_add_up(self) -> None:
+        # given
+        stats = TraderStats()
+
+        # when
+        stats.count("rows parsed", 10)
+        stats.count("lots scanned")
+        stats.count_all({"rows parsed": 5, "NBP fetches": 2})
+
+        # then
+        self.assertEqual(stats.counters, {"rows parsed": 15, "lots scanned": 1, "NBP fetches": 2})
+
+    def test_print_stages_then_counters(self) -> None:
+        # given
+        stats = TraderStats()
+        stats.count("rows parsed", 10)
+        with stats.timer("load report"):
+            pass
+
+        # when
+        text = str(stats)
+
+        # then
+        lines = text.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("load report"))
+        self.assertTrue(lines[0].endswith("s"))
+        self.assertTrue(lines[1].startswith("rows parsed"))
+        self.assertTrue(lines[1].endswith(": 10"))
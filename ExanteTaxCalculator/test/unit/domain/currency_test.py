@@ -1,5 +1,6 @@
 import unittest
-from src.domain.stock_exchange import stock_exchange_by_short_name
+from src.domain.stock_exchange import stock_exchange_by_short_name, stock_exchange_by_symbol
+from src.domain.errors import AmbiguousStockExchangeError
 from test.utils.capture_exception import capture_exception
 
 
@@ -34,3 +35,34 @@ class StockExchangeTest(unittest.TestCase):
 
         # then
         self.assertIsInstance(e, ValueError)
+
+    def test_stock_exchange_by_symbol(self):
+        # when
+        stock_exchange = stock_exchange_by_symbol("PHYS.ARCA")
+
+        # then
+        self.assertEqual(stock_exchange.short, "ARCA")
+        self.assertEqual(stock_exchange.country, "Stany Zjednoczone")
+
+    def test_euronext_country_by_isin_prefix(self):
+        # given
+        cases = {
+            "FR0000120271": "Francja",
+            "NL0010273215": "Holandia",
+            "IT0003132476": "Włochy",
+        }
+
+        for isin, expected_country in cases.items():
+            # when
+            actual_country = stock_exchange_by_short_name("EURONEXT", isin).country
+
+            # then
+            self.assertEqual(actual_country, expected_country, f"Incorrect country for ISIN '{isin}'")
+
+    def test_euronext_without_isin_raises_error(self):
+        # when
+        e = capture_exception(stock_exchange_by_symbol, "TTE.EURONEXT")
+
+        # then
+        self.assertIsInstance(e, ValueError)
+        self.assertIsInstance(e, AmbiguousStockExchangeError)
@@ -11,6 +11,8 @@ from src.domain.trading.buy_sell_pair import BuySellPair
 from src.domain.currency import Currency
 from src.domain.quotation.buy_sell_pair_pln_quotator import BuySellPairPLNQuotator
 from src.domain.errors import NoQuotesAvailableError
+from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.polish_banking_calendar import WeekendsOnlyCalendar
 
 
 class QuotesProviderStub:
@@ -36,7 +38,7 @@ class QuotesProviderStub:
 class TaxableItemQuotatorTest(unittest.TestCase):
     def test_quotation_unsupported_currency_raises_error(self):
         # given
-        quotator = BuySellPairPLNQuotator(QuotesProviderStub())
+        quotator = BuySellPairPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         buy_sell_pair = BuySellPair(
             buy=BuyItem(
                 asset_name="PHYS",
@@ -65,7 +67,7 @@ class TaxableItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_before_available_quotes_raises_error(self):
         # given
-        quotator = BuySellPairPLNQuotator(QuotesProviderStub())
+        quotator = BuySellPairPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         before_available = datetime.date(2000, 12, 20)
         buy_sell_pair = BuySellPair(
             buy=BuyItem(
@@ -95,7 +97,7 @@ class TaxableItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_after_available_quotes_raises_error(self):
         # given
-        quotator = BuySellPairPLNQuotator(QuotesProviderStub())
+        quotator = BuySellPairPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         after_available = datetime.date(2001, 1, 5)
         buy_sell_pair = BuySellPair(
             buy=BuyItem(
@@ -125,7 +127,7 @@ class TaxableItemQuotatorTest(unittest.TestCase):
 
     def test_same_amounts_different_quotes(self):
         # given
-        quotator = BuySellPairPLNQuotator(QuotesProviderStub())
+        quotator = BuySellPairPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         buy_sell_pair = BuySellPair(
             BuyItem(
                 asset_name="PHYS",
@@ -161,7 +163,7 @@ class TaxableItemQuotatorTest(unittest.TestCase):
 
     def test_different_amounts_same_quotes(self):
         # given
-        quotator = BuySellPairPLNQuotator(QuotesProviderStub())
+        quotator = BuySellPairPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         buy_sell_pair = BuySellPair(
             buy=BuyItem(
                 asset_name="PHYS",
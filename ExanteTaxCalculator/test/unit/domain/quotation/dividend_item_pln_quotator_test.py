@@ -10,6 +10,8 @@ from src.domain.currency import Currency
 from src.domain.transactions.dividend_item import DividendItem
 from src.domain.transactions.tax_item import TaxItem
 from src.domain.quotation.dividend_item_pln_quotator import DividendItemPLNQuotator
+from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.polish_banking_calendar import WeekendsOnlyCalendar
 
 
 class QuotesProviderStub:
@@ -35,7 +37,7 @@ class QuotesProviderStub:
 class DividendItemQuotatorTest(unittest.TestCase):
     def test_quotation_unsupported_currency_raises_error(self):
         # given
-        quotator = DividendItemPLNQuotator(QuotesProviderStub())
+        quotator = DividendItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         dividend = DividendItem(
             received_dividend=Money("100", "SGD"),
             paid_tax=TaxItem(paid_tax=Money("15", "SGD")),
@@ -49,7 +51,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_before_available_quotes_raises_error(self):
         # given
-        quotator = DividendItemPLNQuotator(QuotesProviderStub())
+        quotator = DividendItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         before_available = datetime.datetime(2000, 12, 20)
         dividend = DividendItem(
             received_dividend=Money("100", "USD"),
@@ -65,7 +67,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_after_available_quotes_raises_error(self):
         # given
-        quotator = DividendItemPLNQuotator(QuotesProviderStub())
+        quotator = DividendItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         after_available = datetime.datetime(2001, 1, 5)
         dividend = DividendItem(
             received_dividend=Money("100", "USD"),
@@ -81,7 +83,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quote_before_weekend(self):
         # given
-        quotator = DividendItemPLNQuotator(QuotesProviderStub())
+        quotator = DividendItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         dividend = DividendItem(
             received_dividend=Money("100", "USD"),
             paid_tax=TaxItem(paid_tax=Money("15", "USD"), date=datetime.datetime(2000, 12, 24)),
@@ -99,7 +101,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quote_after_weekend(self):
         # given
-        quotator = DividendItemPLNQuotator(QuotesProviderStub())
+        quotator = DividendItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         dividend = DividendItem(
             received_dividend=Money("100", "USD"),
             paid_tax=TaxItem(paid_tax=Money("15", "USD"), date=datetime.datetime(2000, 12, 27)),
@@ -0,0 +1,82 @@
+import unittest
+from decimal import Decimal
+from datetime import date
+
+from test.utils.capture_exception import capture_exception
+from src.domain.currency import USD, EUR
+from src.domain.errors import QuotationError
+from src.domain.quotation.nbp.quotator_nbp_archive import QuotatorNBPArchive
+
+USD_RATES = [
+    (date(2021, 1, 8), Decimal("3.6998")),  # friday
+    (date(2021, 1, 4), Decimal("3.7584")),  # monday
+    (date(2021, 1, 5), Decimal("3.7247")),
+    (date(2021, 1, 7), Decimal("3.6927")),  # 6.01 - Epiphany, no quotation
+]
+
+
+class QuotatorNBPArchiveTest(unittest.TestCase):
+    def test_quote_for_published_day(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES})
+
+        # when
+        quote = quotator.get_average_pln_for_day(USD, date(2021, 1, 5))
+
+        # then
+        self.assertEqual(quote, Decimal("3.7247"))
+
+    def test_no_quote_for_holiday_inside_archive(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES})
+
+        # when
+        quote = quotator.get_average_pln_for_day(USD, date(2021, 1, 6))
+
+        # then
+        self.assertIsNone(quote)
+
+    def test_day_outside_archive_raises_error(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES})
+
+        # when
+        before = capture_exception(quotator.get_average_pln_for_day, USD, date(2021, 1, 3))
+        after = capture_exception(quotator.get_average_pln_for_day, USD, date(2021, 1, 9))
+
+        # then
+        self.assertIsInstance(before, QuotationError)
+        self.assertIsInstance(after, QuotationError)
+
+    def test_currency_not_in_archive_raises_error(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES})
+
+        # when
+        expected_error = capture_exception(quotator.get_average_pln_for_day, EUR, date(2021, 1, 5))
+
+        # then
+        self.assertIsInstance(expected_error, QuotationError)
+
+    def test_last_published_on_or_before(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES})
+
+        # when
+        on_holiday = quotator.last_published_on_or_before(USD, date(2021, 1, 6))
+        on_published_day = quotator.last_published_on_or_before(USD, date(2021, 1, 7))
+
+        # then
+        self.assertEqual(on_holiday, (Decimal("3.7247"), date(2021, 1, 5)))
+        self.assertEqual(on_published_day, (Decimal("3.6927"), date(2021, 1, 7)))
+
+    def test_span(self) -> None:
+        # given
+        quotator = QuotatorNBPArchive({USD: USD_RATES, EUR: []})
+
+        # when
+        span = quotator.span(USD)
+
+        # then
+        self.assertEqual(span, (date(2021, 1, 4), date(2021, 1, 8)))
+        self.assertEqual(quotator.currencies, [USD])
@@ -2,14 +2,21 @@ import unittest
 import pytest
 from http import HTTPStatus
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, date
 from unittest.mock import create_autospec
 
-from src.domain.currency import USD
+from src.domain.currency import USD, EUR
 from src.domain.quotation.nbp.quotator_nbp import QuotatorNBP, UrlFetcher
+from src.infrastructure.retrying_fetcher import RetryingFetcher
 from src.domain.errors import QuotationError
+from src.infrastructure.quotes_store_sqlite import QuotesStoreSQLite
 
 NOT_FOUND_404 = ("404 Not Found", HTTPStatus.NOT_FOUND)
+SERVER_ERROR_500 = ("500 Internal Server Error", HTTPStatus.INTERNAL_SERVER_ERROR)
+USD_2020_05_15 = (
+    """{"table": "A", "currency": "dolar amerykański", "code": "USD", "rates": [{"no": "094/A/NBP/2020", "effectiveDate": "2020-05-15", "mid": 4.2135}]}""",
+    HTTPStatus.OK,
+)
 SOCKET_ERROR = Exception("Network socket error")
 
 
@@ -108,3 +115,152 @@ class QuotatorNBPTest(unittest.TestCase):
 
         # then
         assert pln_to_usd == Decimal(4.2135)
+
+    def test_stored_quote_is_not_fetched_again(self) -> None:
+        # given
+        currency = USD
+        date = datetime(2020, 5, 15)  # friday
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = USD_2020_05_15
+        quotator = QuotatorNBP(fetcher, store=QuotesStoreSQLite(":memory:"))
+
+        # when
+        pln_to_usd_1 = quotator.get_average_pln_for_day(currency, date)
+        pln_to_usd_2 = quotator.get_average_pln_for_day(currency, date)
+
+        # then
+        assert pln_to_usd_1 == pln_to_usd_2 == Decimal(4.2135)
+        assert fetcher.call_count == 1
+
+    def test_stored_no_quotation_is_not_fetched_again(self) -> None:
+        # given
+        currency = USD
+        date = datetime(2020, 5, 16)  # saturday, no quotes for weekend days
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = NOT_FOUND_404
+        quotator = QuotatorNBP(fetcher, store=QuotesStoreSQLite(":memory:"))
+
+        # when
+        pln_to_usd_1 = quotator.get_average_pln_for_day(currency, date)
+        pln_to_usd_2 = quotator.get_average_pln_for_day(currency, date)
+
+        # then
+        assert pln_to_usd_1 is None
+        assert pln_to_usd_2 is None
+        assert fetcher.call_count == 1
+
+    def test_server_error_is_not_stored(self) -> None:
+        # given
+        currency = USD
+        date = datetime(2020, 5, 15)  # friday
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = SERVER_ERROR_500
+        quotator = QuotatorNBP(fetcher, store=QuotesStoreSQLite(":memory:"))
+
+        # when
+        _ = quotator.get_average_pln_for_day(currency, date)
+        _ = quotator.get_average_pln_for_day(currency, date)
+
+        # then
+        assert fetcher.call_count == 2
+
+    def test_prefetch_fetches_nearby_days_in_single_request(self) -> None:
+        # given
+        response_body = """{
+            "table": "A",
+            "currency": "dolar amerykański",
+            "code": "USD",
+            "rates": [
+                {"no": "093/A/NBP/2020", "effectiveDate": "2020-05-14", "mid": 4.2200},
+                {"no": "094/A/NBP/2020", "effectiveDate": "2020-05-15", "mid": 4.2135},
+                {"no": "095/A/NBP/2020", "effectiveDate": "2020-05-18", "mid": 4.2000}
+            ]
+        }
+        """
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = (response_body, HTTPStatus.OK)
+        quotator = QuotatorNBP(fetcher)
+        days = [(USD, date(2020, 5, 14)), (USD, date(2020, 5, 18)), (USD, date(2020, 5, 16))]
+
+        # when
+        quotator.prefetch(days)
+
+        # then
+        fetcher.assert_called_once_with("http://api.nbp.pl/api/exchangerates/rates/a/USD/2020-05-14/2020-05-18")
+        assert quotator.get_average_pln_for_day(USD, date(2020, 5, 14)) == Decimal(4.2200)
+        assert quotator.get_average_pln_for_day(USD, date(2020, 5, 15)) == Decimal(4.2135)
+        assert quotator.get_average_pln_for_day(USD, date(2020, 5, 16)) is None  # saturday
+        assert quotator.get_average_pln_for_day(USD, date(2020, 5, 18)) == Decimal(4.2000)
+        assert fetcher.call_count == 1
+
+    def test_prefetch_splits_days_into_ranges_nbp_accepts(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = NOT_FOUND_404
+        quotator = QuotatorNBP(fetcher)
+        days = [(USD, date(2020, 1, 1)), (USD, date(2020, 4, 2)), (USD, date(2020, 4, 3)), (USD, date(2020, 12, 31)), (EUR, date(2020, 1, 1))]
+
+        # when
+        quotator.prefetch(days)
+
+        # then
+        expected_urls = [
+            "http://api.nbp.pl/api/exchangerates/rates/a/USD/2020-01-01/2020-04-02",  # 93 days
+            "http://api.nbp.pl/api/exchangerates/rates/a/USD/2020-04-03/2020-04-03",
+            "http://api.nbp.pl/api/exchangerates/rates/a/USD/2020-12-31/2020-12-31",
+            "http://api.nbp.pl/api/exchangerates/rates/a/EUR/2020-01-01/2020-01-01",
+        ]
+        self.assertEqual(sorted(call.args[0] for call in fetcher.call_args_list), sorted(expected_urls))
+
+    def test_prefetch_skips_already_known_days(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = USD_2020_05_15
+        quotator = QuotatorNBP(fetcher)
+        _ = quotator.get_average_pln_for_day(USD, date(2020, 5, 15))
+
+        # when
+        quotator.prefetch([(USD, date(2020, 5, 15))])
+
+        # then
+        assert fetcher.call_count == 1
+
+    def test_counters_count_lookups_store_hits_and_fetches(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = USD_2020_05_15
+        quotator = QuotatorNBP(fetcher)
+
+        # when
+        _ = quotator.get_average_pln_for_day(USD, date(2020, 5, 15))
+        _ = quotator.get_average_pln_for_day(USD, date(2020, 5, 15))
+        quotator.prefetch([(USD, date(2020, 5, 15)), (EUR, date(2020, 5, 15))])
+
+        # then
+        self.assertEqual(quotator.counters, {"quote lookups": 2, "quote cache hits": 1, "quote cache misses": 1, "NBP fetches": 2})
+
+    def test_counters_count_batch_lookup_once_per_day(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = USD_2020_05_15
+        quotator = QuotatorNBP(fetcher)
+
+        # when
+        quotes = quotator.get_average_pln_for_days([(USD, date(2020, 5, 15))])
+
+        # then
+        self.assertEqual(quotes, {(USD, date(2020, 5, 15)): Decimal(4.2135)})
+        self.assertEqual(quotator.counters, {"quote lookups": 1, "quote cache hits": 0, "quote cache misses": 1, "NBP fetches": 1})
+
+    def test_counters_count_http_calls_of_counting_fetcher(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.side_effect = [SERVER_ERROR_500, USD_2020_05_15]
+        quotator = QuotatorNBP(RetryingFetcher(fetcher, sleep=lambda _: None))
+
+        # when
+        _ = quotator.get_average_pln_for_day(USD, date(2020, 5, 15))
+
+        # then
+        self.assertEqual(quotator.counters["NBP fetches"], 1)
+        self.assertEqual(quotator.counters["HTTP calls"], 2)
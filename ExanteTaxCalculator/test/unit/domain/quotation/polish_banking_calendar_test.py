@@ -0,0 +1,57 @@
+import unittest
+import datetime
+
+from test.utils.capture_exception import capture_exception
+from src.domain.quotation.polish_banking_calendar import PolishBankingCalendar, easter_sunday, polish_public_holidays
+
+
+class PolishBankingCalendarTest(unittest.TestCase):
+    def test_easter_sunday(self) -> None:
+        cases = {
+            2019: datetime.date(2019, 4, 21),
+            2020: datetime.date(2020, 4, 12),
+            2021: datetime.date(2021, 4, 4),
+            2022: datetime.date(2022, 4, 17),
+            2023: datetime.date(2023, 4, 9),
+            2024: datetime.date(2024, 3, 31),
+            2025: datetime.date(2025, 4, 20),
+        }
+
+        for year, expected in cases.items():
+            self.assertEqual(easter_sunday(year), expected)
+
+    def test_public_holidays_2024(self) -> None:
+        # when
+        holidays = polish_public_holidays(2024)
+
+        # then
+        expected = {
+            datetime.date(2024, 1, 1),
+            datetime.date(2024, 1, 6),
+            datetime.date(2024, 4, 1),  # Easter Monday
+            datetime.date(2024, 5, 1),
+            datetime.date(2024, 5, 3),
+            datetime.date(2024, 5, 30),  # Corpus Christi
+            datetime.date(2024, 8, 15),
+            datetime.date(2024, 11, 1),
+            datetime.date(2024, 11, 11),
+            datetime.date(2024, 12, 25),
+            datetime.date(2024, 12, 26),
+        }
+        self.assertEqual(holidays, expected)
+
+    def test_christmas_eve_is_holiday_since_2025(self) -> None:
+        # given
+        calendar = PolishBankingCalendar()
+
+        # then
+        self.assertTrue(calendar.is_banking_day(datetime.date(2024, 12, 24)))
+        self.assertFalse(calendar.is_banking_day(datetime.date(2025, 12, 24)))
+
+    def test_invalid_overrides_raise_error(self) -> None:
+        for line in ["2020-05-15", "2020-05-15 day-off", "15.05.2020 holiday"]:
+            # when
+            e = capture_exception(PolishBankingCalendar.from_overrides, [line])
+
+            # then
+            self.assertIsInstance(e, ValueError, line)
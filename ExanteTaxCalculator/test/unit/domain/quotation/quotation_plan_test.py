@@ -0,0 +1,58 @@
+import unittest
+import datetime
+from typing import Optional, List, Tuple
+from decimal import Decimal
+from money import Money
+
+from test.utils.capture_exception import capture_exception
+from src.domain.currency import Currency
+from src.domain.errors import QuotationError
+from src.domain.transactions import BuyItem, SellItem, DividendItem, TaxItem
+from src.domain.trading.buy_sell_pair import BuySellPair
+from src.domain.quotation.quotation_plan import QuotationPlan
+
+
+class QuotesProviderSpy:
+    """Always 1USD = 4PLN, remembers the asked days"""
+
+    def __init__(self) -> None:
+        self.asked: List[Tuple[Currency, datetime.date]] = []
+
+    def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
+        self.asked.append((currency, date))
+        return Decimal("4")
+
+
+class QuotationPlanTest(unittest.TestCase):
+    def test_same_currency_same_day_is_quoted_once(self) -> None:
+        # given
+        buy = BuyItem("PHYS", Decimal(10), Money("100", "USD"), Money("1", "USD"), date=datetime.datetime(2020, 5, 15, 10, 30), transaction_id=1)
+        sell = SellItem("PHYS", Decimal(10), Money("200", "USD"), Money("1", "USD"), date=datetime.datetime(2020, 5, 15, 16, 45), transaction_id=2)
+        dividend = DividendItem(
+            Money("5", "USD"), paid_tax=TaxItem(Money("1", "USD"), date=datetime.datetime(2020, 5, 15, 18, 0)), date=datetime.datetime(2020, 5, 15, 18, 0)
+        )
+        provider = QuotesProviderSpy()
+        plan = QuotationPlan()
+
+        # when
+        plan.add_buy_sell_pairs([BuySellPair(buy, sell, Decimal(10))])
+        plan.add_dividends([dividend])
+        quotes = plan.resolve(provider)
+
+        # then
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(provider.asked, [(Currency("USD"), datetime.date(2020, 5, 14))])
+        self.assertEqual(quotes.quote("USD", buy.date), (Decimal("4"), datetime.date(2020, 5, 14)))
+        self.assertEqual(quotes.quote("USD", dividend.date), (Decimal("4"), datetime.date(2020, 5, 14)))
+
+    def test_quote_not_planned_raises_error(self) -> None:
+        # given
+        plan = QuotationPlan()
+        plan.add_taxes([TaxItem(Money("1", "USD"), date=datetime.datetime(2020, 5, 15))])
+        quotes = plan.resolve(QuotesProviderSpy())
+
+        # when
+        e = capture_exception(quotes.quote, "USD", datetime.datetime(2020, 5, 18))
+
+        # then
+        self.assertIsInstance(e, QuotationError)
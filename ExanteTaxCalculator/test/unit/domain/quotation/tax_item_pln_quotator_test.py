@@ -9,6 +9,8 @@ from src.domain.errors import NoQuotesAvailableError
 from src.domain.currency import Currency
 from src.domain.transactions.tax_item import TaxItem
 from src.domain.quotation.tax_item_pln_quotator import TaxItemPLNQuotator
+from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+from src.domain.quotation.polish_banking_calendar import WeekendsOnlyCalendar
 
 
 class QuotesProviderStub:
@@ -34,7 +36,7 @@ class QuotesProviderStub:
 class DividendItemQuotatorTest(unittest.TestCase):
     def test_quotation_unsupported_currency_raises_error(self):
         # given
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         tax = TaxItem(
             paid_tax=Money("15", "SGD"),
             date=datetime.datetime(2000, 12, 27),
@@ -49,7 +51,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_before_available_quotes_raises_error(self):
         # given
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         before_available = datetime.datetime(2000, 12, 20)
         tax = TaxItem(
             paid_tax=Money("15", "USD"),
@@ -65,9 +67,9 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quotation_after_available_quotes_raises_error(self):
         # given
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         after_available = datetime.datetime(2001, 1, 5)
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         before_available = datetime.date(2000, 12, 19)
         tax = TaxItem(
             paid_tax=Money("15", "USD"),
@@ -83,7 +85,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quote_before_weekend(self):
         # given
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         tax = TaxItem(
             paid_tax=Money("15", "USD"),
             date=datetime.datetime(2000, 12, 24),
@@ -99,7 +101,7 @@ class DividendItemQuotatorTest(unittest.TestCase):
 
     def test_quote_after_weekend(self):
         # given
-        quotator = TaxItemPLNQuotator(QuotesProviderStub())
+        quotator = TaxItemPLNQuotator(WorkingDayBeforeQuotator(QuotesProviderStub(), calendar=WeekendsOnlyCalendar()))
         tax = TaxItem(
             paid_tax=Money("15", "USD"),
             date=datetime.datetime(2000, 12, 27),
@@ -0,0 +1,94 @@
+import unittest
+import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from unittest.mock import create_autospec
+
+from src.domain.currency import Currency, USD
+from src.domain.quotation.quotes_provider_protocol import PrefetchingQuotesProviderProtocol
+from src.domain.quotation.polish_banking_calendar import PolishBankingCalendar, WeekendsOnlyCalendar
+from src.domain.quotation.working_day_before_quotator import WorkingDayBeforeQuotator
+
+
+class QuotesProviderSpy:
+    """Quotes on every day not listed as holiday, remembers the asked days"""
+
+    def __init__(self, holidays: List[datetime.date] = []) -> None:
+        self.holidays = holidays
+        self.asked: List[Tuple[Currency, datetime.date]] = []
+
+    def get_average_pln_for_day(self, currency: Currency, date: datetime.date) -> Optional[Decimal]:
+        self.asked.append((currency, date))
+        return None if date in self.holidays else Decimal("4")
+
+
+class WorkingDayBeforeQuotatorTest(unittest.TestCase):
+    def test_lookback_days_skip_weekend(self) -> None:
+        # given
+        monday = datetime.datetime(2020, 5, 18, 15, 30)
+        quotator = WorkingDayBeforeQuotator(QuotesProviderSpy())
+
+        # when
+        days = quotator.lookback_days(monday)
+
+        # then
+        self.assertEqual(days, [datetime.date(2020, 5, 15), datetime.date(2020, 5, 14), datetime.date(2020, 5, 13), datetime.date(2020, 5, 12), datetime.date(2020, 5, 11)])
+
+    def test_holidays_are_not_asked_for(self) -> None:
+        cases = {
+            datetime.date(2021, 4, 6): datetime.date(2021, 4, 2),  # tuesday after Easter Monday -> friday before Easter
+            datetime.date(2020, 12, 28): datetime.date(2020, 12, 24),  # monday after Christmas
+            datetime.date(2021, 1, 7): datetime.date(2021, 1, 5),  # thursday after Epiphany
+            datetime.date(2020, 5, 4): datetime.date(2020, 4, 30),  # monday after May 1 friday; May 3 is sunday
+            datetime.date(2021, 6, 4): datetime.date(2021, 6, 2),  # friday after Corpus Christi
+            datetime.date(2018, 11, 13): datetime.date(2018, 11, 9),  # tuesday after one-off 12.11.2018 holiday
+        }
+
+        for for_date, expected_quotation_day in cases.items():
+            # given
+            provider = QuotesProviderSpy()
+            quotator = WorkingDayBeforeQuotator(provider)
+
+            # when
+            _, quotation_day = quotator.quote("USD", for_date)
+
+            # then
+            self.assertEqual(quotation_day, expected_quotation_day, f"for {for_date}")
+            self.assertEqual(provider.asked, [(USD, expected_quotation_day)], f"for {for_date}")
+
+    def test_holiday_unknown_to_calendar_is_skipped(self) -> None:
+        # given
+        provider = QuotesProviderSpy(holidays=[datetime.date(2020, 12, 25)])
+        quotator = WorkingDayBeforeQuotator(provider, calendar=WeekendsOnlyCalendar())
+
+        # when
+        _, quotation_day = quotator.quote("USD", datetime.date(2020, 12, 26))
+
+        # then
+        self.assertEqual(quotation_day, datetime.date(2020, 12, 24))
+        self.assertEqual(len(provider.asked), 2)
+
+    def test_calendar_overrides_are_respected(self) -> None:
+        # given
+        calendar = PolishBankingCalendar.from_overrides(["# extra days off", "2020-05-15 holiday  # friday", "2020-05-16 working"])
+        quotator = WorkingDayBeforeQuotator(QuotesProviderSpy(), calendar=calendar)
+
+        # when
+        _, saturday_quotation_day = quotator.quote("USD", datetime.date(2020, 5, 17))
+        _, thursday_quotation_day = quotator.quote("USD", datetime.date(2020, 5, 16))
+
+        # then
+        self.assertEqual(saturday_quotation_day, datetime.date(2020, 5, 16))
+        self.assertEqual(thursday_quotation_day, datetime.date(2020, 5, 14))
+
+    def test_prefetch_asks_provider_for_lookback_days(self) -> None:
+        # given
+        provider = create_autospec(PrefetchingQuotesProviderProtocol, instance=True)
+        quotator = WorkingDayBeforeQuotator(provider)
+
+        # when
+        quotator.prefetch([("USD", datetime.datetime(2020, 5, 18))])
+
+        # then
+        prefetched_days = list(provider.prefetch.call_args.args[0])
+        self.assertEqual(prefetched_days, [(USD, day) for day in quotator.lookback_days(datetime.datetime(2020, 5, 18))])
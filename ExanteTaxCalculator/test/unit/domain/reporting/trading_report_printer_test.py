@@ -0,0 +1,48 @@
+import unittest
+from datetime import datetime
+
+from src.domain.reporting.trading_report import TradingReport
+from src.domain.reporting.trading_report_printer import TradingReportPrinter
+from src.domain.tax_declaration.tax_declaration_numbers import TaxDeclarationNumbers
+from test.unit.domain.reporting.utils import newProfit
+
+
+class TradingReportPrinterTest(unittest.TestCase):
+    def test_profits_grouped_by_asset_and_by_country(self):
+        # given
+        profits = {
+            "PHYS.ARCA": [newProfit(datetime(2020, 2, 2), "PHYS.ARCA", 1000, 1100)],
+            "TLT.NASDAQ": [newProfit(datetime(2020, 3, 2), "TLT.NASDAQ", 500, 450)],
+            "CLR.SGX": [newProfit(datetime(2020, 4, 2), "CLR.SGX", 200, 300)],
+        }
+        report = TradingReport(trades_by_asset=profits, dividends=[], dividend_taxes=[], results=TaxDeclarationNumbers())
+
+        # when
+        lines = TradingReportPrinter().to_strings(report)
+
+        # then
+        self.assertIn("PHYS.ARCA [Stany Zjednoczone]", lines)
+        self.assertIn("CLR.SGX [Singapur]", lines)
+        by_country = lines[lines.index("TRANSAKCJE WEDŁUG KRAJU") :]
+        singapore = by_country.index("Singapur")
+        usa = by_country.index("Stany Zjednoczone")
+        self.assertEqual(by_country[singapore + 2], "Przychód: 300.00 PLN. Koszt: 200.00 PLN. Z/S: 100.00 PLN\n")
+        self.assertEqual(by_country[usa + 3], "Przychód: 1550.00 PLN. Koszt: 1500.00 PLN. Z/S: 50.00 PLN\n")
+
+    def test_profits_of_ambiguous_stock_exchange_grouped_under_unknown_country(self):
+        # given
+        profits = {
+            "TTE.EURONEXT": [newProfit(datetime(2020, 2, 2), "TTE.EURONEXT", 1000, 1100)],
+            "TLT.NASDAQ": [newProfit(datetime(2020, 3, 2), "TLT.NASDAQ", 500, 450)],
+        }
+        report = TradingReport(trades_by_asset=profits, dividends=[], dividend_taxes=[], results=TaxDeclarationNumbers())
+
+        # when
+        lines = TradingReportPrinter().to_strings(report)
+
+        # then
+        self.assertIn("TTE.EURONEXT [Nieznany kraj]", lines)
+        self.assertIn("TLT.NASDAQ [Stany Zjednoczone]", lines)
+        by_country = lines[lines.index("TRANSAKCJE WEDŁUG KRAJU") :]
+        unknown = by_country.index("Nieznany kraj")
+        self.assertEqual(by_country[unknown + 2], "Przychód: 1100.00 PLN. Koszt: 1000.00 PLN. Z/S: 100.00 PLN\n")
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 from src.domain.currency import Currency
 from test.utils.capture_exception import capture_exception
@@ -52,4 +54,25 @@ class CurrencyTest(unittest.TestCase):
             is_currency = Currency.is_currency(cur)
 
             # then
-            self.assertFalse(is_currency)
\ No newline at end of file
+            self.assertFalse(is_currency)
+
+    def test_same_currency_is_shared_instance(self):
+        # when
+        first = Currency("USD")
+        second = Currency("USD")
+
+        # then
+        self.assertIs(first, second)
+        self.assertIsNot(first, Currency("EUR"))
+
+    def test_copied_and_unpickled_currency_is_shared_instance(self):
+        # given
+        currency = Currency("SGD")
+
+        # when
+        copied = copy.deepcopy(currency)
+        unpickled = pickle.loads(pickle.dumps(currency))
+
+        # then
+        self.assertIs(copied, currency)
+        self.assertIs(unpickled, currency)
@@ -9,6 +9,7 @@ from src.domain.trading.buy_sell_fifo_matcher import BuySellFIFOMatcher
 from src.domain.transactions.buy_item import BuyItem
 from src.domain.transactions.sell_item import SellItem
 from src.domain.transactions.corporate_action_item import CorporateActionItem
+from src.domain.transactions.stock_split_item import StockSplitItem
 from src.domain.errors import InsufficientAssetError
 from src.domain.share import Share
 
@@ -64,6 +65,22 @@ class TraderTest(unittest.TestCase):
         self.assertEqual(item.sell, sell_item)
         self.assertEqual(item.amount_sold, Decimal(10))
 
+    def test_pairs_share_frozen_items(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_item = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        sell_item = SellItem("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 30), transaction_id=2)
+
+        # when
+        matcher.buy(buy_item)
+        matcher.sell(sell_item)
+        matcher.buy_sell_pairs.clear()
+
+        # then
+        item = matcher.buy_sell_pairs[0]
+        self.assertIs(item.buy, buy_item)
+        self.assertIs(item.sell, sell_item)
+
     def test_buy10_rename_sell10(self):
         """Scenario1 with asset rename (so called corporate action)"""
 
@@ -222,3 +239,126 @@ class TraderTest(unittest.TestCase):
         self.assertEqual(item.buy, buy_item_3)
         self.assertEqual(item.sell, sell_item_2)
         self.assertEqual(item.amount_sold, Decimal(10))
+
+    def test_sell_after_exhausted_lots_and_other_assets(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_phys_1 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        buy_gold = newBuy("GOLD", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 21), 2)
+        buy_phys_2 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 22), 3)
+        sell_phys_1 = SellItem("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 23), transaction_id=4)
+        sell_phys_2 = SellItem("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 24), transaction_id=5)
+        sell_phys_3 = SellItem("PHYS", 1, Money("100", "USD"), Money("1", "USD"), date=datetime(2000, 10, 25), transaction_id=6)
+
+        # when
+        matcher.buy(buy_phys_1)
+        matcher.buy(buy_gold)
+        matcher.buy(buy_phys_2)
+        matcher.sell(sell_phys_1)
+        matcher.sell(sell_phys_2)
+        expected_error = capture_exception(matcher.sell, sell_phys_3)
+
+        # then
+        self.assertEqual([(pair.buy, pair.sell) for pair in matcher.buy_sell_pairs], [(buy_phys_1, sell_phys_1), (buy_phys_2, sell_phys_2)])
+        self.assertIsInstance(expected_error, InsufficientAssetError)
+
+    def test_rename_into_owned_asset_keeps_fifo_order(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_phys = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        buy_gold = newBuy("GOLD", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 21), 2)
+        corporate_action_item = CorporateActionItem(Share(10, "PHYS"), Share(10, "GOLD"), datetime(2000, 10, 25), 3)
+        sell_gold = SellItem("GOLD", 15, Money("1500", "USD"), Money("1", "USD"), date=datetime(2000, 10, 30), transaction_id=4)
+
+        # when
+        matcher.buy(buy_phys)
+        matcher.buy(buy_gold)
+        matcher.corporate_action(corporate_action_item)
+        matcher.sell(sell_gold)
+
+        # then
+        pairs = matcher.buy_sell_pairs
+        self.assertEqual(len(pairs), 2)
+        self.assertEqual((pairs[0].buy.asset_name, pairs[0].buy.transaction_id, pairs[0].amount_sold), ("GOLD", 1, Decimal(10)))
+        self.assertEqual((pairs[1].buy.asset_name, pairs[1].buy.transaction_id, pairs[1].amount_sold), ("GOLD", 2, Decimal(5)))
+
+    def test_split_updates_available_amount(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_item = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        split_item = StockSplitItem(Share(Decimal(10), "PHYS"), Share(Decimal(20), "PHYS"), datetime(2000, 10, 25), 2)
+        sell_item = SellItem("PHYS", 20, Money("1000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 30), transaction_id=3)
+
+        # when
+        matcher.buy(buy_item)
+        matcher.stock_split(split_item)
+        matcher.sell(sell_item)
+
+        # then
+        self.assertEqual(len(matcher.buy_sell_pairs), 1)
+        self.assertEqual(matcher.buy_sell_pairs[0].amount_sold, Decimal(20))
+
+    def test_renames_and_splits_apply_only_to_lots_bought_before(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_item_1 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        split_item = StockSplitItem(Share(Decimal(10), "PHYS"), Share(Decimal(20), "PHYS"), datetime(2000, 10, 21), 2)
+        buy_item_2 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 22), 3)
+        corporate_action_item = CorporateActionItem(Share(Decimal(30), "PHYS"), Share(Decimal(30), "GOLD"), datetime(2000, 10, 23), 4)
+        sell_item = SellItem("GOLD", 30, Money("3000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 30), transaction_id=5)
+
+        # when
+        matcher.buy(buy_item_1)
+        matcher.stock_split(split_item)
+        matcher.buy(buy_item_2)
+        matcher.corporate_action(corporate_action_item)
+        matcher.sell(sell_item)
+
+        # then
+        pairs = matcher.buy_sell_pairs
+        self.assertEqual(len(pairs), 2)
+        self.assertEqual((pairs[0].buy.asset_name, pairs[0].buy.amount, pairs[0].buy.transaction_id, pairs[0].amount_sold), ("GOLD", Decimal(20), 1, Decimal(20)))
+        self.assertEqual((pairs[1].buy.asset_name, pairs[1].buy.amount, pairs[1].buy.transaction_id, pairs[1].amount_sold), ("GOLD", Decimal(10), 3, Decimal(10)))
+
+    def test_continue_from_open_lots(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_item_1 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        buy_item_2 = newBuy("PSLV", 10, Money("100", "USD"), Money("1", "USD"), datetime(2000, 10, 21), 2)
+        buy_item_3 = newBuy("PHYS", 10, Money("2000", "USD"), Money("1", "USD"), datetime(2000, 10, 22), 3)
+        split_item = StockSplitItem(Share(Decimal(10), "PHYS"), Share(Decimal(20), "PHYS"), datetime(2000, 10, 23), 4)
+        sell_item_1 = SellItem("PHYS", 30, Money("3000", "USD"), Money("1", "USD"), date=datetime(2000, 10, 24), transaction_id=5)
+        sell_item_2 = SellItem("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), date=datetime(2001, 10, 24), transaction_id=6)
+
+        # when
+        matcher.buy(buy_item_1)
+        matcher.buy(buy_item_2)
+        matcher.buy(buy_item_3)
+        matcher.stock_split(split_item)
+        matcher.sell(sell_item_1)
+        open_lots = matcher.open_lots
+        next_matcher = BuySellFIFOMatcher.from_open_lots(open_lots)
+        next_matcher.sell(sell_item_2)
+
+        # then
+        self.assertEqual([(buy.transaction_id, buy.asset_name, buy.amount, left) for buy, left in open_lots], [(2, "PSLV", Decimal(10), Decimal(10)), (3, "PHYS", Decimal(20), Decimal(10))])
+        self.assertEqual(len(next_matcher.buy_sell_pairs), 1)
+        self.assertEqual((next_matcher.buy_sell_pairs[0].buy.transaction_id, next_matcher.buy_sell_pairs[0].amount_sold), (3, Decimal(10)))
+        self.assertIsInstance(capture_exception(next_matcher.sell, sell_item_2), InsufficientAssetError)
+
+    def test_lots_scanned_by_sells_are_counted(self):
+        # given
+        matcher = BuySellFIFOMatcher()
+        buy_item_1 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 20), 1)
+        buy_item_2 = newBuy("PHYS", 10, Money("1000", "USD"), Money("1", "USD"), datetime(2000, 10, 21), 2)
+        sell_item_1 = SellItem("PHYS", 15, Money("1500", "USD"), Money("1", "USD"), date=datetime(2000, 10, 22), transaction_id=3)
+        sell_item_2 = SellItem("PHYS", 5, Money("500", "USD"), Money("1", "USD"), date=datetime(2000, 10, 23), transaction_id=4)
+
+        # when
+        matcher.buy(buy_item_1)
+        matcher.buy(buy_item_2)
+        matcher.sell(sell_item_1)
+        matcher.sell(sell_item_2)
+
+        # then
+        self.assertEqual(matcher.num_lots_scanned, 3)  # first sell goes through both lots, second one through the second lot
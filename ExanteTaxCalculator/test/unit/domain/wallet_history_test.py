@@ -0,0 +1,59 @@
+import unittest
+from decimal import Decimal
+from datetime import datetime
+from src.domain.wallet_history import WalletHistory
+
+
+class WalletHistoryTest(unittest.TestCase):
+    def test_balance_before_at_and_after_change(self) -> None:
+        # given
+        history = WalletHistory({"USD": Decimal("100")})
+
+        # when
+        history.record("USD", datetime(2020, 10, 20, 12, 0, 0), Decimal("50"))
+        history.record("USD", datetime(2021, 3, 1, 12, 0, 0), Decimal("-30"))
+
+        # then
+        self.assertEqual(history.balance_at("USD", datetime(2020, 10, 20, 11, 59, 59)), Decimal("100"))
+        self.assertEqual(history.balance_at("USD", datetime(2020, 10, 20, 12, 0, 0)), Decimal("150"))
+        self.assertEqual(history.balance_at("USD", datetime(2020, 12, 31, 23, 59, 59)), Decimal("150"))
+        self.assertEqual(history.balance_at("USD", datetime(2021, 12, 31, 23, 59, 59)), Decimal("120"))
+
+    def test_unknown_asset_balance_is_zero(self) -> None:
+        # given
+        history = WalletHistory()
+
+        # when
+        balance = history.balance_at("USD", datetime(2020, 10, 20))
+
+        # then
+        self.assertEqual(balance, Decimal("0"))
+
+    def test_change_recorded_out_of_order_updates_later_balances(self) -> None:
+        # given
+        history = WalletHistory()
+        history.record("USD", datetime(2020, 10, 20), Decimal("100"))
+        history.record("USD", datetime(2020, 10, 22), Decimal("-40"))
+
+        # when
+        history.record("USD", datetime(2020, 10, 21), Decimal("10"))
+
+        # then
+        self.assertEqual(history.balance_at("USD", datetime(2020, 10, 20)), Decimal("100"))
+        self.assertEqual(history.balance_at("USD", datetime(2020, 10, 21)), Decimal("110"))
+        self.assertEqual(history.balance_at("USD", datetime(2020, 10, 22)), Decimal("70"))
+
+    def test_snapshot_skips_assets_with_zero_balance(self) -> None:
+        # given
+        history = WalletHistory({"EUR": Decimal("10")})
+        history.record("USD", datetime(2020, 10, 20), Decimal("100"))
+        history.record("PHYS.ARCA", datetime(2020, 10, 21), Decimal("5"))
+        history.record("USD", datetime(2020, 10, 21), Decimal("-100"))
+
+        # when
+        before = history.snapshot_at(datetime(2020, 10, 20, 23, 59, 59))
+        after = history.snapshot_at(datetime(2020, 10, 21, 23, 59, 59))
+
+        # then
+        self.assertEqual(before, {"EUR": Decimal("10"), "USD": Decimal("100")})
+        self.assertEqual(after, {"EUR": Decimal("10"), "PHYS.ARCA": Decimal("5")})
@@ -1,3 +1,4 @@
+import operator
 import unittest
 from typing import Iterable, Tuple, Dict
 from decimal import Decimal
@@ -31,6 +32,58 @@ class WalletTest(unittest.TestCase):
         self.assertTrue("USD" in wallet.assets_copy)
         self.assertEqual(wallet.assets_copy["USD"], Decimal("100"))
 
+    def test_assets_is_live_read_only_view(self) -> None:
+        # given
+        wallet = make_wallet({"USD": "100"})
+        assets = wallet.assets
+
+        # when
+        wallet.fund(FundingItem(Money("50", "USD")))
+        expected_error = capture_exception(operator.setitem, assets, "USD", Decimal("0"))
+
+        # then
+        self.assertEqual(assets["USD"], Decimal("150"))
+        self.assertIsInstance(expected_error, TypeError)
+
+    def test_failed_buy_leaves_wallet_untouched(self) -> None:
+        # given
+        wallet = make_wallet({"EUR": "100"})
+        autoconversion = AutoConversionItem(conversion_from=Money("100", "EUR"), conversion_to=Money("110", "USD"))
+        item = BuyItem("PHYS", Decimal("10"), Money("1000", "USD"), Money("2", "USD"), [autoconversion], datetime(2020, 10, 22), 1)
+
+        # when
+        expected_error = capture_exception(wallet.buy, item)
+
+        # then
+        self.assertIsInstance(expected_error, InsufficientAssetError)
+        self.assertEqual(dict(wallet.assets), {"EUR": Decimal("100")})
+
+    def test_failed_sell_leaves_wallet_untouched(self) -> None:
+        # given
+        wallet = make_wallet({"PHYS": "50", "EUR": "1"})
+        autoconversion = AutoConversionItem(conversion_from=Money("1000", "USD"), conversion_to=Money("900", "EUR"))
+        item = SellItem("PHYS", Decimal("100"), Money("1000", "USD"), Money("2", "EUR"), [autoconversion], datetime(2020, 10, 22), 1)
+
+        # when
+        expected_error = capture_exception(wallet.sell, item)
+
+        # then
+        self.assertIsInstance(expected_error, InsufficientAssetError)
+        self.assertEqual(dict(wallet.assets), {"PHYS": Decimal("50"), "EUR": Decimal("1")})
+
+    def test_failed_dividend_autoconversion_leaves_wallet_untouched(self) -> None:
+        # given
+        wallet = make_wallet({"USD": "10"})
+        autoconversion = AutoConversionItem(conversion_from=Money("3", "SGD"), conversion_to=Money("2", "USD"))
+        item = DividendItem(Money("2.5", "SGD"), None, None, [autoconversion], datetime(2020, 10, 22), 1)
+
+        # when
+        expected_error = capture_exception(wallet.dividend, item)
+
+        # then
+        self.assertIsInstance(expected_error, InsufficientAssetError)
+        self.assertEqual(dict(wallet.assets), {"USD": Decimal("10")})
+
     def test_withdraw(self) -> None:
         # given
         item = WithdrawalItem(Money("50", "USD"), datetime(2020, 10, 20), 0)
@@ -359,3 +412,29 @@ class WalletTest(unittest.TestCase):
         # then
         self.assertTrue("PHYS.ARCA" in wallet.assets_copy)
         self.assertEqual(wallet.assets_copy["PHYS.ARCA"], Decimal("10"))
+
+    def test_balance_at_with_recorded_history(self) -> None:
+        # given
+        wallet = Wallet(initial_assets={"USD": Decimal("1000")}, record_history=True)
+        buy = BuyItem("PHYS", Decimal("10"), Money("500", "USD"), Money("2", "USD"), [], datetime(2020, 10, 22), 1)
+        sell = SellItem("PHYS", Decimal("10"), Money("600", "USD"), Money("2", "USD"), [], datetime(2021, 2, 1), 2)
+
+        # when
+        wallet.buy(buy)
+        wallet.sell(sell)
+
+        # then
+        self.assertEqual(wallet.balance_at("USD", datetime(2020, 10, 21)), Decimal("1000"))
+        self.assertEqual(wallet.balance_at("USD", datetime(2020, 12, 31)), Decimal("498"))
+        self.assertEqual(wallet.snapshot_at(datetime(2020, 12, 31)), {"USD": Decimal("498"), "PHYS": Decimal("10")})
+        self.assertEqual(wallet.snapshot_at(datetime(2021, 12, 31)), {"USD": Decimal("1096")})
+
+    def test_balance_at_without_recorded_history_raises_error(self) -> None:
+        # given
+        wallet = make_wallet({"USD": "100"})
+
+        # when
+        expected_error = capture_exception(wallet.balance_at, "USD", datetime(2020, 10, 22))
+
+        # then
+        self.assertIsInstance(expected_error, ValueError)
@@ -0,0 +1,61 @@
+import unittest
+import random
+from typing import List, Tuple
+
+from test.utils.capture_exception import capture_exception
+from src.infrastructure.external_sort import sorted_external
+
+
+class ExternalSortTest(unittest.TestCase):
+    def test_empty_input(self) -> None:
+        # given
+        items: List[int] = []
+
+        # when
+        result = list(sorted_external(items, key=lambda x: x, max_items_in_memory=10))
+
+        # then
+        self.assertEqual(result, [])
+
+    def test_input_fits_in_memory(self) -> None:
+        # given
+        items = [3, 1, 2]
+
+        # when
+        result = list(sorted_external(items, key=lambda x: x, max_items_in_memory=3))
+
+        # then
+        self.assertEqual(result, [1, 2, 3])
+
+    def test_input_over_memory_budget_is_sorted_stable(self) -> None:
+        # given
+        rng = random.Random(7)
+        items: List[Tuple[int, int]] = [(rng.randrange(20), n) for n in range(1000)]  # (key, input position)
+
+        # when
+        result = list(sorted_external(iter(items), key=lambda x: x[0], max_items_in_memory=64))
+
+        # then
+        self.assertEqual(result, sorted(items, key=lambda x: x[0]))
+
+    def test_input_over_memory_budget_keeps_item_fields(self) -> None:
+        # given
+        rng = random.Random(7)
+        names = [f"SYM{n}" for n in range(1000)]
+        items: List[Tuple[int, str, str]] = [(rng.randrange(20), name, name) for name in names]  # same object twice, like symbol and asset of a row
+
+        # when
+        result = list(sorted_external(iter(items), key=lambda x: x[0], max_items_in_memory=64))
+
+        # then
+        self.assertEqual(result, sorted(items, key=lambda x: x[0]))
+
+    def test_invalid_memory_budget_raises_error(self) -> None:
+        # given
+        items = [1]
+
+        # when
+        expected_error = capture_exception(lambda: list(sorted_external(items, key=lambda x: x, max_items_in_memory=0)))
+
+        # then
+        self.assertIsInstance(expected_error, ValueError)
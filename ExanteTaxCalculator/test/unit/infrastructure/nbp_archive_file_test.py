@@ -0,0 +1,80 @@
+import io
+import unittest
+from decimal import Decimal
+from datetime import date
+
+from test.utils.capture_exception import capture_exception
+from src.domain.currency import Currency, USD, EUR
+from src.infrastructure.errors import CorruptedReportError
+from src.infrastructure.nbp_archive_file import parse_archive_csv, parse_archive_json, write_archive_json, merge_rates
+
+JPY = Currency("JPY")
+
+ARCHIVE_CSV = """data;1USD;1EUR;100JPY;nr tabeli;pełny numer tabeli;
+20210104;3,7584;4,6148;3,6388;1;001/A/NBP/2021;
+20210105;3,7247;4,5882;3,6186;2;002/A/NBP/2021;
+
+kod ISO;USD;EUR;JPY;;;
+nazwa waluty;dolar amerykański;euro;jen (Japonia);;;
+liczba jednostek;1;1;100;;;
+"""
+
+
+class NBPArchiveFileTest(unittest.TestCase):
+    def test_parse_archive_csv(self) -> None:
+        # given
+        lines = ARCHIVE_CSV.splitlines()
+
+        # when
+        rates = parse_archive_csv(lines)
+
+        # then
+        self.assertEqual(set(rates), {USD, EUR, JPY})
+        self.assertEqual(rates[USD], {date(2021, 1, 4): Decimal("3.7584"), date(2021, 1, 5): Decimal("3.7247")})
+        self.assertEqual(rates[EUR][date(2021, 1, 5)], Decimal("4.5882"))
+        self.assertEqual(rates[JPY][date(2021, 1, 4)], Decimal("0.036388"))  # given per 100 JPY
+
+    def test_parse_archive_csv_without_header_raises_error(self) -> None:
+        # given
+        lines = ["20210104;3,7584;4,6148;3,6388;1;001/A/NBP/2021;"]
+
+        # when
+        expected_error = capture_exception(parse_archive_csv, lines)
+
+        # then
+        self.assertIsInstance(expected_error, CorruptedReportError)
+
+    def test_parse_archive_csv_invalid_rate_raises_error(self) -> None:
+        # given
+        lines = ["data;1USD;", "20210104;3.75.84;"]
+
+        # when
+        expected_error = capture_exception(parse_archive_csv, lines)
+
+        # then
+        self.assertIsInstance(expected_error, CorruptedReportError)
+
+    def test_json_roundtrip(self) -> None:
+        # given
+        rates = parse_archive_csv(ARCHIVE_CSV.splitlines())
+        f = io.StringIO()
+
+        # when
+        write_archive_json(rates, f)
+        f.seek(0)
+        read_rates = parse_archive_json(f)
+
+        # then
+        self.assertEqual(read_rates, rates)
+
+    def test_merge_rates_later_source_wins(self) -> None:
+        # given
+        old = {USD: {date(2021, 1, 4): Decimal("3.7"), date(2021, 1, 5): Decimal("3.7247")}}
+        new = {USD: {date(2021, 1, 4): Decimal("3.7584")}, EUR: {date(2021, 1, 4): Decimal("4.6148")}}
+
+        # when
+        merged = merge_rates(old, new)
+
+        # then
+        self.assertEqual(merged[USD], {date(2021, 1, 4): Decimal("3.7584"), date(2021, 1, 5): Decimal("3.7247")})
+        self.assertEqual(merged[EUR], {date(2021, 1, 4): Decimal("4.6148")})
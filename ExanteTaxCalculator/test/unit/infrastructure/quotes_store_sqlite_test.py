@@ -0,0 +1,40 @@
+import os
+import unittest
+import tempfile
+from decimal import Decimal
+from datetime import date
+
+from src.domain.currency import USD, EUR
+from src.infrastructure.quotes_store_sqlite import QuotesStoreSQLite
+
+
+class QuotesStoreSQLiteTest(unittest.TestCase):
+    def test_unknown_quote_not_found(self) -> None:
+        # given
+        store = QuotesStoreSQLite(":memory:")
+
+        # when
+        known, quote = store.lookup(USD, date(2020, 5, 15))
+
+        # then
+        self.assertFalse(known)
+        self.assertIsNone(quote)
+
+    def test_saved_quotes_survive_reopening(self) -> None:
+        # given
+        with tempfile.TemporaryDirectory() as cache_dir:
+            filename = os.path.join(cache_dir, "nested", "quotes.sqlite3")
+            with QuotesStoreSQLite(filename) as store:
+                store.save(USD, date(2020, 5, 15), Decimal("4.2135"))
+                store.save(USD, date(2020, 5, 16), None)  # saturday, no quotation
+
+            # when
+            with QuotesStoreSQLite(filename) as store:
+                usd_friday = store.lookup(USD, date(2020, 5, 15))
+                usd_saturday = store.lookup(USD, date(2020, 5, 16))
+                eur_friday = store.lookup(EUR, date(2020, 5, 15))
+
+        # then
+        self.assertEqual(usd_friday, (True, Decimal("4.2135")))
+        self.assertEqual(usd_saturday, (True, None))
+        self.assertEqual(eur_friday, (False, None))
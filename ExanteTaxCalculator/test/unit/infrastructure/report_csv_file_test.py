@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from test.utils.capture_exception import capture_exception
+from src.infrastructure.report_csv_file import ReportCSVFile, split_into_line_chunks
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+
+REPORT_LINES = [
+    '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+    '"9"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-06-30 16:10:43"	"-10"	"PHYS.ARCA"	"-1000"	"None"',
+    '"10"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-06-30 16:10:43"	"1100"	"USD"	"1000"	"None"',
+    '"11"	"TBA0174.001"	"PHYS.ARCA"	"COMMISSION"	"2020-06-30 16:10:43"	"-2"	"USD"	"-2"	"None"',
+    '# "12"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-06-30 17:00:00"	"99"	"USD"	"99"	"commented-out"',
+    '"8"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-06-29 18:00:00"	"-50"	"USD"	"-50"	"Rollback for transaction #7"',
+    '"7"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-06-29 17:00:00"	"50"	"USD"	"50"	"None"',
+    '"4"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-06-29 16:10:43"	"20"	"PHYS.ARCA"	"1000"	"None"',
+    '"5"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-06-29 16:10:43"	"-1000"	"USD"	"-1000"	"None"',
+    "",
+    '"6"	"TBA0174.001"	"PHYS.ARCA"	"COMMISSION"	"2020-06-29 16:10:43"	"-2"	"USD"	"-2"	"None"',
+    '"1"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-06-29 09:00:00"	"2000"	"USD"	"2000"	"None"',
+]
+
+
+class ReportCSVFileTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.filename = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("# exported from Exante\n")
+            f.write("\n".join(REPORT_LINES) + "\n")
+
+    def tearDown(self) -> None:
+        os.remove(self.filename)
+
+    def test_lines_skip_commented_out(self) -> None:
+        # when
+        lines = list(ReportCSVFile(self.filename))
+
+        # then
+        self.assertEqual(lines, [line for line in REPORT_LINES if not line.startswith("#")])
+
+    def test_chunks_cover_the_file_and_end_at_line_ends(self) -> None:
+        # given
+        with open(self.filename, "rb") as f:
+            data = f.read()
+
+        for num_chunks in range(1, 20):
+            # when
+            chunks = split_into_line_chunks(self.filename, 0, num_chunks)
+
+            # then
+            self.assertLessEqual(len(chunks), num_chunks)
+            self.assertEqual(b"".join(data[start:end] for start, end in chunks), data)
+            self.assertTrue(all(data[end - 1 : end] == b"\n" for _, end in chunks))
+
+    def test_parallel_parsing_same_as_sequential(self) -> None:
+        # given
+        sequential = TradesRepoCSV2()
+        parallel = TradesRepoCSV2()
+
+        # when
+        sequential.load(ReportCSVFile(self.filename, jobs=1), prefix_years=[2020])
+        parallel.load(ReportCSVFile(self.filename, jobs=3), prefix_years=[2020])
+
+        # then
+        self.assertEqual(len(parallel.items), 3)  # funding, buy, sell; rolled back funding skipped
+        self.assertEqual(parallel.items, sequential.items)
+        self.assertEqual(parallel.prefixes, sequential.prefixes)
+
+    def test_jobs_below_one_raises_error(self) -> None:
+        # when
+        e = capture_exception(ReportCSVFile, self.filename, 0)
+
+        # then
+        self.assertIsInstance(e, ValueError)
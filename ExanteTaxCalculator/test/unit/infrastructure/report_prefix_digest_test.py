@@ -0,0 +1,79 @@
+import unittest
+from typing import List
+
+from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from src.infrastructure.report_prefix_digest import ReportPrefix
+
+HEADER = '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"'
+FUND_2020 = '"1"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-06-29 16:10:43"	"1000.0"	"USD"	"1000.0"	"None"'
+BUY_2020 = [
+    '"2"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-12-30 16:10:43"	"10"	"PHYS.ARCA"	"100"	"None"',
+    '"3"	"TBA0174.001"	"PHYS.ARCA"	"TRADE"	"2020-12-30 16:10:43"	"-100.0"	"USD"	"-100"	"None"',
+    '"4"	"TBA0174.001"	"PHYS.ARCA"	"COMMISSION"	"2020-12-30 16:10:43"	"-1.0"	"USD"	"-1"	"None"',
+]
+FUND_2021 = '"5"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2021-01-04 16:10:43"	"500.0"	"USD"	"500.0"	"None"'
+FUND_2022 = '"6"	"TBA0174.001"	"None"	"FUNDING/WITHDRAWAL"	"2022-01-04 16:10:43"	"500.0"	"USD"	"500.0"	"None"'
+
+
+def load_prefixes(report_csv: List[str], *years: int) -> dict:
+    repo = TradesRepoCSV2()
+    repo.load(report_csv, prefix_years=years)
+    return repo.prefixes
+
+
+class ReportPrefixDigestTest(unittest.TestCase):
+    def test_prefix_ends_before_first_item_after_the_year(self) -> None:
+        # given
+        report_csv = [HEADER, FUND_2020, *BUY_2020, FUND_2021, FUND_2022]
+
+        # when
+        prefixes = load_prefixes(report_csv, 2020, 2021)
+
+        # then
+        self.assertEqual((prefixes[2020].num_items, prefixes[2020].last_transaction_id), (2, 4))
+        self.assertEqual((prefixes[2021].num_items, prefixes[2021].last_transaction_id), (3, 5))
+
+    def test_extending_report_keeps_the_digest(self) -> None:
+        # given
+        short_report_csv = [HEADER, FUND_2020, *BUY_2020]
+        long_report_csv = [HEADER, FUND_2022, FUND_2021, *reversed(BUY_2020), FUND_2020]  # rows come in any order
+
+        # when
+        short_prefix = load_prefixes(short_report_csv, 2020)[2020]
+        long_prefix = load_prefixes(long_report_csv, 2020)[2020]
+
+        # then
+        self.assertEqual(short_prefix, long_prefix)
+
+    def test_changed_row_changes_the_digest(self) -> None:
+        # given
+        report_csv = [HEADER, FUND_2020, *BUY_2020, FUND_2021]
+        changed_report_csv = [HEADER, FUND_2020.replace("1000.0", "1001.0"), *BUY_2020, FUND_2021]
+
+        # when
+        prefix = load_prefixes(report_csv, 2020)[2020]
+        changed_prefix = load_prefixes(changed_report_csv, 2020)[2020]
+
+        # then
+        self.assertEqual(prefix.num_items, changed_prefix.num_items)
+        self.assertNotEqual(prefix.digest, changed_prefix.digest)
+
+    def test_year_before_the_report_has_empty_prefix(self) -> None:
+        # given
+        report_csv = [HEADER, FUND_2020]
+
+        # when
+        prefixes = load_prefixes(report_csv, 2019)
+
+        # then
+        self.assertEqual(prefixes[2019], ReportPrefix(2019, 0, 0, "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"))
+
+    def test_no_years_no_prefixes(self) -> None:
+        # given
+        report_csv = [HEADER, FUND_2020]
+
+        # when
+        prefixes = load_prefixes(report_csv)
+
+        # then
+        self.assertEqual(prefixes, {})
@@ -0,0 +1,130 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from src.infrastructure.report_row import ReportRow
+from src.infrastructure.report_row_parser import ReportRowParser
+from test.utils.capture_exception import capture_exception
+from src.infrastructure.errors import CorruptedReportError, InvalidReportRowError
+
+HEADER = ["Transaction ID", "Account ID", "Symbol ID", "Operation type", "When", "Sum", "Asset", "EUR equivalent", "Comment", "UUID", "Parent UUID"]
+FIELDS = [
+    "62368459",
+    "TBA0174.001",
+    "PHYS.ARCA",
+    "TRADE",
+    "2020-06-29 16:10:43",
+    "100.5",
+    "PHYS.ARCA",
+    "1269.77",
+    "Buy 100.5 units of PHYS",
+    "8e2d4c93-e7d7-4dd9-8ad4-c840fede8a51",
+    "4aee4eec-0d9c-42e3-8586-a1b7088a300d",
+]
+
+
+class ReportRowParserTest(unittest.TestCase):
+    def test_parse_same_as_from_dict(self):
+        # given
+        parser = ReportRowParser(HEADER)
+
+        # when
+        row = parser.parse(FIELDS)
+
+        # then
+        self.assertEqual(row, ReportRow.from_dict(dict(zip(HEADER, FIELDS))))
+        self.assertEqual(row.when, datetime(2020, 6, 29, 16, 10, 43))
+        self.assertEqual(row.sum, Decimal("100.5"))
+
+    def test_parse_columns_in_any_order(self):
+        # given
+        order = [8, 0, 10, 3, 1, 5, 2, 4, 9, 6, 7]
+        parser = ReportRowParser([HEADER[i] for i in order])
+
+        # when
+        row = parser.parse([FIELDS[i] for i in order])
+
+        # then
+        self.assertEqual(row, ReportRowParser(HEADER).parse(FIELDS))
+
+    def test_parse_interns_repeated_strings(self):
+        # given
+        parser = ReportRowParser(HEADER)
+        other_fields = list(FIELDS)
+        other_fields[1] = "".join(["TBA0174", ".001"])  # equal but not the same string object
+
+        # when
+        row1 = parser.parse(FIELDS)
+        row2 = parser.parse(other_fields)
+
+        # then
+        self.assertIs(row1.account_id, row2.account_id)
+
+    def test_parse_missing_optional_columns(self):
+        # given
+        parser = ReportRowParser(HEADER[:-2])
+
+        # when
+        row = parser.parse(FIELDS[:-2])
+
+        # then
+        self.assertEqual(row.uuid, "")
+        self.assertEqual(row.parent_uuid, "")
+
+    def test_parse_row_shorter_than_header_misses_optional_fields(self):
+        # given
+        parser = ReportRowParser(HEADER)
+
+        # when
+        row = parser.parse(FIELDS[:-2])
+
+        # then
+        self.assertEqual(row.uuid, "")
+        self.assertEqual(row.parent_uuid, "")
+
+    def test_missing_required_column_raises_error(self):
+        # given
+        header = HEADER[1:]
+
+        # when
+        expected_error = capture_exception(ReportRowParser, header)
+
+        # then
+        self.assertIsInstance(expected_error, CorruptedReportError)
+
+    def test_parse_short_row_raises_error(self):
+        # given
+        parser = ReportRowParser(HEADER)
+
+        # when
+        expected_error = capture_exception(parser.parse, FIELDS[:5])
+
+        # then
+        self.assertIsInstance(expected_error, InvalidReportRowError)
+
+    def test_parse_invalid_when_raises_error(self):
+        # given
+        parser = ReportRowParser(HEADER)
+        invalid_whens = ["2020-06-29", "2020-06-29T16:10:43", "2020-06-29 16:10:4x", "29-06-2020 16:10:43"]
+
+        for when in invalid_whens:
+            fields = list(FIELDS)
+            fields[4] = when
+
+            # when
+            expected_error = capture_exception(parser.parse, fields)
+
+            # then
+            self.assertIsInstance(expected_error, InvalidReportRowError, when)
+
+    def test_parse_unknown_operation_type_raises_error(self):
+        # given
+        parser = ReportRowParser(HEADER)
+        fields = list(FIELDS)
+        fields[3] = "BARTER"
+
+        # when
+        expected_error = capture_exception(parser.parse, fields)
+
+        # then
+        self.assertIsInstance(expected_error, InvalidReportRowError)
@@ -0,0 +1,79 @@
+import unittest
+import pytest
+from http import HTTPStatus
+from typing import List
+from unittest.mock import Mock, create_autospec, patch
+
+from src.calculator import url_fetch
+from src.domain.quotation.nbp.quotator_nbp import UrlFetcher
+from src.infrastructure.retrying_fetcher import RetryingFetcher
+
+OK_200 = ("{}", HTTPStatus.OK)
+NOT_FOUND_404 = ("404 Not Found", HTTPStatus.NOT_FOUND)
+SERVICE_UNAVAILABLE_503 = ("503 Service Unavailable", HTTPStatus.SERVICE_UNAVAILABLE)
+
+
+class RetryingFetcherTest(unittest.TestCase):
+    def test_server_error_is_retried_with_backoff(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.side_effect = [SERVICE_UNAVAILABLE_503, SERVICE_UNAVAILABLE_503, OK_200]
+        waits: List[float] = []
+        retrying_fetcher = RetryingFetcher(fetcher, retries=3, backoff_seconds=1, sleep=waits.append)
+
+        # when
+        result = retrying_fetcher("http://api.nbp.pl")
+
+        # then
+        self.assertEqual(result, OK_200)
+        self.assertEqual(waits, [1, 2])
+
+    def test_not_found_is_not_retried(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.return_value = NOT_FOUND_404
+        retrying_fetcher = RetryingFetcher(fetcher, retries=3, sleep=lambda _: None)
+
+        # when
+        result = retrying_fetcher("http://api.nbp.pl")
+
+        # then
+        self.assertEqual(result, NOT_FOUND_404)
+        self.assertEqual(fetcher.call_count, 1)
+
+    def test_gives_up_after_retries(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.side_effect = ConnectionResetError("connection reset by peer")
+        retrying_fetcher = RetryingFetcher(fetcher, retries=2, sleep=lambda _: None)
+
+        # when - then
+        with pytest.raises(ConnectionResetError):
+            retrying_fetcher("http://api.nbp.pl")
+        self.assertEqual(fetcher.call_count, 3)
+
+    def test_server_error_of_calculator_url_fetch_is_retried_over_network(self) -> None:
+        # given
+        responses = [Mock(text="503 Service Unavailable", status_code=503), Mock(text="{}", status_code=200)]
+        retrying_fetcher = RetryingFetcher(url_fetch, retries=3, sleep=lambda _: None)
+
+        # when
+        with patch("src.calculator.requests.get", side_effect=responses) as get:
+            result = retrying_fetcher("http://api.nbp.pl")
+
+        # then
+        self.assertEqual(result, OK_200)
+        self.assertEqual(get.call_count, 2)
+
+    def test_every_attempt_is_counted(self) -> None:
+        # given
+        fetcher = create_autospec(UrlFetcher)
+        fetcher.side_effect = [SERVICE_UNAVAILABLE_503, ConnectionResetError("connection reset by peer"), OK_200, NOT_FOUND_404]
+        retrying_fetcher = RetryingFetcher(fetcher, retries=3, sleep=lambda _: None)
+
+        # when
+        _ = retrying_fetcher("http://api.nbp.pl/a")
+        _ = retrying_fetcher("http://api.nbp.pl/b")
+
+        # then
+        self.assertEqual(retrying_fetcher.num_calls, 4)
@@ -0,0 +1,92 @@
+import io
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from datetime import datetime
+from money import Money
+
+from test.utils.capture_exception import capture_exception
+from src.domain.transactions import AutoConversionItem, BuyItem
+from src.infrastructure.errors import CorruptedSnapshotError
+from src.infrastructure.report_prefix_digest import ReportPrefix
+from src.infrastructure.trader_snapshot import TraderSnapshot, find_snapshot_before, parse_snapshot_json, read_snapshot, save_snapshot, snapshot_filename, write_snapshot_json
+
+BUY_ITEM = BuyItem(
+    asset_name="PHYS.ARCA",
+    amount=Decimal("20"),
+    paid=Money("1000.10", "USD"),
+    commission=Money("1.5", "USD"),
+    autoconversions=(AutoConversionItem(Money("-900", "EUR"), Money("1001.60", "USD"), datetime(2020, 6, 29, 16, 10, 43), 4),),
+    date=datetime(2020, 6, 29, 16, 10, 43),
+    transaction_id=1,
+)
+
+SNAPSHOT = TraderSnapshot(
+    report_prefix=ReportPrefix(2020, 12, 345, "ab" * 32),
+    assets={"USD": Decimal("10.25"), "PHYS.ARCA": Decimal("15")},
+    open_lots=[(BUY_ITEM, Decimal("15"))],
+)
+
+
+class TraderSnapshotTest(unittest.TestCase):
+    def test_write_parse_round_trip(self) -> None:
+        # given
+        f = io.StringIO()
+
+        # when
+        write_snapshot_json(SNAPSHOT, f)
+        f.seek(0)
+        snapshot = parse_snapshot_json(f)
+
+        # then
+        self.assertEqual(snapshot, SNAPSHOT)
+        self.assertEqual(snapshot.year, 2020)
+
+    def test_parse_malformed_json_raises_error(self) -> None:
+        # given
+        f = io.StringIO('{"version": 1, "year": 2020, "assets": {}}')
+
+        # when
+        e = capture_exception(parse_snapshot_json, f)
+
+        # then
+        self.assertIsInstance(e, CorruptedSnapshotError)
+
+    def test_parse_other_version_raises_error(self) -> None:
+        # given
+        f = io.StringIO('{"version": 999}')
+
+        # when
+        e = capture_exception(parse_snapshot_json, f)
+
+        # then
+        self.assertIsInstance(e, CorruptedSnapshotError)
+
+    def test_save_find_read(self) -> None:
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            # given
+            save_snapshot(SNAPSHOT, snapshot_filename(snapshot_dir, 2018))
+            save_snapshot(SNAPSHOT, snapshot_filename(snapshot_dir, 2020))
+
+            # when
+            found_before_2021 = find_snapshot_before(snapshot_dir, 2021)
+            found_before_2020 = find_snapshot_before(snapshot_dir, 2020)
+            found_before_2018 = find_snapshot_before(snapshot_dir, 2018)
+
+            # then
+            self.assertEqual(found_before_2021, snapshot_filename(snapshot_dir, 2020))
+            self.assertEqual(found_before_2020, snapshot_filename(snapshot_dir, 2018))
+            self.assertIsNone(found_before_2018)
+            self.assertEqual(read_snapshot(snapshot_filename(snapshot_dir, 2020)), SNAPSHOT)
+            self.assertEqual(sorted(os.listdir(snapshot_dir)), ["trader_snapshot_2018.json", "trader_snapshot_2020.json"])
+
+    def test_find_in_missing_dir(self) -> None:
+        # given
+        snapshot_dir = os.path.join(tempfile.gettempdir(), "no-such-snapshot-dir")
+
+        # when
+        found = find_snapshot_before(snapshot_dir, 2021)
+
+        # then
+        self.assertIsNone(found)
@@ -1,15 +1,35 @@
+import io
+import os
+import logging
+import tempfile
 import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
 from datetime import datetime
 from money import Money
 from decimal import Decimal
 from typing import List
 
-from src.infrastructure.trades_repo_csv_2 import TradesRepoCSV2
+from src.infrastructure.trades_repo_csv_2 import RollbacksFilter, RowCounts, TradesRepoCSV2, sort_rows_by_transactionid_ascendig
+from src.infrastructure.report_csv_file import ReportCSVFile
+from src.infrastructure import trades_repo_csv_2
 from src.infrastructure.errors import InvalidTradeError, CorruptedReportError
 from src.domain.transactions import *
 from test.utils.capture_exception import capture_exception
 
 
+NEARLY_SORTED_REPORT = [
+    '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+    '"7"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-23 10:30:50"	"-50.0"	"EUR"	"-50.0"	"Rollback for transaction #2 2020-10-21 10:30:50.000"',
+    '"5"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 11:00:00"	"-10"	"PHYS.ARCA"	"-100.0"	"None"',
+    '"6"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 11:00:00"	"110.0"	"EUR"	"110.0"	"None"',
+    '"3"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 10:00:00"	"10"	"PHYS.ARCA"	"100.0"	"None"',
+    '"4"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 10:00:00"	"-100.0"	"EUR"	"-100.0"	"None"',
+    '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"50.0"	"EUR"	"50.0"	"None"',
+    '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+]  # reverse sorted by TransactionID, but for pairs of rows swapped
+
+
 class TradesRepoCSVTest(unittest.TestCase):
     def test_read_missing_header_raises_error(self) -> None:
         # given
@@ -685,3 +705,184 @@ class TradesRepoCSVTest(unittest.TestCase):
 
         # then
         self.assertEqual(repo.items, [])
+
+    def test_rollback_and_sorting_over_memory_budget_success(self) -> None:
+        # given
+        report_csv = iter(
+            [
+                '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+                '"5"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-23 10:30:50"	"-50.0"	"EUR"	"-50.0"	"Rollback for transaction #2 2020-10-21 10:30:50.000"',
+                '"4"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-22 10:30:50"	"50.0"	"EUR"	"50.0"	"None"',
+                '"3"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-22 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+                '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+                '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            ]
+        )
+        repo = TradesRepoCSV2(max_rows_in_memory=2)  # rows are sorted in 3 chunks on disk
+
+        # when
+        repo.load(report_csv, "\t")
+
+        # then
+        self.assertEqual([item.transaction_id for item in repo.items], [1, 3, 4])
+
+    def test_row_counts_of_each_stage(self) -> None:
+        # given
+        report_csv = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            '"4"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-23 10:30:50"	"-50.0"	"EUR"	"-50.0"	"Rollback for transaction #2 2020-10-21 10:30:50.000"',
+            '"3"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-22 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"50.0"	"EUR"	"50.0"	"None"',
+            '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+        ]
+        repo = TradesRepoCSV2()
+
+        # when
+        repo.load(report_csv, "\t")
+
+        # then
+        self.assertEqual(repo.row_counts, RowCounts(parsed=4, rolled_back=2, built=2, items=2))
+
+    def test_rows_traced_only_on_debug_level(self) -> None:
+        # given
+        report_csv = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+        ]
+        stdout = io.StringIO()
+
+        # when
+        with redirect_stdout(stdout):
+            TradesRepoCSV2().load(report_csv, "\t")
+        with self.assertLogs("src.infrastructure.trades_repo_csv_2", level=logging.DEBUG) as trace:
+            TradesRepoCSV2().load(report_csv, "\t")
+
+        # then
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertTrue(any("Processing row 0, transaction: 1" in line for line in trace.output))
+
+    def test_hash_in_comment_without_transaction_id_is_not_rollback(self) -> None:
+        # given
+        report_csv = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"50.0"	"EUR"	"50.0"	"Deposit #abc"',
+            '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+        ]
+        repo = TradesRepoCSV2()
+
+        # when
+        repo.load(report_csv, "\t")
+
+        # then
+        self.assertEqual([item.transaction_id for item in repo.items], [1, 2])
+        self.assertEqual(repo.row_counts.rolled_back, 0)
+
+    def test_nearly_sorted_report_same_as_fully_sorted(self) -> None:
+        # given
+        report_csv = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            '"7"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-23 10:30:50"	"-50.0"	"EUR"	"-50.0"	"Rollback for transaction #2 2020-10-21 10:30:50.000"',
+            '"5"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 11:00:00"	"-10"	"PHYS.ARCA"	"-100.0"	"None"',
+            '"6"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 11:00:00"	"110.0"	"EUR"	"110.0"	"None"',
+            '"3"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 10:00:00"	"10"	"PHYS.ARCA"	"100.0"	"None"',
+            '"4"	"TBA9999.001"	"PHYS.ARCA"	"TRADE"	"2020-10-22 10:00:00"	"-100.0"	"EUR"	"-100.0"	"None"',
+            '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"50.0"	"EUR"	"50.0"	"None"',
+            '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+        ]
+        nearly_sorted = TradesRepoCSV2(disorder_window=2)
+        fully_sorted = TradesRepoCSV2()
+
+        # when
+        nearly_sorted.load(report_csv, "\t", prefix_years=[2020])
+        fully_sorted.load(iter(report_csv), "\t", prefix_years=[2020])  # single pass input can't be pre-scanned
+
+        # then
+        self.assertEqual([item.transaction_id for item in nearly_sorted.items], [1, 3, 5])
+        self.assertEqual(nearly_sorted.items, fully_sorted.items)
+        self.assertEqual(nearly_sorted.prefixes, fully_sorted.prefixes)
+
+    def test_load_stages_one_by_one_same_as_load(self) -> None:
+        # given
+        report_csv = NEARLY_SORTED_REPORT
+        repo = TradesRepoCSV2()
+        staged_repo = TradesRepoCSV2()
+        rollbacks = RollbacksFilter()
+
+        # when
+        repo.load(report_csv, "\t", prefix_years=[2020])
+        rows = list(staged_repo.parse_rows(report_csv))
+        rows = list(rollbacks.collect(rows))
+        rows = list(sort_rows_by_transactionid_ascendig(rows))
+        rows = list(rollbacks.filter(rows))
+        num_rows = staged_repo.build_items(rows, prefix_years=[2020])
+
+        # then
+        self.assertEqual(num_rows, repo.row_counts.built)
+        self.assertEqual(staged_repo.items, repo.items)
+        self.assertEqual(staged_repo.prefixes, repo.prefixes)
+
+    def test_nearly_sorted_report_file_is_window_sorted(self) -> None:
+        # given
+        report_csv = NEARLY_SORTED_REPORT
+        fd, filename = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("\n".join(report_csv) + "\n")
+        nearly_sorted = TradesRepoCSV2(disorder_window=2)
+        fully_sorted = TradesRepoCSV2()
+
+        # when
+        try:
+            with patch.object(trades_repo_csv_2, "window_sorted", wraps=trades_repo_csv_2.window_sorted) as window_sorted:
+                nearly_sorted.load(ReportCSVFile(filename), "\t", prefix_years=[2020])
+        finally:
+            os.remove(filename)
+        fully_sorted.load(iter(report_csv), "\t", prefix_years=[2020])
+
+        # then
+        window_sorted.assert_called_once()
+        self.assertEqual(nearly_sorted.items, fully_sorted.items)
+        self.assertEqual(nearly_sorted.prefixes, fully_sorted.prefixes)
+
+    def test_nearly_sorted_lines_in_memory_are_fully_sorted(self) -> None:
+        # given
+        report_csv = NEARLY_SORTED_REPORT
+        repo = TradesRepoCSV2(disorder_window=2)
+
+        # when
+        with patch.object(trades_repo_csv_2, "window_sorted", wraps=trades_repo_csv_2.window_sorted) as window_sorted:
+            repo.load(report_csv, "\t")
+
+        # then
+        window_sorted.assert_not_called()
+        self.assertEqual([item.transaction_id for item in repo.items], [1, 3, 5])
+
+    def test_reverse_sorted_lines_in_memory_are_not_fully_sorted(self) -> None:
+        # given
+        report_csv = [NEARLY_SORTED_REPORT[0]] + sorted(NEARLY_SORTED_REPORT[1:], key=lambda line: -int(line.split("\t")[0].strip('"')))
+        repo = TradesRepoCSV2()
+
+        # when
+        with patch.object(trades_repo_csv_2, "sorted_external") as sorted_external:
+            repo.load(report_csv, "\t")
+
+        # then
+        sorted_external.assert_not_called()
+        self.assertEqual([item.transaction_id for item in repo.items], [1, 3, 5])
+
+    def test_report_disordered_beyond_window_is_fully_sorted(self) -> None:
+        # given
+        report_csv = [
+            '"Transaction ID"	"Account ID"	"Symbol ID"	"Operation type"	"When"	"Sum"	"Asset"	"EUR equivalent"	"Comment"	"UUID"	"Parent UUID"',
+            '"1"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-20 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            '"4"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-23 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            '"2"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-21 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            '"5"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-24 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+            '"3"	"TBA9999.001"	"None"	"FUNDING/WITHDRAWAL"	"2020-10-22 10:30:50"	"100.0"	"EUR"	"100.0"	"None"',
+        ]
+        repo = TradesRepoCSV2(disorder_window=1)
+
+        # when
+        repo.load(report_csv, "\t")
+
+        # then
+        self.assertEqual([item.transaction_id for item in repo.items], [1, 2, 3, 4, 5])
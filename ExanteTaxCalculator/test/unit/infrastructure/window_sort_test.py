@@ -0,0 +1,62 @@
+import unittest
+import random
+
+from src.infrastructure.window_sort import Direction, detect_order, sorts_within_window, window_sorted
+
+
+class WindowSortTest(unittest.TestCase):
+    def test_nearly_sorted_input_is_sorted(self) -> None:
+        # given
+        items = [2, 1, 3, 5, 4, 6, 8, 7, 9]
+
+        # when
+        result = list(window_sorted(items, window=1))
+
+        # then
+        self.assertEqual(result, sorted(items))
+
+    def test_input_displaced_within_window(self) -> None:
+        # given
+        random.seed(0)
+        items = list(range(1000))
+        for start in range(0, 1000, 10):
+            block = items[start : start + 10]
+            random.shuffle(block)
+            items[start : start + 10] = block
+
+        # when
+        fits = sorts_within_window(items, window=9)
+        result = list(window_sorted(items, window=9))
+
+        # then
+        self.assertTrue(fits)
+        self.assertEqual(result, sorted(items))
+
+    def test_input_displaced_beyond_window(self) -> None:
+        # given
+        items = [1, 2, 3, 4, 0]
+
+        # when
+        fits = sorts_within_window(items, window=3)
+
+        # then
+        self.assertFalse(fits)
+        self.assertNotEqual(list(window_sorted(items, window=3)), sorted(items))
+
+    def test_detect_order(self) -> None:
+        # given
+        cases = [
+            ([1, 2, 3, 4], (Direction.FORWARD, 0)),
+            ([4, 3, 2, 1], (Direction.BACKWARD, 0)),
+            ([2, 1, 3, 4], (Direction.FORWARD, 2)),
+            ([8, 7, 6, 5, 3, 4, 2, 1], (Direction.BACKWARD, 2)),
+            ([5, 1, 2, 3, 4, 0], None),
+            ([], (Direction.FORWARD, 0)),
+        ]
+
+        for keys, expected_order in cases:
+            # when
+            order = detect_order(keys, max_window=2)
+
+            # then
+            self.assertEqual(order, expected_order, f"Incorrect order for {keys}")